@@ -1,24 +1,39 @@
-from flask import Flask, request, jsonify, send_file, make_response
-from services.google_map_search import GoogleMapSearch
+from flask import (
+    Flask,
+    Response,
+    request,
+    jsonify,
+    send_file,
+    make_response,
+    stream_with_context,
+)
 from flask_cors import CORS
-from utils.helpers import Tools
-from utils.data_transport import FirebaseClient
 from utils.session import Session
-from services.restaurant_service import search_nearby_restaurants
-from ml_model import UserInterestPredictor
-import threading
+from services import registry
+from services.restaurant_service import (
+    search_nearby_restaurants,
+    stream_nearby_restaurants,
+)
+from services.job_executor import JobCancelledError, JobRejectedError
+from utils.geo_tiles import snap_to_tile
+from utils.restaurant_record import as_dict, frame_to_dicts, json_default
 import logging
+import queue
+import threading
+import json
 import os
+import config
 
 app = Flask(__name__)
 CORS(app, origins=["http://localhost:5173","http://127.0.0.1:5173"], supports_credentials=True)
 session = Session()
 
-gmaps = GoogleMapSearch()
-last_info = {}
-tools = Tools()
-firebase_client = FirebaseClient()
-model = UserInterestPredictor()
+# Heavy clients live in the registry and are built on first use. Outside of
+# lazy mode they are all built up front, optionally on a background thread.
+if not config.LAZY_INIT:
+    registry.warm_up()
+elif config.WARM_UP_IN_BACKGROUND:
+    registry.start_background_warm_up()
 
 # Dummy user
 USER = {
@@ -63,78 +78,349 @@ def logout():
         return response, 200
     return jsonify({'message': 'No session to log out from'}), 200
 
+def cluster_and_upload(job, pages, state=None):
+    """
+    Cluster and upload restaurants page by page, as they are fetched. The
+    first page is uploaded as soon as it is clustered so /suggestion can
+    answer right away, later pages refine the clusters and upload again.
+
+    Returns the clustering state, which can be passed back in to continue
+    with more pages later.
+    """
+    model = registry.get_model()
+    for page in pages:
+        job.check_cancelled()
+        if not page:
+            continue
+        job.update(clustering="running")
+        try:
+            state = model.cluster_incremental(page, state, area=search_area(job))
+        except Exception:
+            job.update(clustering="failed")
+            raise
+        job.check_cancelled()
+        first_upload = not job.suggestions_ready
+        if first_upload:
+            job.update(clustering="done", upload="running")
+        else:
+            job.update(clustering="done")
+        try:
+            label_data_dict = frame_to_dicts(state.restaurant_df)
+            registry.get_storage().upload_data(
+                label_data_dict, user_id=job.user_id
+            )
+        except Exception:
+            if first_upload:
+                job.update(upload="failed")
+            raise
+        job.update(upload="done", restaurants_clustered=len(label_data_dict))
+        logging.info(
+            f"Uploaded {len(label_data_dict)} clustered restaurants for user {job.user_id}"
+        )
+    return state
+
+
+def search_area(job):
+    """Key of the geohash tile a search covers, shared by overlapping searches."""
+    location = job.search_state.get("lat_lng")
+    if not location and job.params.get("lat") and job.params.get("lng"):
+        location = {"lat": job.params["lat"], "lng": job.params["lng"]}
+    if not location:
+        return None
+    radius = job.search_state.get("radius") or job.params.get("radius")
+    tile_key, _, _ = snap_to_tile(location["lat"], location["lng"], radius)
+    return tile_key
+
+
+def fetch_search_pages(job, results, next_page_token):
+    """Yield the first page of results, then fetch and yield the remaining pages."""
+    yield results
+    current_next_page_token = next_page_token
+    while current_next_page_token:
+        job.check_cancelled()
+        more_results, current_next_page_token, _, _ = search_nearby_restaurants(
+            next_page_token=current_next_page_token,
+            last_info=job.search_state,
+        )
+        job.record_page(len(more_results))
+        yield more_results
+
+
+def run_search_job(job, results, next_page_token):
+    """
+    Background part of a search: cluster and upload the first page, then
+    fetch the remaining pages and fold them into the clusters for /suggestion.
+    """
+    try:
+        job.update(status="fetching")
+        cluster_and_upload(job, fetch_search_pages(job, results, next_page_token))
+        job.update(status="done")
+    except JobCancelledError:
+        logging.info(f"Search job {job.job_id} cancelled by a newer search")
+        job.update(status="cancelled")
+    except Exception as e:
+        logging.error(f"Error in background processing: {str(e)}")
+        job.fail(e)
+
+
+def submit_search_job(job, fn, *args, dedupe_key=None):
+    """
+    Hand the background part of a search to the shared executor. When the
+    queue is full the job is marked rejected instead of starting another thread.
+    """
+    try:
+        registry.get_background_executor().submit(
+            job, fn, *args, dedupe_key=dedupe_key
+        )
+    except JobRejectedError as e:
+        logging.warning(f"Search job {job.job_id} rejected: {str(e)}")
+        job.update(status="rejected", error="Server busy, try again later")
+
+
 @app.route("/search", methods=["GET"])
 def search_restaurants():
-    global last_info
     address = request.args.get("address")
     lat = request.args.get("lat", type=float)
     lng = request.args.get("lng", type=float)
     radius = request.args.get("radius", default=10000, type=int)
-    next_page_token = None
     user_id = request.args.get("user_id", type=str, default="normal")
+    stream = request.args.get(
+        "stream", default=False, type=lambda v: v.lower() in ("1", "true", "yes")
+    )
+    # Fan the search out over several centres instead of paginating one search
+    coverage = request.args.get(
+        "coverage", default=False, type=lambda v: v.lower() in ("1", "true", "yes")
+    )
+    grid = request.args.get("grid", type=int)
+    if grid is not None and not 1 <= grid <= config.COVERAGE_MAX_GRID:
+        return (
+            jsonify({"error": f"grid must be between 1 and {config.COVERAGE_MAX_GRID}"}),
+            400,
+        )
+    params = {"address": address, "lat": lat, "lng": lng, "radius": radius}
+    if coverage:
+        params.update(coverage=True, grid=grid)
+    dedupe_key = (user_id, address, lat, lng, radius, coverage, grid)
+
+    existing = registry.get_background_executor().in_flight(dedupe_key)
+    if existing is not None and not stream:
+        # The same search is already running, answer with its first page
+        # instead of searching, clustering and paying for it a second time
+        return (
+            jsonify(
+                {
+                    "results": [as_dict(r) for r in existing.first_page or []],
+                    "job_id": existing.job_id,
+                }
+            ),
+            200,
+        )
+
+    job = registry.get_search_jobs().create(user_id, params)
+    # A new search starts a new swipe session
+    registry.get_preferences().reset(user_id)
+
+    if stream:
+        return stream_search(job, dedupe_key)
 
     # Get the first batch of results
-    results, next_page_token, status_code, error = search_nearby_restaurants(
-        address=address,
-        lat=lat,
-        lng=lng,
-        radius=radius,
-        next_page_token=next_page_token,
-        last_info=last_info,
-    )
-    
+    job.update(status="fetching")
+    try:
+        results, next_page_token, status_code, error = search_nearby_restaurants(
+            last_info=job.search_state, **params
+        )
+    except Exception as e:
+        # Geocoding, Maps API and key pool errors; without this the job
+        # would stay "fetching" and /suggestion would answer 202 forever
+        logging.error(f"Search {job.job_id} failed: {str(e)}")
+        job.fail(e)
+        return jsonify({"error": str(e), "job_id": job.job_id}), 502
+
     if error:
-        return jsonify({"error": error}), status_code
-    
-    # Start background processing for remaining pages and clustering
-    def background_processing():
+        job.fail(error)
+        return jsonify({"error": error, "job_id": job.job_id}), status_code
+    job.record_page(len(results))
+    job.update(first_page=results)
+
+    # Fetch remaining pages and cluster in the background
+    if results:
+        submit_search_job(
+            job, run_search_job, results, next_page_token, dedupe_key=dedupe_key
+        )
+    else:
+        job.update(status="done")
+
+    # Warm the photos of the first cards the user will see
+    registry.get_photo_service().prefetch([r["place_id"] for r in results])
+
+    # Return the first batch of results immediately
+    return (
+        jsonify({"results": [as_dict(r) for r in results], "job_id": job.job_id}),
+        200,
+    )
+
+
+def stream_search(job, dedupe_key=None):
+    """
+    Stream /search results as NDJSON, one restaurant card per line as soon as
+    its details resolve, continuing through every page of results. Each page
+    is handed to the background clustering as soon as it has been streamed.
+
+    The background task clusters the pages it is handed and gives its worker
+    back once none arrives for config.STREAM_PAGE_TIMEOUT_SECONDS, so a slow
+    or vanished client cannot hold a worker. A later page starts a new task
+    that continues from the same clustering state.
+    """
+    pages = queue.Queue()
+    lock = threading.Lock()
+    consumer = {"active": False, "submitted": False, "finished": False, "state": None}
+
+    def streamed_pages():
+        while True:
+            try:
+                page = pages.get(timeout=config.STREAM_PAGE_TIMEOUT_SECONDS)
+            except queue.Empty:
+                with lock:
+                    if pages.empty():
+                        consumer["active"] = False
+                        return
+                continue
+            if page is None:
+                consumer["finished"] = True
+                return
+            yield page
+
+    def process_streamed_pages(job):
         try:
-            all_data = results.copy()  # Start with the first batch
-            
-            # Fetch remaining pages
-            current_next_page_token = next_page_token
-            while current_next_page_token:
-                more_results, current_next_page_token, _, _ = search_nearby_restaurants(
-                    address=address,
-                    lat=lat,
-                    lng=lng,
-                    radius=radius,
-                    next_page_token=current_next_page_token,
-                    last_info=last_info,
-                )
-                all_data.extend(more_results)
-            
-            # Process clustering after all data is collected
-            if all_data:
-                label_data_df = model.clustering(all_data)
-                label_data_dict = label_data_df.to_dict(orient="records")
-                firebase_client.upload_data(label_data_dict, user_id=user_id)
-                logging.info(
-                    f"Successfully uploaded clustering data for user {user_id}"
-                )
+            consumer["state"] = cluster_and_upload(
+                job, streamed_pages(), consumer["state"]
+            )
+            if consumer["finished"] and not job.finished:
+                job.update(status="done")
+        except JobCancelledError:
+            job.update(status="cancelled")
         except Exception as e:
-            logging.error(f"Error in background processing: {str(e)}")
-
-    # Start the background thread if we have both results and more pages
-    if results and next_page_token:
-        threading.Thread(target=background_processing).start()
-    # Even if there's no next page, run clustering on initial results
-    elif results:
-        def process_initial_results():
-            try:
-                label_data_df = model.clustering(results)
-                label_data_dict = label_data_df.to_dict(orient="records")
-                firebase_client.upload_data(label_data_dict, user_id=user_id)
-                logging.info(
-                    f"Successfully uploaded clustering data for user {user_id}"
-                )
-            except Exception as e:
-                logging.error(f"Error in processing initial results: {str(e)}")
-        
-        threading.Thread(target=process_initial_results).start()
+            logging.error(f"Error in processing streamed results: {str(e)}")
+            job.fail(e)
 
-    # Return the first batch of results immediately
-    return jsonify({"results": results}), 200
+    def hand_over(page):
+        """Queue a page (None once the stream ends) and wake the consumer."""
+        with lock:
+            pages.put(page)
+            if consumer["active"]:
+                return
+            consumer["active"] = True
+            # Only the first task is registered for deduplication
+            first = not consumer["submitted"]
+            consumer["submitted"] = True
+        submit_search_job(
+            job, process_streamed_pages, dedupe_key=dedupe_key if first else None
+        )
+
+    def generate():
+        page = []
+        streamed = 0
+        completed = False
+        job.update(status="fetching")
+        try:
+            yield json.dumps({"type": "job", "job_id": job.job_id}) + "\n"
+            for event in stream_nearby_restaurants(
+                last_info=job.search_state, **job.params
+            ):
+                if job.cancelled:
+                    break  # A newer search from the same user took over
+                if event["type"] == "restaurant":
+                    page.append(event["restaurant"])
+                    streamed += 1
+                    if streamed <= config.PHOTO_PREFETCH_CARDS:
+                        registry.get_photo_service().prefetch(
+                            [event["restaurant"]["place_id"]]
+                        )
+                elif event["type"] == "page":
+                    job.record_page(event["count"])
+                    if page:
+                        if job.first_page is None:
+                            job.update(first_page=page)
+                        hand_over(page)
+                        page = []
+                elif event["type"] == "error":
+                    job.fail(event["error"])
+                yield json.dumps(event, default=json_default) + "\n"
+            completed = True
+        except Exception as e:
+            logging.error(f"Error streaming search {job.job_id}: {str(e)}")
+            job.fail(e)
+            yield json.dumps({"type": "error", "status": 502, "error": str(e)}) + "\n"
+        finally:
+            # Also runs when the client disconnects half way through
+            if page and not job.cancelled:
+                hand_over(page)
+            if consumer["submitted"]:
+                hand_over(None)
+            elif not job.finished:
+                # Nothing to cluster: the stream ended empty or the client left
+                job.update(status="done" if completed else "cancelled")
+
+    response = Response(
+        stream_with_context(generate()), mimetype="application/x-ndjson"
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # Don't let proxies buffer
+    return response
+
+
+@app.route("/search/status", methods=["GET"])
+def search_status():
+    """Report the progress of a search job, by job_id or latest for a user_id."""
+    jobs = registry.get_search_jobs()
+    job_id = request.args.get("job_id")
+    user_id = request.args.get("user_id", type=str, default="normal")
+    job = jobs.get(job_id) if job_id else jobs.latest_for_user(user_id)
+    if job is None:
+        return jsonify({"error": "No search job found"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+def parse_suggestion_page(data):
+    """
+    Read the paging and projection parameters of a /suggestion request.
+
+    `limit` cards are returned starting at rank `offset`; `fields` is a list
+    or comma separated string of the columns to return, "all" for every
+    column, and defaults to config.SUGGESTION_CARD_FIELDS.
+
+    Returns:
+        Tuple[int, int, List[str]]: offset, limit and fields (None for all).
+
+    Raises:
+        ValueError: If offset or limit is not a valid integer or out of range.
+    """
+    try:
+        offset = int(data.get("offset", 0))
+        limit = int(data.get("limit", config.SUGGESTION_DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        raise ValueError("offset and limit must be integers")
+    if offset < 0 or limit < 1 or offset + limit > config.SUGGESTION_MAX_LIMIT:
+        raise ValueError(
+            f"offset + limit must be between 1 and {config.SUGGESTION_MAX_LIMIT}"
+        )
+
+    fields = data.get("fields") or config.SUGGESTION_CARD_FIELDS
+    if isinstance(fields, str):
+        fields = None if fields == "all" else fields.split(",")
+    return offset, limit, fields
+
+
+def project_cards(suggestion, fields):
+    """Keep the requested columns of the ranked restaurants; place_id is always kept."""
+    if fields is None:
+        return suggestion
+    columns = ["place_id"] + [
+        field
+        for field in fields
+        if field != "place_id" and field in suggestion.columns
+    ]
+    return suggestion[columns]
 
 
 @app.route("/suggestion", methods=["POST"])
@@ -153,6 +439,12 @@ def get_suggestion():
         # Get user liked restaurant IDs
         like_place_id = data.get("like_place_id", [])
         dislike_place_id = data.get("dislike_place_id", [])
+        # With delta the lists only hold the swipes since the previous call
+        delta = bool(data.get("delta", False))
+        try:
+            offset, limit, fields = parse_suggestion_page(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         # Get user_id with default "normal" if not provided or empty
         user_id = data.get("user_id")
@@ -161,23 +453,98 @@ def get_suggestion():
             
         app.logger.info(f"Using user_id: {user_id}")
         
-        cluster_data = firebase_client.get_data(user_id=user_id)
+        job = registry.get_search_jobs().latest_for_user(user_id)
+        if job is not None and not job.finished and not job.suggestions_ready:
+            # Clustering has not landed yet, tell the client to poll /search/status
+            return (
+                jsonify({"error": "Suggestions not ready", "job": job.to_dict()}),
+                202,
+            )
+
+        cluster_data = registry.get_storage().get_data(user_id=user_id)
         
         if not cluster_data:
             return jsonify({"error": "No data found for user"}), 404
 
-        suggestion = model.predict(cluster_data, like_place_id, dislike_place_id)
-        app.logger.info(f"Suggestion: \n{suggestion["restaurant_name"]}")
-        return jsonify({"suggestion": suggestion.to_dict(orient="records")}), 200
+        suggestion = registry.get_model().predict(
+            cluster_data,
+            like_place_id,
+            dislike_place_id,
+            preferences=registry.get_preferences().get(user_id),
+            delta=delta,
+            top_k=offset + limit,
+        ).iloc[offset:]
+        suggestion = project_cards(suggestion, fields)
+        registry.get_photo_service().prefetch(suggestion["place_id"].tolist())
+        app.logger.info(f"Suggestion: \n{suggestion['place_id'].tolist()}")
+        return (
+            jsonify(
+                {
+                    "suggestion": suggestion.to_dict(orient="records"),
+                    "offset": offset,
+                    "limit": limit,
+                }
+            ),
+            200,
+        )
     except Exception as e:
         app.logger.error(f"Error in get_suggestion: {str(e)}", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/ready", methods=["GET"])
+def ready():
+    """Readiness probe: 200 once the process can serve requests, 503 otherwise."""
+    state = registry.readiness()
+    return jsonify(state), 200 if state["ready"] else 503
+
+
+@app.route("/warm-up", methods=["POST"])
+def warm_up():
+    """Start initialising every heavy resource in the background."""
+    registry.start_background_warm_up()
+    return jsonify(registry.readiness()), 202
+
+
+@app.route("/stats", methods=["GET"])
+def get_stats():
+    """Report hit/miss counters of the local caches and background job metrics."""
+    stats = {
+        "place_details_cache": registry.get_details_cache().stats(),
+        "nearby_search_cache": registry.get_nearby_cache().stats(),
+        "photo_store": registry.get_photo_store().stats(),
+        "background_jobs": registry.get_background_executor().metrics(),
+        "cluster_model_cache": registry.get_model().model_cache.stats(),
+        "preferences": registry.get_preferences().stats(),
+    }
+    gmaps = registry.peek("gmaps")
+    if gmaps is not None and gmaps.client_stats() is not None:
+        stats["maps_keys"] = gmaps.client_stats()
+    # Don't connect to the storage backend just to report on it
+    storage = registry.peek("storage")
+    if storage is not None:
+        stats["storage"] = storage.metrics()
+    return jsonify(stats), 200
+
+
 @app.route("/photos/<place_id>/<photo_id>")
 def get_photos(place_id, photo_id):
+    try:
+        path = registry.get_photo_service().get_photo(place_id, photo_id)
+    except Exception as e:
+        app.logger.error(f"Error fetching photo {place_id}/{photo_id}: {str(e)}")
+        return jsonify({"error": "Photo could not be fetched"}), 502
+    if not path:
+        return jsonify({"error": "Photo not found"}), 404
+    # Conditional responses with validators, so clients revalidate instead of
+    # downloading the same JPEG again
     return send_file(
-        os.path.join("photos", place_id, photo_id + ".jpg"), mimetype="image/jpeg"
+        path,
+        mimetype="image/jpeg",
+        conditional=True,
+        etag=True,
+        last_modified=os.path.getmtime(path),
+        max_age=config.PHOTO_CACHE_MAX_AGE_SECONDS,
     )
 
 
@@ -0,0 +1,93 @@
+"""
+Benchmark the NumPy K-Prototypes engine against kmodes on synthetic restaurants.
+
+Usage:
+    python benchmarks/benchmark_kprototypes.py [--sizes 60 1000 10000] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from kmodes.kprototypes import KPrototypes
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import config
+from utils.kprototypes import FastKPrototypes
+
+
+def make_restaurants(n_restaurants: int, seed: int = 0):
+    """
+    Feature matrix shaped like UserInterestPredictor.build_features output:
+    the numerical columns followed by 0/1 categorical columns.
+    """
+    rng = np.random.default_rng(seed)
+    numerical = np.column_stack(
+        [
+            rng.integers(1, 5, n_restaurants),  # price_level
+            rng.uniform(1, 5, n_restaurants).round(1),  # rating
+            rng.integers(0, 5000, n_restaurants),  # total_user_ratings
+            38.85 + rng.normal(0, 0.05, n_restaurants),  # lat
+            -77.33 + rng.normal(0, 0.05, n_restaurants),  # lng
+        ]
+    )
+    # Correlated features, so there is some structure to find
+    groups = rng.integers(0, 4, n_restaurants)
+    group_rates = rng.uniform(0.1, 0.9, (4, len(config.CATEGORICAL_COLUMNS)))
+    categorical = (
+        rng.uniform(size=(n_restaurants, len(config.CATEGORICAL_COLUMNS)))
+        < group_rates[groups]
+    ).astype(int)
+    X = np.hstack([numerical, categorical]).astype(object)
+    categorical_indices = list(range(numerical.shape[1], X.shape[1]))
+    return X, categorical_indices
+
+
+def time_fit(build, X, categorical, repeat):
+    """Return (best seconds, cost, n_clusters) over `repeat` fits."""
+    best = None
+    for _ in range(repeat):
+        model = build()
+        start = time.perf_counter()
+        labels = model.fit_predict(X, categorical=categorical)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, float(model.cost_), len(set(np.asarray(labels).tolist()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[60, 250, 1000, 5000, 10000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--clusters", type=int, default=4)
+    args = parser.parse_args()
+
+    engines = {
+        "kmodes (Cao)": lambda: KPrototypes(
+            n_clusters=args.clusters, init="Cao", verbose=0
+        ),
+        "numpy": lambda: FastKPrototypes(n_clusters=args.clusters, random_state=0),
+        "numpy (auto k)": lambda: FastKPrototypes(n_clusters="auto", random_state=0),
+    }
+    print(
+        f"{'rows':>6}  {'engine':<16}{'seconds':>10}{'cost':>16}{'k':>4}{'speedup':>9}"
+    )
+    for size in args.sizes:
+        X, categorical = make_restaurants(size)
+        baseline = None
+        for name, build in engines.items():
+            seconds, cost, n_clusters = time_fit(build, X, categorical, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"{size:>6}  {name:<16}{seconds:>10.3f}{cost:>16.1f}"
+                f"{n_clusters:>4}{baseline / seconds:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
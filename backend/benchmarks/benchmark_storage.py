@@ -0,0 +1,74 @@
+"""
+Measure upload and read latency/throughput of the restaurant storage backends.
+
+Usage:
+    python benchmarks/benchmark_storage.py [--backends memory sqlite firestore]
+        [--restaurants 60] [--users 20] [--reads 50]
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import config
+from utils.storage import SQLiteStore, create_storage
+
+
+def make_restaurants(n_restaurants: int, seed: int = 0):
+    """Records shaped like the clustered restaurants uploaded by /search."""
+    rng = random.Random(seed)
+    return [
+        {
+            "place_id": f"place-{i}",
+            "cluster": rng.randrange(4),
+            "restaurant_name": f"Restaurant {i}",
+            "formatted_address": f"{i} Main Street",
+            "rating": round(rng.uniform(1, 5), 1),
+            "price_level": rng.randrange(1, 5),
+            "review_vector": [rng.random() for _ in range(300)],
+            "review_tokens": rng.randrange(50, 500),
+            "reviews": " ".join("review" for _ in range(200)),
+        }
+        for i in range(n_restaurants)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["memory", "sqlite"])
+    parser.add_argument("--restaurants", type=int, default=60)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--reads", type=int, default=50)
+    args = parser.parse_args()
+
+    restaurants = make_restaurants(args.restaurants)
+    # A later page relabels a third of the restaurants
+    relabelled = [
+        dict(r, cluster=(r["cluster"] + 1) % 4) if i % 3 == 0 else r
+        for i, r in enumerate(restaurants)
+    ]
+    for backend in args.backends:
+        if backend == "sqlite":
+            store = SQLiteStore(path=os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+        else:
+            store = create_storage(backend)
+        users = [f"bench-user-{i}" for i in range(args.users)]
+        for user_id in users:
+            store.upload_data(restaurants, user_id=user_id)  # Full upload
+            store.upload_data(relabelled, user_id=user_id)  # Delta upload
+        for _ in range(args.reads):
+            for user_id in users:
+                # A read from the backend, then a cached swipe
+                store.data_cache.invalidate(user_id)
+                store.get_data(user_id, fields=config.SUGGESTION_FIELDS)
+                store.get_data(user_id, fields=config.SUGGESTION_FIELDS)
+        print(json.dumps(store.metrics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
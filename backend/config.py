@@ -1,46 +1,147 @@
+import os
+
+# Lazy initialization: heavy clients (spaCy, Google Maps, Firebase) are built on
+# first use. Set LAZY_INIT=0 to build them all at startup, or
+# WARM_UP_IN_BACKGROUND=1 to build them on a background thread right away.
+LAZY_INIT = os.getenv("LAZY_INIT", "1") != "0"
+WARM_UP_IN_BACKGROUND = os.getenv("WARM_UP_IN_BACKGROUND", "0") == "1"
+
+SEARCH_JOB_TTL_SECONDS = 3600  # How long finished search jobs stay queryable
+BACKGROUND_WORKERS = 2  # Threads fetching pages, clustering and uploading
+BACKGROUND_QUEUE_SIZE = 16  # Searches waiting for a worker before rejecting
+STREAM_PAGE_TIMEOUT_SECONDS = 30  # Idle wait for the next streamed page
+
 IMAGE_EXPIRY_SECONDS = 3600  # Image expiry time
+PHOTO_DIR = "photos"  # Downloaded place photos, one directory per place_id
+PHOTO_STORE_MAX_BYTES = 500 * 1024 * 1024  # Disk budget of the photo store
+PHOTO_CACHE_MAX_AGE_SECONDS = 24 * 3600  # Browser/proxy caching of photos
+PHOTO_BASE_URL = "http://127.0.0.1:5000/photos"
+PHOTOS_PER_PLACE = 3
+PHOTO_PREFETCH_CARDS = 3  # Prefetch photos of the next few cards in the deck
+PHOTO_PREFETCH_WORKERS = 4
+PHOTO_PREFETCH_MAX_PENDING = 64  # Queued prefetches beyond this are dropped
+PHOTO_REFERENCES_MAX_PLACES = 5000  # Places whose photo references stay in memory
+DETAIL_FETCH_WORKERS = 8  # Concurrent place details requests per page
+PAGE_TOKEN_RETRIES = 3  # Retries while a next_page_token is not yet valid
+PAGE_TOKEN_DELAY_SECONDS = 1.0
+PAGE_TOKEN_TTL_SECONDS = 120  # Google page tokens are only valid for a few minutes
+COVERAGE_SEARCH_WORKERS = 9  # Concurrent sub-searches of a coverage search
+COVERAGE_PAGES_PER_POINT = 1  # Pages each sub-search reads, 1 avoids token waits
+COVERAGE_MAX_GRID = 5  # Largest grid x grid split a client may ask for
+COVERAGE_PAGE_SIZE = 20  # Restaurants per page of a coverage search's details
+
+# Google Maps requests are spread over every GOOGLE_MAPS_API_KEY_n
+MAPS_KEY_QPS = 10  # Requests per second each key may send
+MAPS_KEY_BURST = 20  # Requests a key may send at once after being idle
+MAPS_KEY_FAILURE_THRESHOLD = 3  # Consecutive failures before a key is rested
+MAPS_KEY_THROTTLE_COOLDOWN_SECONDS = 10  # Rest after OVER_QUERY_LIMIT or errors
+MAPS_KEY_DISABLE_SECONDS = 3600  # Rest after REQUEST_DENIED or OVER_DAILY_LIMIT
+MAPS_ACQUIRE_TIMEOUT_SECONDS = 10  # Longest wait for a key with quota left
+MAPS_HTTP_POOL_SIZE = 32  # Keep-alive connections shared by every key
+
+CACHE_PATH = "./cache/cache.sqlite3"  # Local cache shared by all workers
+DETAILS_CACHE_TTL_SECONDS = 24 * 3600  # Place details freshness window
+DETAILS_CACHE_MAX_ENTRIES = 5000  # LRU bound on cached place details
+
+# Nearby searches are snapped onto geohash tiles, each tile's pages cached together
+NEARBY_CACHE_TTL_SECONDS = 15 * 60  # Freshness window of a cached tile
+NEARBY_CACHE_MAX_ENTRIES = 2000
+TILE_RADIUS_BUCKETS = [500, 1000, 2000, 5000, 10000, 20000, 50000, 100000]
+TILE_SIZE_RATIO = 0.1  # Largest tile width relative to the search radius
+
+# Clustering
+N_CLUSTERS = 4  # Fixed number of clusters, or "auto" to pick k by silhouette
+CLUSTER_K_RANGE = (2, 8)  # Candidate k when N_CLUSTERS is "auto"
+CLUSTER_N_INIT = 4  # Random restarts per fit, the lowest cost one is kept
+CLUSTER_MAX_ITER = 100
+CLUSTER_SILHOUETTE_SAMPLE = 1000  # Rows scored when picking k
+CLUSTER_PROCESSES = min(4, os.cpu_count() or 1)  # Worker processes for restarts
+CLUSTER_PARALLEL_MIN_ROWS = 2000  # Smaller fits run in-process, pool overhead dominates
+CLUSTER_MODEL_CACHE_TTL_SECONDS = 3600  # How long fitted prototypes are reused
+CLUSTER_MODEL_CACHE_MAX_ENTRIES = 256  # Number of areas kept in memory
+CLUSTER_MODEL_MIN_OVERLAP = 0.5  # Restaurants shared with a cached fit to reuse it
+
+# Where clustered restaurants are stored: "firestore", "sqlite" or "memory"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "firestore")
+STORAGE_SQLITE_PATH = "./cache/restaurants.sqlite3"
 
 FIREBASE_ACCOUNT_KEY = "./utils/Hackathon Firebase Admin SDK.json"
 FIREBASE_COLLECTION = "(default)"
+FIRESTORE_BATCH_SIZE = 400  # Writes per batch, Firestore allows at most 500
+DATA_CACHE_REVALIDATE_SECONDS = 30  # Serve cached data this long before revalidating
+DATA_CACHE_MAX_ENTRIES = 1000  # Users whose restaurant data is kept in memory
+PREFERENCE_MAX_USERS = 10000  # Users whose swipe state is kept in memory
+SUGGESTION_TOP_K = 50  # Restaurants ranked when the caller gives no limit
+SUGGESTION_DEFAULT_LIMIT = 10  # Cards returned per /suggestion call
+SUGGESTION_MAX_LIMIT = 100  # Upper bound on offset + limit of one call
 
-FIELDS = [
+# Restaurant fields read back for /suggestion: ranking inputs and card content.
+# Raw reviews stay in Firestore, ranking uses the precomputed review vectors.
+SUGGESTION_FIELDS = [
+    "place_id",
+    "cluster",
+    "review_vector",
+    "review_tokens",
+    "restaurant_name",
+    "formatted_address",
+    "location",
+    "price_level",
+    "rating",
+    "total_user_ratings",
+    "phone_number",
     "website",
-    "takeout",
+    "editorial_summary",
+    "opening_hours",
+    "open_now",
+    "types",
+]
+
+# Default /suggestion card: what the swipe card displays
+SUGGESTION_CARD_FIELDS = [
+    "place_id",
+    "restaurant_name",
     "formatted_address",
-    "serves_breakfast",
-    "business_status",
-    "serves_wine",
-    "url",
-    "serves_vegetarian_food",
-    "vicinity",
-    "name",
-    "dine_in",
-    "geometry",
-    "user_ratings_total",
     "price_level",
-    "current_opening_hours",
-    "reviews",
-    "adr_address",
-    "serves_beer",
+    "rating",
+    "phone_number",
+    "editorial_summary",
+    "opening_hours",
+    "final_score",
+]
+
+# Place Details fields requested for every restaurant of a search: what the
+# swipe card, the clustering features and the review embeddings read, in a
+# single request per place.
+DETAIL_FIELDS = [
     "place_id",
+    "name",
+    "formatted_address",
+    "vicinity",
+    "geometry",
     "type",
-    "review",
-    "opening_hours",
-    "serves_brunch",
-    "permanently_closed",
-    "rating",
-    "formatted_phone_number",
-    "delivery",
-    "geometry/location",
+    "business_status",
     "photo",
-    "wheelchair_accessible_entrance",
-    "utc_offset",
+    "current_opening_hours",
+    "website",
+    "formatted_phone_number",
+    "price_level",
+    "rating",
+    "user_ratings_total",
     "editorial_summary",
+    "takeout",
+    "delivery",
+    "dine_in",
     "curbside_pickup",
-    "address_component",
     "reservable",
+    "serves_breakfast",
     "serves_lunch",
     "serves_dinner",
+    "serves_brunch",
+    "serves_vegetarian_food",
+    "serves_beer",
+    "serves_wine",
+    "wheelchair_accessible_entrance",
+    "reviews",
 ]
 
 DROP_COLUMNS = [
@@ -67,6 +168,23 @@ TEXT_COLUMNS = [
 
 NUMERICALS_COLUMNS = ["price_level", "rating", "total_user_ratings", "lat", "lng"]
 
+# Fixed vocabulary of one-hot encoded restaurant types. The order defines the
+# feature column order, only append to it.
+RESTAURANT_TYPES = [
+    "bar",
+    "cafe",
+    "establishment",
+    "food",
+    "liquor_store",
+    "meal_delivery",
+    "meal_takeaway",
+    "point_of_interest",
+    "restaurant",
+    "store",
+    "bakery",
+    "night_club",
+]
+
 CATEGORICAL_COLUMNS = [
     "curbside_pickup",
     "delivery",
@@ -81,14 +199,4 @@ CATEGORICAL_COLUMNS = [
     "serves_beer",
     "serves_wine",
     "wheelchair_accessible",
-    "bar",
-    "cafe",
-    "establishment",
-    "food",
-    "liquor_store",
-    "meal_delivery",
-    "meal_takeaway",
-    "point_of_interest",
-    "restaurant",
-    "store",
-]
+] + RESTAURANT_TYPES
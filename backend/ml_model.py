@@ -2,20 +2,189 @@ import pandas as pd
 import numpy as np
 import logging
 import os
+import threading
 from typing import List
 
-# Sklearn Packages
-from sklearn.metrics.pairwise import cosine_similarity
-
-# K-Prototypes
-from kmodes.kprototypes import KPrototypes
-
 # Import the config file
 import config
 
-from utils.helpers import Tools
+from utils.helpers import Tools, get_embedding
+from utils.type_encoder import TypeEncoder
+from utils.cluster_prototypes import ClusterModelCache, ClusterPrototypes
+from utils.kprototypes import FastKPrototypes
+from utils.vector_index import VectorIndex
+from utils.restaurant_record import Record, records_to_frame, stack_column
 
 tools = Tools()
+type_encoder = TypeEncoder()
+
+
+class IncrementalClusteringState:
+    """
+    Clustering progress of one search whose pages are clustered as they arrive.
+
+    Attributes:
+        restaurant_df (pd.DataFrame): Every restaurant clustered so far, with
+            cluster labels and review embeddings.
+        features_df (pd.DataFrame): The clustering features of restaurant_df.
+        prototypes (ClusterPrototypes): The current cluster centers.
+        area (str): Key of the searched area the model is cached under.
+    """
+
+    def __init__(self, restaurant_df, features_df, prototypes, area=None):
+        self.restaurant_df = restaurant_df
+        self.features_df = features_df
+        self.prototypes = prototypes
+        self.area = area
+
+    @property
+    def place_ids(self) -> set:
+        return set(self.restaurant_df["place_id"])
+
+
+class RestaurantDeck:
+    """
+    The restaurants a user swipes through, with a vector index over their
+    review embeddings for top-k retrieval.
+
+    Built once per version of the user's clustered data and reused across
+    swipes.
+
+    Attributes:
+        source (List[dict]): The records the deck was built from.
+        frame (pd.DataFrame): The restaurants, without their raw vectors.
+        index (VectorIndex): Review embeddings keyed by place_id.
+        token_counts (np.ndarray): Review token count of each restaurant.
+        cluster_names (List[str]): The distinct clusters.
+        cluster_codes (np.ndarray): Index into cluster_names of each restaurant.
+    """
+
+    def __init__(self, cluster_data: List[dict]):
+        self.source = cluster_data
+        frame = records_to_frame(cluster_data)
+        if self.has_review_vectors(cluster_data):
+            # Stacked straight from the records, the frame never holds them
+            vectors = stack_column(cluster_data, "review_vector")
+            self.token_counts = stack_column(cluster_data, "review_tokens")
+        elif "extended_reviews" in frame.columns:
+            # Data clustered before review vectors were stored
+            vectors, token_counts = tools.embed_texts(
+                frame["extended_reviews"].fillna("").tolist()
+            )
+            self.token_counts = np.asarray(token_counts, dtype=np.float32)
+        else:
+            dim = get_embedding().vocab.vectors.shape[1]
+            vectors = np.zeros((len(frame), dim), dtype=np.float32)
+            self.token_counts = np.zeros(len(frame), dtype=np.float32)
+        self.index = VectorIndex(frame["place_id"].tolist(), vectors)
+        self.frame = frame.drop(columns=["review_vector"], errors="ignore")
+        self.cluster_names, self.cluster_codes = np.unique(
+            frame["cluster"].astype(str).to_numpy(), return_inverse=True
+        )
+        self.cluster_names = self.cluster_names.tolist()
+
+    def __len__(self):
+        return len(self.frame)
+
+    @staticmethod
+    def has_review_vectors(cluster_data: List[dict]) -> bool:
+        """Check whether every restaurant carries a precomputed review vector."""
+        return all(
+            record.get("review_vector") is not None
+            and record.get("review_tokens") is not None
+            for record in cluster_data
+        )
+
+
+class UserPreferences:
+    """
+    Running preference state of one user.
+
+    Liked and disliked review embeddings are kept as token-weighted sums, the
+    embedding of all liked (disliked) reviews concatenated up to scale, and
+    every cluster carries the number of likes minus dislikes it received. A
+    swipe therefore updates two vectors and one counter instead of
+    re-embedding everything the user ever swiped.
+
+    Attributes:
+        liked (dict): Liked place_ids, in swipe order.
+        disliked (dict): Disliked place_ids, in swipe order.
+        deck (RestaurantDeck): The restaurants the sums refer to.
+        like_sum (np.ndarray): Token-weighted sum of liked review embeddings.
+        dislike_sum (np.ndarray): Token-weighted sum of disliked review embeddings.
+        cluster_weights (np.ndarray): Likes minus dislikes per deck cluster.
+        swiped (np.ndarray): Mask of the deck rows already liked or disliked.
+        lock (threading.Lock): Serialises the swipes of the user.
+    """
+
+    def __init__(self):
+        self.liked = {}
+        self.disliked = {}
+        self.deck = None
+        self.like_sum = None
+        self.dislike_sum = None
+        self.cluster_weights = None
+        self.swiped = None
+        self.lock = threading.Lock()
+
+    def attach(self, cluster_data: List[dict]):
+        """
+        Point the state at the user's current clustered data, rebuilding the
+        deck and the sums only when the data changed.
+        """
+        if self.deck is not None and self.deck.source is cluster_data:
+            return
+        self.deck = RestaurantDeck(cluster_data)
+        self._rebuild()
+
+    def _rebuild(self):
+        self.like_sum = np.zeros(self.deck.index.dim, dtype=np.float32)
+        self.dislike_sum = np.zeros(self.deck.index.dim, dtype=np.float32)
+        self.cluster_weights = np.zeros(len(self.deck.cluster_names))
+        self.swiped = np.zeros(len(self.deck), dtype=bool)
+        for place_id in self.liked:
+            self._add(place_id, liked=True)
+        for place_id in self.disliked:
+            self._add(place_id, liked=False)
+
+    def _add(self, place_id, liked: bool):
+        row = self.deck.index.row_of.get(place_id)
+        if row is None:
+            return  # Not part of the current data
+        weighted = self.deck.token_counts[row] * self.deck.index.vectors[row]
+        if liked:
+            self.like_sum += weighted
+            self.cluster_weights[self.deck.cluster_codes[row]] += 1
+        else:
+            self.dislike_sum += weighted
+            self.cluster_weights[self.deck.cluster_codes[row]] -= 1
+        self.swiped[row] = True
+
+    def swipe(self, like_place_id: list = (), dislike_place_id: list = ()):
+        """Apply new swipes, ignoring the ones already counted."""
+        for place_id in like_place_id:
+            if place_id not in self.liked:
+                self.liked[place_id] = True
+                self._add(place_id, liked=True)
+        for place_id in dislike_place_id:
+            if place_id not in self.disliked:
+                self.disliked[place_id] = True
+                self._add(place_id, liked=False)
+
+    def sync(self, like_place_id: list, dislike_place_id: list):
+        """
+        Apply the full swipe history sent by a client. Only swipes that are
+        new since the last call update the sums; if the history no longer
+        contains swipes seen before (the client started over) the state is
+        rebuilt from it.
+        """
+        likes, dislikes = set(like_place_id), set(dislike_place_id)
+        if not (likes.issuperset(self.liked) and dislikes.issuperset(self.disliked)):
+            self.liked = dict.fromkeys(like_place_id, True)
+            self.disliked = dict.fromkeys(dislike_place_id, True)
+            self._rebuild()
+        else:
+            self.swipe(like_place_id, dislike_place_id)
 
 
 class UserInterestPredictor:
@@ -24,69 +193,71 @@ class UserInterestPredictor:
     based on their previous preferences.
 
     Uses K-Prototypes clustering algorithm to group similar restaurants and
-    cosine similarity to rank recommendations.
+    cosine similarity to rank recommendations. Every fit uses its own
+    K-Prototypes model, so concurrent searches never share model state, and
+    fitted prototypes are cached per area for later searches to reuse.
     """
 
-    def __init__(self):
+    def __init__(self, model_cache: ClusterModelCache = None):
         """
-        Initialize the predictor with KPrototypes clustering algorithm.
-        Using 4 clusters with Cao initialization method.
+        Initialize the predictor with a cache of fitted cluster models.
+
+        Args:
+            model_cache (ClusterModelCache, optional): Cache of prototypes per
+                area, a private one is created by default
         """
-        self.kproto = KPrototypes(n_clusters=4, init="Cao", verbose=1)
+        self.model_cache = model_cache or ClusterModelCache()
+
+    @staticmethod
+    def new_kproto() -> FastKPrototypes:
+        """
+        Create a K-Prototypes model for one fit.
+        Using config.N_CLUSTERS clusters, "auto" picks k by silhouette.
+        """
+        return FastKPrototypes(n_clusters=config.N_CLUSTERS)
 
     def predict(
-        self, cluster_data: List[dict], like_place_id: list, dislike_place_id: list
+        self,
+        cluster_data: List[dict],
+        like_place_id: list,
+        dislike_place_id: list,
+        preferences: UserPreferences = None,
+        delta: bool = False,
+        top_k: int = config.SUGGESTION_TOP_K,
     ):
         """
         Predicts restaurants that might interest a user based on their previous choices.
 
         This function works by:
-        1. Converting input data to a DataFrame
-        2. Creating a weighted scoring system based on cluster preferences
-        3. Adjusting weights based on liked/disliked restaurants
-        4. Ranking remaining restaurants using the weighted scores
+        1. Attaching the user's preference state to the clustered data
+        2. Applying the new likes/dislikes to the running embedding sums
+           and cluster weights
+        3. Ranking remaining restaurants using the weighted scores
 
         Args:
             cluster_data (List[dict]): Pre-clustered restaurant data
             like_place_id (list): List of restaurant IDs the user has liked
             dislike_place_id (list): List of restaurant IDs the user has disliked
+            preferences (UserPreferences, optional): The user's state kept
+                between calls, a fresh one if not given
+            delta (bool): Whether the lists only hold the swipes since the
+                previous call rather than the full history
+            top_k (int, optional): Number of recommendations to return, every
+                remaining restaurant if None
 
         Returns:
             pd.DataFrame: Sorted restaurant recommendations with ranking scores
         """
-        cluster_data = pd.DataFrame(cluster_data)
-        cluster_weights_dict = {
-            str(cluster): 0 for cluster in cluster_data["cluster"].unique()
-        }
-        if like_place_id:
-            like_cluster_values_counts = (
-                tools.get_place_id_data(data=cluster_data, place_id_list=like_place_id)[
-                    "cluster"
-                ]
-                .value_counts()
-                .to_dict()
-            )
-            for cluster, count in like_cluster_values_counts.items():
-                cluster_weights_dict[str(cluster)] = count
-
-        if dislike_place_id:
-            dislike_cluster_values_counts = (
-                tools.get_place_id_data(
-                    data=cluster_data, place_id_list=dislike_place_id
-                )["cluster"]
-                .value_counts()
-                .to_dict()
-            )
-            for cluster, count in dislike_cluster_values_counts.items():
-                cluster_weights_dict[str(cluster)] -= count
-
-        # STEP 3: Rank the filtered restaurants based on similarity
-        rank_data = self.rank(
-            cluster_data, cluster_weights_dict, like_place_id, dislike_place_id
-        )
-        return rank_data
-
-    def clustering(self, restaurants_data: List[dict]) -> pd.DataFrame:
+        preferences = preferences or UserPreferences()
+        with preferences.lock:
+            preferences.attach(cluster_data)
+            if delta:
+                preferences.swipe(like_place_id, dislike_place_id)
+            else:
+                preferences.sync(like_place_id, dislike_place_id)
+            return self.rank(preferences, top_k=top_k)
+
+    def clustering(self, restaurants_data: List[Record]) -> pd.DataFrame:
         """
         Performs clustering on restaurant data to group similar restaurants.
 
@@ -96,74 +267,193 @@ class UserInterestPredictor:
         3. Identifying categorical features for K-Prototypes
         4. Applying K-Prototypes clustering algorithm
         5. Assigning cluster labels to restaurants
+        6. Embedding each restaurant's reviews once, so that ranking on the
+           swipe path never has to run the NLP pipeline
 
         Args:
-            restaurants_data (List[dict]): Raw restaurant data containing features
+            restaurants_data (List[Record]): RestaurantRecords (or their dict
+                form) containing features
 
         Returns:
             pd.DataFrame: Original data with added cluster assignments
         """
-        # STEP 1: Preprocess the data for clustering
-        restaurant_df = pd.DataFrame(restaurants_data)
-        processed_data = self.preprocess_data(restaurant_df)
+        # STEP 1-2: Preprocess the data and drop the text columns
+        restaurant_df, features_df = self.build_features(restaurants_data)
 
-        # STEP 2: Drop text columns that shouldn't be used for clustering
+        # STEP 3-4: Perform clustering
+        cluster_labels, _ = self.fit_clusters(features_df)
+
+        # STEP 5: Add place_id and cluster assignments back to the data
+        restaurant_df["cluster"] = cluster_labels
+        logging.info(f"Clustering completed with {len(set(cluster_labels))} clusters.")
+
+        # STEP 6: Precompute review embeddings stored alongside the clusters
+        self.add_review_embeddings(restaurant_df)
+
+        return restaurant_df
+
+    def cluster_incremental(
+        self,
+        restaurants_data: List[Record],
+        state: IncrementalClusteringState = None,
+        area: str = None,
+    ) -> IncrementalClusteringState:
+        """
+        Clusters restaurant data page by page, as the search results arrive.
+
+        The first page is clustered with a full K-Prototypes fit, unless a
+        model fitted on the same area is cached, in which case the page is
+        only labelled against its prototypes. Later pages are labelled against
+        the current prototypes, which are then refined with one
+        assignment/update pass over everything clustered so far, instead of
+        refitting from scratch. Only the new restaurants are preprocessed and
+        embedded. The refined prototypes are cached for the area.
+
+        Args:
+            restaurants_data (List[Record]): RestaurantRecords of the new page
+            state (IncrementalClusteringState, optional): The state returned
+                for the previous pages, None for the first page
+            area (str, optional): Key of the searched area (see
+                utils.geo_tiles.snap_to_tile), no caching without it
+
+        Returns:
+            IncrementalClusteringState: Every restaurant clustered so far
+        """
+        if state is not None:
+            seen = state.place_ids
+            restaurants_data = [r for r in restaurants_data if r["place_id"] not in seen]
+            if not restaurants_data:
+                return state
+
+        restaurant_df, features_df = self.build_features(restaurants_data)
+        self.add_review_embeddings(restaurant_df)
+
+        if state is None:
+            place_ids = restaurant_df["place_id"].tolist()
+            prototypes = self.model_cache.get(area, place_ids) if area else None
+            if prototypes is not None:
+                cluster_labels = prototypes.assign(features_df)
+                logging.info(f"Reused the cached clusters of area {area}.")
+            else:
+                cluster_labels, gamma = self.fit_clusters(features_df)
+                prototypes = ClusterPrototypes.from_labels(
+                    features_df,
+                    cluster_labels,
+                    config.CATEGORICAL_COLUMNS,
+                    gamma=gamma,
+                )
+                logging.info(
+                    f"Fitted {prototypes.n_clusters} clusters on the first page."
+                )
+            restaurant_df["cluster"] = cluster_labels
+            state = IncrementalClusteringState(
+                restaurant_df, features_df, prototypes, area=area
+            )
+            self.cache_model(state)
+            return state
+
+        features_df = pd.concat(
+            [
+                state.features_df,
+                features_df.reindex(columns=state.features_df.columns, fill_value=0),
+            ],
+            ignore_index=True,
+        )
+        restaurant_df = pd.concat(
+            [state.restaurant_df, restaurant_df], ignore_index=True
+        )
+        restaurant_df["cluster"] = state.prototypes.refine(features_df)
+        logging.info(f"Refined clusters with {len(restaurants_data)} restaurants.")
+        state = IncrementalClusteringState(
+            restaurant_df, features_df, state.prototypes, area=state.area
+        )
+        self.cache_model(state)
+        return state
+
+    def cache_model(self, state: IncrementalClusteringState):
+        """Caches the current prototypes of a search for its area."""
+        if state.area:
+            self.model_cache.put(state.area, state.place_ids, state.prototypes)
+
+    def build_features(self, restaurants_data: List[Record]):
+        """
+        Builds the clustering features of raw restaurant data.
+
+        Args:
+            restaurants_data (List[Record]): RestaurantRecords (or their dict
+                form) containing features
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: The restaurant data with encoded
+            types, coordinates and extended reviews, and its clustering features
+        """
+        restaurant_df = self.one_hot_encode_types(records_to_frame(restaurants_data))
+        processed_data = self.preprocess_data(restaurant_df)
         features_df = processed_data.drop(columns=config.TEXT_COLUMNS)
-        feature_matrix = features_df.values
+        return restaurant_df, features_df
+
+    def fit_clusters(self, features_df: pd.DataFrame):
+        """
+        Fits K-Prototypes on the clustering features.
+
+        K-Prototypes requires explicit identification of categorical features.
+
+        Args:
+            features_df (pd.DataFrame): Features from build_features
 
-        # STEP 3: Identify categorical features for K-Prototypes algorithm
-        # K-Prototypes requires explicit identification of categorical features
+        Returns:
+            Tuple[np.ndarray, float]: The cluster labels and the categorical
+            weight (gamma) used by the fit
+        """
         categorical_indices = [
             features_df.columns.get_loc(col)
             for col in config.CATEGORICAL_COLUMNS
             if col in features_df.columns
         ]
-        # STEP 4: Perform clustering
-        cluster_labels = self.kproto.fit_predict(
-            feature_matrix, categorical=categorical_indices
+        kproto = self.new_kproto()
+        cluster_labels = kproto.fit_predict(
+            features_df.values, categorical=categorical_indices
         )
+        return cluster_labels, kproto.gamma
 
-        # STEP 5: Add place_id and cluster assignments back to the data
-        restaurant_df["cluster"] = cluster_labels
-        logging.info(f"Clustering completed with {len(set(cluster_labels))} clusters.")
-
-        return restaurant_df
+    def add_review_embeddings(self, restaurant_df: pd.DataFrame):
+        """Embeds each restaurant's reviews into `restaurant_df` in place."""
+        vectors, token_counts = tools.embed_texts(
+            restaurant_df["extended_reviews"].tolist()
+        )
+        restaurant_df["review_vector"] = vectors.tolist()
+        restaurant_df["review_tokens"] = token_counts
 
     def preprocess_data(self, restaurant_df: pd.DataFrame) -> pd.DataFrame:
         """
         Preprocesses raw restaurant data for clustering analysis.
 
         Preprocessing steps include:
-        1. One-hot encoding of restaurant types
-        2. Storing place IDs for reference
-        3. Extracting geographic coordinates
-        4. Processing text reviews
-        5. Cleaning data types (converting boolean to int, handling NA values)
-        6. Dropping unnecessary columns
+        1. Extracting geographic coordinates
+        2. Processing text reviews
+        3. Cleaning data types (converting boolean to int, handling NA values)
+        4. Dropping unnecessary columns
+
+        Coordinates and extended reviews are added to `restaurant_df` in place.
+        No state is kept on the predictor, so concurrent calls are safe.
 
         Args:
-            restaurant_df (pd.DataFrame): Raw restaurant data frame
+            restaurant_df (pd.DataFrame): Restaurant data frame with one-hot
+                encoded types (see one_hot_encode_types)
 
         Returns:
             pd.DataFrame: Cleaned and processed data ready for clustering
         """
-
-        # STEP 2: One-hot encode restaurant types
-        restaurant_df = self.one_hot_encode_types(restaurant_df)
-
-        # Store place_ids for later reference
-        self.place_id_list = restaurant_df["place_id"].tolist()
-
-        # STEP 3: Extract latitude and longitude from location
+        # STEP 1: Extract latitude and longitude from location
         restaurant_df["lat"] = restaurant_df["location"].apply(lambda x: x["lat"])
         restaurant_df["lng"] = restaurant_df["location"].apply(lambda x: x["lng"])
 
-        # STEP 4: Process reviews into extended text
+        # STEP 2: Process reviews into extended text
         restaurant_df["extended_reviews"] = restaurant_df["reviews"].apply(
             lambda x: tools.extract_review(x)
         )
 
-        # STEP 5: Clean and transform the data
+        # STEP 3: Clean and transform the data
         df_clean = restaurant_df.drop(columns=config.DROP_COLUMNS, inplace=False).copy()
 
         # Convert boolean columns to integers (1/0)
@@ -186,10 +476,10 @@ class UserInterestPredictor:
         Creates binary features for each restaurant type using one-hot encoding.
 
         The encoding process:
-        1. Collects all unique restaurant types from the dataset
-        2. Creates a binary matrix for efficient encoding
-        3. Sets values to 1 where a restaurant has a specific type
-        4. Adds encoded columns to the original dataframe
+        1. Encodes every restaurant's types against the fixed type vocabulary
+           (config.RESTAURANT_TYPES) in a single vectorized pass
+        2. Adds the encoded columns to the dataframe in one concat, in
+           vocabulary order so that features from different calls line up
 
         Args:
             df (pd.DataFrame): Restaurant data with 'types' column containing lists
@@ -197,107 +487,54 @@ class UserInterestPredictor:
         Returns:
             pd.DataFrame: Original data with added binary type columns
         """
-        # STEP 1: Collect all unique restaurant types across all restaurants
-        types_set = set()
-        df["types"].map(lambda x: types_set.update(x))
-        new_cols = sorted(types_set)
-
-        # STEP 2: Create a binary matrix for one-hot encoding
-        matrix = np.zeros((df.shape[0], len(new_cols)), dtype=int)
+        types_df = type_encoder.transform_frame(df, column="types")
+        df = df.drop(columns=types_df.columns, errors="ignore")
+        return pd.concat([df, types_df], axis=1)
 
-        # STEP 3: Fill the matrix with 1s where restaurants have the corresponding type
-        for index, row in df.iterrows():
-            for col in row["types"]:
-                if col in new_cols:
-                    matrix[index, new_cols.index(col)] = 1
-
-        # STEP 4: Add the one-hot encoded columns to the dataframe
-        for i in range(len(new_cols)):
-            df[new_cols[i]] = matrix[:, i]
-
-        return df
-
-    def rank(
-        self,
-        data: pd.DataFrame,
-        cluster_weights_dict: dict,
-        like_place_id: list,
-        dislike_place_id: list,
-    ) -> pd.DataFrame:
+    def rank(self, preferences: UserPreferences, top_k: int = None) -> pd.DataFrame:
         """
         Ranks restaurants based on user preferences and similarity scores.
 
         Ranking process:
-        1. Calculates text similarity between restaurant reviews
+        1. Calculates review similarity with the liked and disliked sums
         2. Considers both positive (liked) and negative (disliked) preferences
         3. Applies cluster weights based on user history
         4. Combines similarity scores with cluster weights
-        5. Sorts restaurants by final composite score
+        5. Selects the top_k restaurants by final composite score
 
         Args:
-            data (pd.DataFrame): Restaurant dataset with clusters
-            cluster_weights_dict (dict): Weight for each cluster based on preferences
-            like_place_id (list): IDs of liked restaurants
-            dislike_place_id (list): IDs of disliked restaurants
+            preferences (UserPreferences): The user's state, attached to a deck
+            top_k (int, optional): Number of restaurants to return, every
+                remaining restaurant if None
 
         Returns:
             pd.DataFrame: Sorted restaurants with similarity and ranking scores
         """
-        # Initialize similarity score lists for both liked and disliked restaurants
-        like_cosine_similarity_list = []
-        dislike_cosine_similarity_list = []
+        deck = preferences.deck
 
-        # Extract subsets of data for liked and disliked restaurants
-        like_data = tools.get_place_id_data(data, like_place_id)
-        dislike_data = tools.get_place_id_data(data, dislike_place_id)
+        # SIMILARITY CALCULATION: One matrix-vector product per preference
+        # Higher positive values indicate a stronger match to user preferences,
+        # higher negative values indicate similarity to what the user dislikes
+        like_similarity = deck.index.cosine_similarities(preferences.like_sum)
+        dislike_similarity = deck.index.cosine_similarities(preferences.dislike_sum)
 
-        # FILTERING STEP: Remove restaurants that the user has already rated
-        filter_data = data[~data["place_id"].isin(like_place_id + dislike_place_id)]
-
-        # EMBEDDING GENERATION: Create text embeddings from concatenated reviews
-        like_reviews = like_data["extended_reviews"].str.cat(sep=" ")
-        like_reviews_embedding = tools.get_vector(like_reviews)
-
-        dislike_reviews = dislike_data["extended_reviews"].str.cat(sep=" ")
-        dislike_reviews_embedding = tools.get_vector(dislike_reviews)
-
-        # SIMILARITY CALCULATION: Compute similarity scores for each candidate restaurant
-        for reviews in filter_data["extended_reviews"]:
-            reviews_embedding = tools.get_vector(reviews)
-
-            # Calculate positive similarity (to liked restaurants)
-            # Higher values indicate stronger match to user preferences
-            like_cosine_similarity_list.append(
-                cosine_similarity([like_reviews_embedding], [reviews_embedding])[0][0]
-            )
-
-            # Calculate negative similarity (to disliked restaurants)
-            # Higher values indicate similarity to what user dislikes
-            dislike_cosine_similarity_list.append(
-                cosine_similarity([dislike_reviews_embedding], [reviews_embedding])[0][
-                    0
-                ]
-            )
-
-        # Create a copy to avoid pandas warning
-        filter_data = filter_data.copy()
         # SCORE COMPUTATION: Calculate net similarity score
         # Subtracting dislike similarity from like similarity to balance preferences
-        filter_data["similarity"] = (
-            np.array(like_cosine_similarity_list) * 100
-            - np.array(dislike_cosine_similarity_list) * 100
-        ).tolist()
-
-        # Store individual similarity components for analysis
-        filter_data["positive_similarity"] = like_cosine_similarity_list
-        filter_data["negative_similarity"] = dislike_cosine_similarity_list
+        similarity = like_similarity * 100 - dislike_similarity * 100
 
         # FINAL RANKING: Combine cluster weights with similarity scores
         # This creates a composite score that considers both content similarity
         # and cluster-based user preference patterns
-        filter_data["final_score"] = (
-            filter_data["cluster"].astype(str).map(cluster_weights_dict)
-            + filter_data["similarity"]
-        )
+        final_score = preferences.cluster_weights[deck.cluster_codes] + similarity
+
+        # SELECTION STEP: Best restaurants the user has not rated yet,
+        # without sorting the whole deck
+        rows = deck.index.top_k(final_score, top_k, exclude=preferences.swiped)
+        filter_data = deck.frame.iloc[rows].copy()
+        filter_data["similarity"] = similarity[rows]
 
-        return filter_data.sort_values(by="final_score", ascending=False)
+        # Store individual similarity components for analysis
+        filter_data["positive_similarity"] = like_similarity[rows]
+        filter_data["negative_similarity"] = dislike_similarity[rows]
+        filter_data["final_score"] = final_score[rows]
+        return filter_data
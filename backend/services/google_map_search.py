@@ -2,54 +2,68 @@ import os
 import sys
 
 import time, threading, logging, googlemaps, unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from typing import List
-from datetime import datetime, timedelta
+from typing import List, Optional
+from urllib.parse import quote, unquote
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from utils.geo_tiles import snap_to_tile, geohash_center
+from utils.restaurant_record import RestaurantRecord
+from services.maps_client_pool import MapsClientPool
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
-GOOGLE_MAPS_API_KEY = None
+TILE_TOKEN_PREFIX = "tile"  # Page tokens that point into the nearby tile cache
 
 
-def validate_google_api_key() -> str:
-    tries = 0
-    key_idx = 0
-    api_key = os.getenv(f"GOOGLE_MAPS_API_KEY_{key_idx}")
-    while api_key and tries < 10:
-        try:
-            # Try authenticating the API key
-            gmaps = googlemaps.Client(key=api_key)
-            geocode_result = gmaps.geocode(
-                "1600 Amphitheatre Parkway, Mountain View, CA"
-            )
-            if geocode_result:
-                return api_key
-            else:
-                logging.warning(
-                    "API key might be invalid or there was an issue with the request"
-                )
-        except Exception as e:
-            logging.error(e)
-            continue
-        key_idx += 1
-        api_key = os.getenv(f"GOOGLE_MAPS_API_KEY_{key_idx}")
-        tries += 1
-        time.sleep(1)  # Try again in 1 second
-    raise ValueError("You have no valid API keys.")
-
+class GoogleMapSearch:
+    def __init__(
+        self,
+        api_key=None,
+        max_workers=None,
+        details_cache=None,
+        nearby_cache=None,
+    ):
+        # The client is created on first use, see the client property
+        self.api_key = api_key
+        self._client = None
+        self._client_lock = threading.Lock()
+        # place_id -> photo references, LRU bounded (PHOTO_REFERENCES_MAX_PLACES)
+        self.photo_references = OrderedDict()
+        self._photo_references_lock = threading.Lock()
+        # Upper bound on concurrent detail requests per page
+        self.max_workers = max_workers or config.DETAIL_FETCH_WORKERS
+        # Optional read-through cache for place details (utils.cache)
+        self.details_cache = details_cache
+        # Optional geo-tiled cache for nearby search pages (utils.cache)
+        self.nearby_cache = nearby_cache
 
-# Find valid Google Maps API key
-GOOGLE_MAPS_API_KEY = validate_google_api_key()
+    @property
+    def client(self):
+        """
+        The Maps client, created on first use: a MapsClientPool over every
+        configured GOOGLE_MAPS_API_KEY_n, or over `api_key` alone if given.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = MapsClientPool(
+                        keys=[self.api_key] if self.api_key else None
+                    )
+        return self._client
 
+    @client.setter
+    def client(self, client):
+        self._client = client
 
-class GoogleMapSearch:
-    def __init__(self, api_key=GOOGLE_MAPS_API_KEY):
-        self.client = googlemaps.Client(key=api_key)
-        self.photos = {}  # Store download time for photos for automatic cleanup
+    def client_stats(self) -> Optional[dict]:
+        """Per-key usage and health of the client pool, None before first use."""
+        stats = getattr(self._client, "stats", None)
+        return stats() if callable(stats) else None
 
     def get_address_gecode(self, address) -> dict:
         """
@@ -78,107 +92,241 @@ class GoogleMapSearch:
             )
 
     def get_place_photos(self, place_id: str, raw_photos: list) -> list:
-        photo_num = 0
-        if raw_photos:
-            logging.debug(raw_photos)
-
-            # Create the list of urls to the photos
-            image_urls = [
-                f"http://127.0.0.1:5000/photos/{place_id}/{num}"
-                for num in range(photo_num)
-            ]
-
-            # If photos are already cached, skipped downloading
-            os.makedirs(f"photos/{place_id}", exist_ok=True)
-            for photo in raw_photos[:3]:
-                photo_reference = photo.get("photo_reference", "")
-                if photo_reference:
-                    photo_response = self.client.places_photo(
-                        photo_reference=photo_reference,
-                        max_width=400,
-                        max_height=400,
-                    )
-                    self.download_photo(place_id, photo_response, photo_num)
-                photo_num += 1
-
-            return image_urls
-
-        logging.info(f"{photo_num} photos downloaded successfully.")
-        return []
+        """
+        Record the photo references of a place without downloading them.
+        Photos are fetched on demand through fetch_photo (see PhotoService).
+        :param place_id: The place ID of the restaurant.
+        :param raw_photos: The "photos" field of the place details.
+        :return: A list of URLs of the place's photos on the /photos route.
+        """
+        photo_references = [
+            photo.get("photo_reference", "")
+            for photo in (raw_photos or [])[: config.PHOTOS_PER_PLACE]
+        ]
+        with self._photo_references_lock:
+            self.photo_references[place_id] = photo_references
+            self.photo_references.move_to_end(place_id)
+            while len(self.photo_references) > config.PHOTO_REFERENCES_MAX_PLACES:
+                self.photo_references.popitem(last=False)
+        if not any(photo_references):
+            return []
 
-    def download_photo(self, place_id, photo_response, photo_num):
-        self.photos[place_id] = datetime.now()
-        with open(f"photos/{place_id}/{photo_num}.jpg", "wb") as f:
-            for chunk in photo_response:
-                if chunk:
-                    f.write(chunk)
+        # Create the list of urls to the photos
+        return [
+            f"{config.PHOTO_BASE_URL}/{place_id}/{num}"
+            for num, reference in enumerate(photo_references)
+            if reference
+        ]
 
-    def cleanup_photos(self, place_id):
-        os.rmdir(f"photos/{place_id}")
-        self.photos.pop(place_id)
+    def get_photo_reference(self, place_id: str, photo_num: int) -> Optional[str]:
+        """
+        Look up the reference of a place's photo, falling back to the (cached)
+        place details when it was recorded by another process or evicted.
+        :param place_id: The place ID of the restaurant.
+        :param photo_num: Index of the photo.
+        :return: The photo reference or None if the place has no such photo.
+        """
+        with self._photo_references_lock:
+            photo_references = self.photo_references.get(place_id)
+            if photo_references is not None:
+                self.photo_references.move_to_end(place_id)
+        if photo_references is None:
+            raw_photos = self.get_info_by_place_id(place_id).get("photos", [])
+            self.get_place_photos(place_id, raw_photos)
+            with self._photo_references_lock:
+                photo_references = self.photo_references.get(place_id, [])
+        if 0 <= photo_num < len(photo_references):
+            return photo_references[photo_num] or None
+        return None
 
-    # Background cleanup thread
-    def auto_cleanup_photos(self):
-        while True:
-            time.sleep(10)  # Sweep interval
-            now = datetime.now()
-            expired_keys = [
-                key
-                for key, data in self.photos.items()
-                if now - data > timedelta(seconds=config.IMAGE_EXPIRY_SECONDS)
-            ]
-            for key in expired_keys:
-                self.cleanup_photos(key)
-                logging.debug(f"Deleted expired photos: {key}")
+    def fetch_photo(self, place_id: str, photo_num: int):
+        """
+        Request one photo of a place from the Places Photo API.
+        :param place_id: The place ID of the restaurant.
+        :param photo_num: Index of the photo.
+        :return: An iterator over the image bytes, or None if there is no such photo.
+        """
+        photo_reference = self.get_photo_reference(place_id, photo_num)
+        if not photo_reference:
+            return None
+        return self.client.places_photo(
+            photo_reference=photo_reference,
+            max_width=400,
+            max_height=400,
+        )
 
     def get_nearby_restaurants(
         self, location=None, keyword=None, radius=10000, page_token=None
     ):
         """
         Get nearby restaurants using latitude and longitude.
+
+        When a nearby cache is configured the search is snapped onto a
+        geohash tile (utils.geo_tiles) and the pages of the tile are cached
+        together, so any search falling into the same tile within the
+        freshness window reuses them. The returned page token then refers to
+        the cached tile. Tiles are fetched around their centre, which shifts
+        results by up to geo_tiles.max_centre_offset(radius).
         :param lat_lng: A dictionary containing latitude and longitude.
         :param radius: The distance (in meters) within which to return place results.
         :return: A list of places matching the query.
         """
-        if location is None:
+        if page_token is None and location is None:
             raise ValueError(
                 "Latitude and Longitude are required for searching nearby restaurants."
             )
-        if int(radius) > 100000:
+        if radius is not None and int(radius) > 100000:
             raise ValueError(
                 "The radius must be less than 10,000 meters or we get no results."
             )
+        if self.nearby_cache is None or (
+            page_token and not page_token.startswith(TILE_TOKEN_PREFIX + "|")
+        ):
+            return self.fetch_nearby_restaurants(location, keyword, radius, page_token)
+
+        if page_token:
+            _, tile_key, keyword, page_num = page_token.split("|", 3)
+            keyword = unquote(keyword) or None
+            page_num = int(page_num)
         else:
-            restaurants_response = self.client.places_nearby(
-                location=location,
-                radius=radius,  # max 100000 meters
-                keyword=keyword,
-                language=None,
-                min_price=None,  # 0 to 4
-                max_price=None,  # 0 to 4
-                open_now=False,
-                type="restaurant",
-                rank_by="prominence",  # or "distance",
-                page_token=page_token,
+            tile_key, _, _ = snap_to_tile(location["lat"], location["lng"], radius)
+            page_num = 0
+
+        cache_key = f"{tile_key}|{quote(keyword or '', safe='')}"
+        tile = self.nearby_cache.get(cache_key)
+        if tile is not None and page_num < len(tile["pages"]):
+            logging.info(f"Nearby search served from tile cache: {cache_key}")
+        else:
+            tile = self._fetch_tile_pages(tile_key, keyword, tile, page_num)
+            self.nearby_cache.set(cache_key, tile)
+        if page_num >= len(tile["pages"]):
+            raise ValueError("No restaurants found in the specified radius.")
+
+        next_page_token = None
+        if page_num + 1 < len(tile["pages"]) or tile["next_page_token"]:
+            next_page_token = "|".join(
+                [
+                    TILE_TOKEN_PREFIX,
+                    tile_key,
+                    quote(keyword or "", safe=""),
+                    str(page_num + 1),
+                ]
             )
-            next_page_token = restaurants_response.get("next_page_token")
-            restaurants_results = restaurants_response.get("results", [])
-            logging.info(f"Result return: {len(restaurants_results)}")
-            if restaurants_results:
-                return restaurants_results, next_page_token
-            else:
-                raise ValueError("No restaurants found in the specified radius.")
+        return tile["pages"][page_num], next_page_token
+
+    def _fetch_tile_pages(self, tile_key, keyword, tile, page_num) -> dict:
+        """
+        Fetch the pages of a tile up to `page_num`, extending `tile` when it
+        holds earlier pages.
+
+        The upstream next_page_token is kept next to the pages it continues
+        and only used while it is younger than config.PAGE_TOKEN_TTL_SECONDS.
+        An expired or rejected token restarts the tile from its first page,
+        so the cached pages always come from one upstream pagination.
+        :param tile_key: The tile, as returned by snap_to_tile.
+        :param tile: The cached pages of the tile, or None.
+        :param page_num: Index of the page that is needed.
+        :return: The tile: {"pages", "next_page_token", "token_fetched_at"}.
+        """
+        geohash, tile_radius = tile_key.split("@")
+        restarted = tile is None
+        if tile is None:
+            tile = {"pages": [], "next_page_token": None, "token_fetched_at": 0}
+        while len(tile["pages"]) <= page_num:
+            upstream_token = None
+            if tile["pages"]:
+                upstream_token = tile["next_page_token"]
+                if not upstream_token:
+                    break  # The tile has no more pages
+                token_age = time.time() - tile["token_fetched_at"]
+                if token_age > config.PAGE_TOKEN_TTL_SECONDS and not restarted:
+                    tile, restarted = {"pages": [], "next_page_token": None}, True
+                    continue
+            try:
+                results, next_page_token = self.fetch_nearby_restaurants(
+                    location=geohash_center(geohash),
+                    keyword=keyword,
+                    radius=int(tile_radius),
+                    page_token=upstream_token,
+                )
+            except googlemaps.exceptions.ApiError as e:
+                if upstream_token and e.status == "INVALID_REQUEST" and not restarted:
+                    tile, restarted = {"pages": [], "next_page_token": None}, True
+                    continue
+                raise
+            tile["pages"].append(results)
+            tile["next_page_token"] = next_page_token
+            tile["token_fetched_at"] = time.time()
+        return tile
+
+    def fetch_nearby_restaurants(
+        self, location=None, keyword=None, radius=10000, page_token=None
+    ):
+        """
+        Query the Places Nearby API directly, bypassing the tile cache.
+        :param location: A dictionary containing latitude and longitude.
+        :param radius: The distance (in meters) within which to return place results.
+        :param page_token: Token of the page to fetch.
+        :return: A tuple of the places on the page and the next page token.
+        """
+        attempt = 0
+        while True:
+            try:
+                restaurants_response = self.client.places_nearby(
+                    location=location,
+                    radius=radius,  # max 100000 meters
+                    keyword=keyword,
+                    language=None,
+                    min_price=None,  # 0 to 4
+                    max_price=None,  # 0 to 4
+                    open_now=False,
+                    type="restaurant",
+                    rank_by="prominence",  # or "distance",
+                    page_token=page_token,
+                )
+                break
+            except googlemaps.exceptions.ApiError as e:
+                # A fresh next_page_token needs a moment before it becomes valid
+                attempt += 1
+                if (
+                    page_token
+                    and e.status == "INVALID_REQUEST"
+                    and attempt <= config.PAGE_TOKEN_RETRIES
+                ):
+                    time.sleep(config.PAGE_TOKEN_DELAY_SECONDS)
+                    continue
+                raise
+        next_page_token = restaurants_response.get("next_page_token")
+        restaurants_results = restaurants_response.get("results", [])
+        logging.info(f"Result return: {len(restaurants_results)}")
+        if restaurants_results:
+            return restaurants_results, next_page_token
+        else:
+            raise ValueError("No restaurants found in the specified radius.")
 
     def get_info_by_place_id(self, place_id):
         """
         Get restaurant information using place_id.
+        Results are served from self.details_cache when one is configured.
+        :param place_id: The place ID of the restaurant.
+        :return: A dictionary containing restaurant information.
+        """
+        if self.details_cache is None:
+            return self.fetch_info_by_place_id(place_id)
+        return self.details_cache.get_or_fetch(
+            place_id, lambda: self.fetch_info_by_place_id(place_id)
+        )
+
+    def fetch_info_by_place_id(self, place_id):
+        """
+        Fetch restaurant information from the Place Details API, bypassing the cache.
         :param place_id: The place ID of the restaurant.
         :return: A dictionary containing restaurant information.
         """
         restaurant_info = self.client.place(
             place_id=place_id,
             reviews_sort="newest",
-            fields=config.FIELDS,
+            fields=config.DETAIL_FIELDS,
         )
         return restaurant_info.get("result", {})
 
@@ -191,95 +339,156 @@ class GoogleMapSearch:
             cleaned.append(normalized)
         return cleaned
 
-    def extract_restaurant_info(self, restaurants_results) -> List[dict]:
+    def extract_restaurant_info(
+        self, restaurants_results, max_workers=None
+    ) -> List[RestaurantRecord]:
         """
         Extract restaurant information from the response.
-        :param restaurant_info: The response from the Google Maps API.
-        :return: A list of dictionaries containing restaurant information.
+
+        Details for every restaurant are fetched concurrently on a
+        bounded thread pool. The output keeps the order of the input, and a
+        restaurant whose lookup fails is logged and left out instead of
+        failing the whole page.
+        :param restaurants_results: The results of a nearby search.
+        :param max_workers: Concurrency limit, defaults to self.max_workers.
+        :return: A list of RestaurantRecords.
         """
-        results = []
-        for restaurant in restaurants_results:
-            place_id = restaurant.get("place_id")
-            restaurant_info = self.get_info_by_place_id(place_id)
-
-            restaurant_name = restaurant_info.get("name", "N/A")
-            formatted_address = restaurant_info.get("formatted_address", "N/A")
-            location = restaurant_info.get("geometry", {}).get("location", {})
-            open_now = restaurant_info.get("current_opening_hours", {}).get(
-                "open_now", False
-            )
-            periods = restaurant_info.get("current_opening_hours", {}).get(
-                "periods", False
-            )
-            opening_hours_text = self.clean_weekday_text(
-                restaurant_info.get("current_opening_hours", {}).get("weekday_text", [])
-            )
+        if not restaurants_results:
+            return []
+        max_workers = max(
+            1, min(max_workers or self.max_workers, len(restaurants_results))
+        )
+        if max_workers == 1:
+            records = [self._safe_build_restaurant(r) for r in restaurants_results]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="place-details"
+            ) as executor:
+                records = list(
+                    executor.map(self._safe_build_restaurant, restaurants_results)
+                )
+        return [record for record in records if record is not None]
 
-            price_level = restaurant_info.get("price_level", "N/A")
-            total_user_ratings = restaurant_info.get("user_ratings_total", "N/A")
-            vicinity = restaurant_info.get("vicinity", "N/A")
-            rating = restaurant_info.get("rating", "N/A")
-            types = restaurant_info.get("types", [])
-            website = restaurant_info.get("website", "N/A")
-            phone_number = restaurant_info.get("formatted_phone_number", "N/A")
-            raw_photos = restaurant_info.get("photos", [])
-            curbside_pickup = restaurant_info.get("curbside_pickup", False)
-            delivery = restaurant_info.get("delivery", False)
-            dine_in = restaurant_info.get("dine_in", False)
-            reservable = restaurant_info.get("reservable", False)
-            takeout = restaurant_info.get("takeout", False)
-            serves_breakfast = restaurant_info.get("serves_breakfast", False)
-            serves_lunch = restaurant_info.get("serves_lunch", False)
-            serves_dinner = restaurant_info.get("serves_dinner", False)
-            serves_brunch = restaurant_info.get("serves_brunch", False)
-            serves_vegetarian_food = restaurant_info.get(
-                "serves_vegetarian_food", False
-            )
-            serves_beer = restaurant_info.get("serves_beer", False)
-            serves_wine = restaurant_info.get("serves_wine", False)
-            wheelchair_accessible = restaurant_info.get(
-                "wheelchair_accessible_entrance", False
-            )
-            business_status = restaurant_info.get("business_status", "N/A")
-            editorial_summary = restaurant_info.get("editorial_summary", {}).get(
-                "overview", ""
-            )
-            photos = self.get_place_photos(place_id, raw_photos)
-            reviews = restaurant_info.get("reviews", [])
-            results.append(
-                {
-                    "place_id": place_id,
-                    "restaurant_name": restaurant_name,
-                    "formatted_address": formatted_address,
-                    "location": location,
-                    "open_now": open_now,
-                    "periods": periods,
-                    "opening_hours": opening_hours_text,
-                    "price_level": price_level,
-                    "rating": rating,
-                    "types": types,
-                    "total_user_ratings": total_user_ratings,
-                    "vicinity": vicinity,
-                    "website": website,
-                    "phone_number": phone_number,
-                    "photos": photos,  # list of photo
-                    "reviews": reviews,  # list of reviews
-                    "curbside_pickup": curbside_pickup,
-                    "delivery": delivery,
-                    "dine_in": dine_in,
-                    "reservable": reservable,
-                    "takeout": takeout,
-                    "serves_breakfast": serves_breakfast,
-                    "serves_lunch": serves_lunch,
-                    "serves_dinner": serves_dinner,
-                    "serves_brunch": serves_brunch,
-                    "serves_vegetarian_food": serves_vegetarian_food,
-                    "serves_beer": serves_beer,
-                    "serves_wine": serves_wine,
-                    "wheelchair_accessible": wheelchair_accessible,
-                    "business_status": business_status,
-                    "editorial_summary": editorial_summary,
-                }
-            )
-        return results
+    def iter_restaurant_info(self, restaurants_results, max_workers=None):
+        """
+        Like extract_restaurant_info, but yield each restaurant as soon as its
+        details resolve instead of waiting for the whole page.
+        :param restaurants_results: The results of a nearby search.
+        :param max_workers: Concurrency limit, defaults to self.max_workers.
+        :return: A generator of RestaurantRecords, in completion order.
+        """
+        if not restaurants_results:
+            return
+        max_workers = max(
+            1, min(max_workers or self.max_workers, len(restaurants_results))
+        )
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="place-details"
+        )
+        try:
+            futures = [
+                executor.submit(self._safe_build_restaurant, restaurant)
+                for restaurant in restaurants_results
+            ]
+            for future in as_completed(futures):
+                record = future.result()
+                if record is not None:
+                    yield record
+        finally:
+            # Stop pending lookups if the consumer goes away early
+            executor.shutdown(wait=False, cancel_futures=True)
 
+    def _safe_build_restaurant(self, restaurant) -> Optional[RestaurantRecord]:
+        place_id = restaurant.get("place_id")
+        try:
+            return self.build_restaurant_info(restaurant)
+        except Exception as e:
+            logging.error(f"Failed to fetch details for {place_id}: {e}")
+            return None
+
+    def build_restaurant_info(self, restaurant) -> RestaurantRecord:
+        """
+        Fetch the details of a single restaurant and record its photo references.
+        :param restaurant: One entry of a nearby search result.
+        :return: A RestaurantRecord containing restaurant information.
+        """
+        place_id = restaurant.get("place_id")
+        restaurant_info = self.get_info_by_place_id(place_id)
+
+        restaurant_name = restaurant_info.get("name", "N/A")
+        formatted_address = restaurant_info.get("formatted_address", "N/A")
+        location = restaurant_info.get("geometry", {}).get("location", {})
+        open_now = restaurant_info.get("current_opening_hours", {}).get(
+            "open_now", False
+        )
+        periods = restaurant_info.get("current_opening_hours", {}).get(
+            "periods", False
+        )
+        opening_hours_text = self.clean_weekday_text(
+            restaurant_info.get("current_opening_hours", {}).get("weekday_text", [])
+        )
+
+        price_level = restaurant_info.get("price_level", "N/A")
+        total_user_ratings = restaurant_info.get("user_ratings_total", "N/A")
+        vicinity = restaurant_info.get("vicinity", "N/A")
+        rating = restaurant_info.get("rating", "N/A")
+        types = restaurant_info.get("types", [])
+        website = restaurant_info.get("website", "N/A")
+        phone_number = restaurant_info.get("formatted_phone_number", "N/A")
+        raw_photos = restaurant_info.get("photos", [])
+        curbside_pickup = restaurant_info.get("curbside_pickup", False)
+        delivery = restaurant_info.get("delivery", False)
+        dine_in = restaurant_info.get("dine_in", False)
+        reservable = restaurant_info.get("reservable", False)
+        takeout = restaurant_info.get("takeout", False)
+        serves_breakfast = restaurant_info.get("serves_breakfast", False)
+        serves_lunch = restaurant_info.get("serves_lunch", False)
+        serves_dinner = restaurant_info.get("serves_dinner", False)
+        serves_brunch = restaurant_info.get("serves_brunch", False)
+        serves_vegetarian_food = restaurant_info.get(
+            "serves_vegetarian_food", False
+        )
+        serves_beer = restaurant_info.get("serves_beer", False)
+        serves_wine = restaurant_info.get("serves_wine", False)
+        wheelchair_accessible = restaurant_info.get(
+            "wheelchair_accessible_entrance", False
+        )
+        business_status = restaurant_info.get("business_status", "N/A")
+        editorial_summary = restaurant_info.get("editorial_summary", {}).get(
+            "overview", ""
+        )
+        photos = self.get_place_photos(place_id, raw_photos)
+        reviews = restaurant_info.get("reviews", [])
+        return RestaurantRecord(
+            place_id=place_id,
+            restaurant_name=restaurant_name,
+            formatted_address=formatted_address,
+            location=location,
+            open_now=open_now,
+            periods=periods,
+            opening_hours=opening_hours_text,
+            price_level=price_level,
+            rating=rating,
+            types=types,
+            total_user_ratings=total_user_ratings,
+            vicinity=vicinity,
+            website=website,
+            phone_number=phone_number,
+            photos=photos,  # list of photo
+            reviews=reviews,  # list of reviews
+            curbside_pickup=curbside_pickup,
+            delivery=delivery,
+            dine_in=dine_in,
+            reservable=reservable,
+            takeout=takeout,
+            serves_breakfast=serves_breakfast,
+            serves_lunch=serves_lunch,
+            serves_dinner=serves_dinner,
+            serves_brunch=serves_brunch,
+            serves_vegetarian_food=serves_vegetarian_food,
+            serves_beer=serves_beer,
+            serves_wine=serves_wine,
+            wheelchair_accessible=wheelchair_accessible,
+            business_status=business_status,
+            editorial_summary=editorial_summary,
+        )
@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+
+class JobRejectedError(Exception):
+    """Raised when the background queue is full."""
+
+
+class JobCancelledError(Exception):
+    """Raised inside a job once it has been cancelled."""
+
+
+class BackgroundExecutor:
+    """
+    A fixed pool of worker threads fed by a bounded queue.
+
+    Jobs submitted with a dedupe key that is already queued or running are
+    not scheduled twice, the in-flight job is returned instead. When the
+    queue is full new jobs are rejected right away (JobRejectedError) rather
+    than piling up threads. Jobs cancelled while still queued are skipped.
+    Queue depth, wait and run latencies are exposed through metrics().
+    """
+
+    def __init__(
+        self,
+        max_workers=config.BACKGROUND_WORKERS,
+        max_queue=config.BACKGROUND_QUEUE_SIZE,
+    ):
+        self.max_workers = max_workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._in_flight = {}  # dedupe key -> job
+        self._lock = threading.Lock()
+        self._workers = []
+        self._running = 0
+        self._counters = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "completed": 0,
+            "failed": 0,
+        }
+        self._wait_seconds = {"count": 0, "total": 0.0, "max": 0.0}
+        self._run_seconds = {"count": 0, "total": 0.0, "max": 0.0}
+
+    def in_flight(self, dedupe_key):
+        """Return the queued or running job for `dedupe_key`, if any."""
+        with self._lock:
+            job = self._in_flight.get(dedupe_key)
+            return job if job is not None and not job.cancelled else None
+
+    def submit(self, job, fn, *args, dedupe_key=None):
+        """
+        Queue `fn(job, *args)` for a worker.
+
+        Args:
+            job: The job object, needs a `cancelled` attribute.
+            fn (callable): The work to run.
+            dedupe_key (hashable, optional): Key identifying equivalent jobs.
+
+        Returns:
+            The job that will do the work, which is the already in-flight job
+            when `dedupe_key` matches one.
+
+        Raises:
+            JobRejectedError: If the queue is full.
+        """
+        with self._lock:
+            if dedupe_key is not None:
+                existing = self._in_flight.get(dedupe_key)
+                if existing is not None and not existing.cancelled:
+                    self._counters["deduplicated"] += 1
+                    return existing
+            try:
+                self._queue.put_nowait((job, fn, args, dedupe_key, time.time()))
+            except queue.Full:
+                self._counters["rejected"] += 1
+                raise JobRejectedError("Background queue is full")
+            self._counters["submitted"] += 1
+            if dedupe_key is not None:
+                self._in_flight[dedupe_key] = job
+            self._ensure_workers()
+        return job
+
+    def _ensure_workers(self):
+        """Start the worker threads on first submit. Called with the lock held."""
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._work,
+                name=f"background-{len(self._workers)}",
+                daemon=True,
+            )
+            self._workers.append(worker)
+            worker.start()
+
+    def _work(self):
+        while True:
+            job, fn, args, dedupe_key, enqueued_at = self._queue.get()
+            started_at = time.time()
+            try:
+                if job.cancelled:
+                    self._count("cancelled")
+                    continue
+                self._observe(self._wait_seconds, started_at - enqueued_at)
+                with self._lock:
+                    self._running += 1
+                try:
+                    fn(job, *args)
+                    self._count("cancelled" if job.cancelled else "completed")
+                except JobCancelledError:
+                    self._count("cancelled")
+                except Exception as e:
+                    logging.error(f"Background job failed: {str(e)}")
+                    self._count("failed")
+                finally:
+                    with self._lock:
+                        self._running -= 1
+                    self._observe(self._run_seconds, time.time() - started_at)
+            finally:
+                with self._lock:
+                    if self._in_flight.get(dedupe_key) is job:
+                        del self._in_flight[dedupe_key]
+                self._queue.task_done()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _observe(self, stat, seconds):
+        with self._lock:
+            stat["count"] += 1
+            stat["total"] += seconds
+            stat["max"] = max(stat["max"], seconds)
+
+    def metrics(self) -> dict:
+        """Queue depth, job counters and wait/run latencies in seconds."""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "running": self._running,
+                "in_flight": len(self._in_flight),
+                **self._counters,
+                "avg_wait_seconds": self._average(self._wait_seconds),
+                "max_wait_seconds": self._wait_seconds["max"],
+                "avg_run_seconds": self._average(self._run_seconds),
+                "max_run_seconds": self._run_seconds["max"],
+            }
+
+    @staticmethod
+    def _average(stat) -> float:
+        return stat["total"] / stat["count"] if stat["count"] else 0.0
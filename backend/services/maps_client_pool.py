@@ -0,0 +1,256 @@
+import os
+import sys
+import math
+import time
+import logging
+import threading
+from typing import List, Optional
+
+import googlemaps
+import requests
+from googlemaps.exceptions import ApiError, Timeout, TransportError
+from requests.adapters import HTTPAdapter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+# API statuses that say the key itself is unusable, not the request
+KEY_DISABLED_STATUSES = {"REQUEST_DENIED", "OVER_DAILY_LIMIT"}
+THROTTLED_STATUS = "OVER_QUERY_LIMIT"
+
+
+class NoAvailableKeyError(RuntimeError):
+    """Raised when no API key can take a request within the wait budget."""
+
+
+def discover_api_keys() -> List[str]:
+    """Every configured key: GOOGLE_MAPS_API_KEY, then GOOGLE_MAPS_API_KEY_0, _1, ..."""
+    keys = []
+    if os.getenv("GOOGLE_MAPS_API_KEY"):
+        keys.append(os.getenv("GOOGLE_MAPS_API_KEY"))
+    key_idx = 0
+    while os.getenv(f"GOOGLE_MAPS_API_KEY_{key_idx}"):
+        keys.append(os.getenv(f"GOOGLE_MAPS_API_KEY_{key_idx}"))
+        key_idx += 1
+    return list(dict.fromkeys(keys))
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per second up to `capacity`.
+
+    Not thread safe on its own, MapsClientPool serialises access.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now=None) -> bool:
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self, now=None) -> float:
+        """Seconds until the next token is available."""
+        self._refill(time.monotonic() if now is None else now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class PooledKey:
+    """
+    One API key of the pool with its client, rate limit and health.
+
+    Attributes:
+        key (str): The API key.
+        client (googlemaps.Client): Client bound to the key.
+        bucket (TokenBucket): Per-key rate limit.
+        consecutive_failures (int): Failures since the last success.
+        unavailable_until (float): Monotonic time the key is out of rotation until.
+    """
+
+    def __init__(self, key, client, bucket):
+        self.key = key
+        self.client = client
+        self.bucket = bucket
+        self.consecutive_failures = 0
+        self.unavailable_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def available(self, now) -> bool:
+        return now >= self.unavailable_until
+
+    def stats(self, now) -> dict:
+        return {
+            "key": f"...{self.key[-4:]}",
+            "available": self.available(now),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class MapsClientPool:
+    """
+    A drop-in replacement for googlemaps.Client that spreads requests over
+    every configured API key.
+
+    Keys are used round robin, each behind its own token bucket so no key
+    exceeds its QPS quota. A key answering OVER_QUERY_LIMIT is rested for a
+    short cooldown and the request is retried on the next key; a key that is
+    denied or out of daily quota, or fails `failure_threshold` times in a
+    row, is taken out of rotation for longer. All clients share one
+    requests.Session, so HTTP connections are reused across keys and threads.
+
+    Any googlemaps.Client method (geocode, place, places_nearby, ...) can be
+    called on the pool directly.
+    """
+
+    def __init__(
+        self,
+        keys: Optional[List[str]] = None,
+        qps=config.MAPS_KEY_QPS,
+        burst=config.MAPS_KEY_BURST,
+        failure_threshold=config.MAPS_KEY_FAILURE_THRESHOLD,
+        throttle_cooldown=config.MAPS_KEY_THROTTLE_COOLDOWN_SECONDS,
+        disable_cooldown=config.MAPS_KEY_DISABLE_SECONDS,
+        acquire_timeout=config.MAPS_ACQUIRE_TIMEOUT_SECONDS,
+        session: requests.Session = None,
+        client_factory=None,
+    ):
+        keys = keys or discover_api_keys()
+        if not keys:
+            raise ValueError("You have no valid API keys.")
+        self.failure_threshold = failure_threshold
+        self.throttle_cooldown = throttle_cooldown
+        self.disable_cooldown = disable_cooldown
+        self.acquire_timeout = acquire_timeout
+        self.session = session or self.new_session()
+        client_factory = client_factory or self.new_client
+        self.keys = []
+        for key in keys:
+            try:
+                client = client_factory(key, qps, burst)
+            except ValueError as e:
+                # googlemaps.Client rejects malformed keys, say which one
+                raise ValueError(f"Google Maps API key ...{key[-4:]}: {e}") from e
+            self.keys.append(PooledKey(key, client, TokenBucket(qps, burst)))
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_session() -> requests.Session:
+        """A session whose connection pool fits every concurrent detail fetch."""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.MAPS_HTTP_POOL_SIZE,
+            pool_maxsize=config.MAPS_HTTP_POOL_SIZE,
+        )
+        session.mount("https://", adapter)
+        return session
+
+    def new_client(self, key, qps, burst) -> googlemaps.Client:
+        return googlemaps.Client(
+            key=key,
+            requests_session=self.session,
+            # The pool rotates keys on OVER_QUERY_LIMIT instead of sleeping on one
+            retry_over_query_limit=False,
+            # The pool's bucket does the limiting, the client's own is a backstop
+            queries_per_second=max(1, math.ceil(burst)),
+        )
+
+    def _acquire(self) -> PooledKey:
+        """Take a token from the next available key, waiting if all are limited."""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                waits = []
+                for offset in range(len(self.keys)):
+                    pooled = self.keys[(self._next + offset) % len(self.keys)]
+                    if not pooled.available(now):
+                        waits.append(pooled.unavailable_until - now)
+                        continue
+                    if pooled.bucket.try_acquire(now):
+                        self._next = (self._next + offset + 1) % len(self.keys)
+                        pooled.requests += 1
+                        return pooled
+                    waits.append(pooled.bucket.wait_time(now))
+            wait = min(waits)
+            if time.monotonic() + wait > deadline:
+                raise NoAvailableKeyError(
+                    f"No Google Maps API key available within {self.acquire_timeout}s"
+                )
+            time.sleep(wait)
+
+    def _succeeded(self, pooled: PooledKey):
+        with self._lock:
+            pooled.consecutive_failures = 0
+
+    def _failed(self, pooled: PooledKey, cooldown: float = None):
+        """Count a failure, resting the key for `cooldown` or if it keeps failing."""
+        with self._lock:
+            pooled.errors += 1
+            pooled.consecutive_failures += 1
+            if (
+                cooldown is None
+                and pooled.consecutive_failures >= self.failure_threshold
+            ):
+                cooldown = self.throttle_cooldown
+            if cooldown:
+                pooled.unavailable_until = time.monotonic() + cooldown
+                logging.warning(
+                    f"Google Maps key ...{pooled.key[-4:]} rested for {cooldown}s"
+                )
+
+    def call(self, method: str, *args, **kwargs):
+        """Call a googlemaps.Client method on the next available key."""
+        last_error = None
+        for _ in range(len(self.keys)):
+            pooled = self._acquire()
+            try:
+                result = getattr(pooled.client, method)(*args, **kwargs)
+            except ApiError as e:
+                if e.status == THROTTLED_STATUS:
+                    with self._lock:
+                        pooled.throttled += 1
+                    self._failed(pooled, self.throttle_cooldown)
+                elif e.status in KEY_DISABLED_STATUSES:
+                    self._failed(pooled, self.disable_cooldown)
+                else:
+                    # The request itself was bad, the key is fine
+                    self._succeeded(pooled)
+                    raise
+                last_error = e
+                continue  # Try the next key
+            except (TransportError, Timeout):
+                self._failed(pooled)
+                raise
+            self._succeeded(pooled)
+            return result
+        raise last_error
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+        return lambda *args, **kwargs: self.call(method, *args, **kwargs)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            keys = [pooled.stats(now) for pooled in self.keys]
+        return {
+            "keys": keys,
+            "available_keys": sum(key["available"] for key in keys),
+        }
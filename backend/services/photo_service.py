@@ -0,0 +1,114 @@
+import os
+import re
+import sys
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+# place_ids are URL path segments, keep them from escaping the photo directory
+_PLACE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class PhotoService:
+    """
+    Fetch-on-demand access to place photos.
+
+    Photos are downloaded into a PhotoStore the first time they are
+    requested or after the store evicted them. Concurrent
+    requests for the same photo share a single download (single-flight), and
+    photos of the next few cards in a deck can be prefetched on a small
+    background pool. At most `max_pending` prefetches are queued, further
+    ones are dropped since the photo is still fetched when it is requested.
+    """
+
+    def __init__(self, gmaps, store, max_workers=None, max_pending=None):
+        self.gmaps = gmaps
+        self.store = store
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.max_pending = max_pending or config.PHOTO_PREFETCH_MAX_PENDING
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.PHOTO_PREFETCH_WORKERS,
+            thread_name_prefix="photo-prefetch",
+        )
+
+    def get_photo(self, place_id: str, photo_id) -> Optional[str]:
+        """
+        Return the local path of a photo, downloading it on a miss.
+
+        Args:
+            place_id (str): The place ID of the restaurant.
+            photo_id (str | int): Index of the photo.
+
+        Returns:
+            str: Path of the photo file, or None if the place has no such photo.
+        """
+        if not _PLACE_ID_PATTERN.match(place_id or ""):
+            return None
+        try:
+            photo_num = int(photo_id)
+        except (TypeError, ValueError):
+            return None
+        if not 0 <= photo_num < config.PHOTOS_PER_PLACE:
+            return None
+
+        path = self.store.get(place_id, photo_num)
+        if path:
+            return path
+        return self._download_once(place_id, photo_num)
+
+    def _download_once(self, place_id: str, photo_num: int) -> Optional[str]:
+        key = (place_id, photo_num)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            chunks = self.gmaps.fetch_photo(place_id, photo_num)
+            path = self.store.put(place_id, photo_num, chunks) if chunks else None
+            future.set_result(path)
+            return path
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def prefetch(self, place_ids: List[str], limit=None):
+        """
+        Download the photos of the first `limit` places in the background.
+
+        Args:
+            place_ids (List[str]): Place IDs in deck order.
+            limit (int, optional): Number of cards to prefetch. Defaults to
+                config.PHOTO_PREFETCH_CARDS.
+        """
+        limit = config.PHOTO_PREFETCH_CARDS if limit is None else limit
+        for place_id in place_ids[:limit]:
+            for photo_num in range(config.PHOTOS_PER_PLACE):
+                with self._lock:
+                    if self._pending >= self.max_pending:
+                        logging.info(f"Photo prefetch queue full, dropped {place_id}")
+                        return
+                    self._pending += 1
+                self._executor.submit(self._prefetch_one, place_id, photo_num)
+
+    def _prefetch_one(self, place_id: str, photo_num: int):
+        try:
+            self.get_photo(place_id, photo_num)
+        except Exception as e:
+            logging.warning(f"Failed to prefetch photo {place_id}/{photo_num}: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
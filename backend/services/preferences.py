@@ -0,0 +1,49 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from ml_model import UserPreferences
+
+
+class PreferenceStore:
+    """
+    In-process preference state of each user, so a swipe only updates the
+    running sums instead of re-ranking from the whole swipe history.
+
+    Least recently used users are evicted beyond `max_users`; an evicted user
+    is rebuilt from the full history the client sends on its next swipe.
+    """
+
+    def __init__(self, max_users=config.PREFERENCE_MAX_USERS):
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id) -> UserPreferences:
+        """Return the state of `user_id`, creating an empty one if needed."""
+        with self._lock:
+            preferences = self._users.get(user_id)
+            if preferences is None:
+                self.misses += 1
+                preferences = UserPreferences()
+                self._users[user_id] = preferences
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            else:
+                self.hits += 1
+                self._users.move_to_end(user_id)
+            return preferences
+
+    def reset(self, user_id):
+        """Forget the state of `user_id`, e.g. after a new search."""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"users": len(self._users), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,175 @@
+# Process-wide registry of shared clients. Every heavy resource is built at
+# most once per process, on first use or by warm_up().
+import os
+import sys
+import time
+import logging
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+_instances = {}
+_lock = threading.RLock()
+_warm_up_state = {"status": "idle", "error": None, "duration_seconds": None}
+
+
+def _get(name, factory):
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                start = time.perf_counter()
+                instance = factory()
+                _instances[name] = instance
+                logging.info(
+                    f"Initialized {name} in {time.perf_counter() - start:.2f}s"
+                )
+    return instance
+
+
+def peek(name):
+    """Return a resource if it has been initialised, without building it."""
+    return _instances.get(name)
+
+
+def get_details_cache():
+    from utils.cache import PlaceDetailsCache
+
+    return _get("details_cache", PlaceDetailsCache)
+
+
+def get_nearby_cache():
+    from utils.cache import NearbySearchCache
+
+    return _get("nearby_cache", NearbySearchCache)
+
+
+def get_gmaps():
+    from services.google_map_search import GoogleMapSearch
+
+    return _get(
+        "gmaps",
+        lambda: GoogleMapSearch(
+            details_cache=get_details_cache(), nearby_cache=get_nearby_cache()
+        ),
+    )
+
+
+def get_photo_store():
+    from utils.photo_store import PhotoStore
+
+    def build():
+        store = PhotoStore()
+        store.start_cleanup()
+        return store
+
+    return _get("photo_store", build)
+
+
+def get_photo_service():
+    from services.photo_service import PhotoService
+
+    return _get("photo_service", lambda: PhotoService(get_gmaps(), get_photo_store()))
+
+
+def get_storage():
+    from utils.storage import create_storage
+
+    return _get("storage", create_storage)
+
+
+def get_model():
+    from ml_model import UserInterestPredictor
+
+    return _get("model", UserInterestPredictor)
+
+
+def get_preferences():
+    from services.preferences import PreferenceStore
+
+    return _get("preferences", PreferenceStore)
+
+
+def get_search_jobs():
+    from services.search_jobs import SearchJobRegistry
+
+    return _get("search_jobs", SearchJobRegistry)
+
+
+def get_background_executor():
+    from services.job_executor import BackgroundExecutor
+
+    return _get("background_executor", BackgroundExecutor)
+
+
+def warm_up():
+    """
+    Initialise every shared resource now instead of on first use.
+
+    Loads the spaCy pipeline, builds the Google Maps key pool (which rejects
+    malformed keys), connects to the storage backend and builds the caches,
+    photo store and model.
+    """
+    from utils.helpers import get_embedding
+
+    with _lock:
+        if _warm_up_state["status"] in ("running", "ready"):
+            return
+        _warm_up_state.update(status="running", error=None)
+    start = time.perf_counter()
+    try:
+        get_gmaps().client  # Builds the API key pool
+        get_photo_service()
+        get_storage()
+        get_model()
+        get_embedding()
+    except Exception as e:
+        logging.error(f"Warm-up failed: {str(e)}")
+        _warm_up_state.update(status="failed", error=str(e))
+        raise
+    _warm_up_state.update(
+        status="ready", duration_seconds=round(time.perf_counter() - start, 3)
+    )
+    logging.info(f"Warm-up finished in {_warm_up_state['duration_seconds']}s")
+
+
+def start_background_warm_up():
+    """Run warm_up on a daemon thread so the server can accept requests meanwhile."""
+
+    def run():
+        try:
+            warm_up()
+        except Exception:
+            pass  # Already logged and recorded in the readiness state
+
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
+
+
+def readiness() -> dict:
+    """Report whether warm-up finished and which resources are initialised."""
+    from utils.helpers import is_embedding_loaded
+
+    components = {
+        name: name in _instances
+        for name in [
+            "details_cache",
+            "nearby_cache",
+            "gmaps",
+            "photo_store",
+            "photo_service",
+            "storage",
+            "model",
+        ]
+    }
+    components["embedding"] = is_embedding_loaded()
+    status = _warm_up_state["status"]
+    # Without a warm-up, a lazy process can serve right away (slower at first)
+    ready = status == "ready" or (status == "idle" and config.LAZY_INIT)
+    return {
+        "ready": ready,
+        "lazy_init": config.LAZY_INIT,
+        "warm_up": dict(_warm_up_state),
+        "components": components,
+    }
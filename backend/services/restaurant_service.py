@@ -1,6 +1,120 @@
-from .google_map_search import GoogleMapSearch
+import os
+import sys
+import math
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
-gmaps = GoogleMapSearch()
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from utils.helpers import Tools
+
+from .registry import get_gmaps
+
+tools = Tools()
+
+# Next page token of a coverage search whose merged results are not all
+# detailed yet; the remaining results are kept in last_info["pending_results"]
+COVERAGE_PAGE_TOKEN = "coverage"
+
+
+def coverage_locations(lat, lng, radius, grid=None):
+    """
+    Centres and radius of the sub-searches covering a circle.
+
+    Without a grid the circle is covered by five searches, on its centre and
+    half way to its north, south, east and west edges (Tools.get_locations).
+    With a grid it is split into grid x grid cells, each searched from its
+    centre with a radius reaching the cell corners.
+
+    Returns:
+        Tuple[List[dict], int]: The centres and the radius of each sub-search.
+    """
+    if grid and int(grid) > 1:
+        grid = int(grid)
+        locations = tools.get_grid_locations(lat, lng, radius, grid)
+        sub_radius = radius * math.sqrt(2) / grid
+    else:
+        locations = list(tools.get_locations(lat, lng, radius / 2).values())
+        # Reaches the edge of the circle between two neighbouring centres
+        sub_radius = radius * 0.75
+    return locations, int(math.ceil(sub_radius))
+
+
+def fetch_coverage_results(gmaps, lat_lng, radius, grid=None):
+    """
+    Run the sub-searches of a coverage search in parallel and merge them.
+
+    Each sub-search reads up to config.COVERAGE_PAGES_PER_POINT pages. It
+    bypasses the nearby tile cache, which would move its centre onto a tile
+    centre and round its radius up to a bucket, undoing the layout of the
+    sub-searches. The results are deduplicated by place_id, keeping the order
+    of the centres so the restaurants closest to the requested centre come
+    first.
+
+    Returns:
+        List[dict]: The merged nearby search results.
+
+    Raises:
+        ValueError: If no sub-search found any restaurant.
+    """
+    locations, sub_radius = coverage_locations(
+        lat_lng["lat"], lat_lng["lng"], radius, grid
+    )
+
+    def search(location):
+        results = []
+        page_token = None
+        for _ in range(config.COVERAGE_PAGES_PER_POINT):
+            try:
+                page, page_token = gmaps.fetch_nearby_restaurants(
+                    location=location, radius=sub_radius, page_token=page_token
+                )
+            except ValueError:
+                break  # Nothing around this centre
+            except Exception as e:
+                logging.error(f"Coverage sub-search at {location} failed: {str(e)}")
+                break
+            results.extend(page)
+            if not page_token:
+                break
+        return results
+
+    max_workers = max(1, min(config.COVERAGE_SEARCH_WORKERS, len(locations)))
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="coverage-search"
+    ) as executor:
+        pages = list(executor.map(search, locations))
+
+    merged = {}
+    for page in pages:
+        for result in page:
+            merged.setdefault(result["place_id"], result)
+    logging.info(
+        f"Coverage search over {len(locations)} centres found {len(merged)} "
+        f"restaurants ({sum(len(page) for page in pages)} before dedup)"
+    )
+    if not merged:
+        raise ValueError("No restaurants found in the specified radius.")
+    return list(merged.values())
+
+
+def next_coverage_page(gmaps, last_info):
+    """
+    Fetch the details of the next config.COVERAGE_PAGE_SIZE results of a
+    coverage search, so the first cards do not wait on the details of every
+    merged result. Sets last_info["next_page_token"] to COVERAGE_PAGE_TOKEN
+    while results remain, None once they are all detailed.
+
+    Returns:
+        List[RestaurantRecord]: The restaurants of the page.
+    """
+    pending = last_info["pending_results"]
+    page = pending[: config.COVERAGE_PAGE_SIZE]
+    last_info["pending_results"] = pending[config.COVERAGE_PAGE_SIZE :]
+    last_info["next_page_token"] = (
+        COVERAGE_PAGE_TOKEN if last_info["pending_results"] else None
+    )
+    return gmaps.extract_restaurant_info(page)
 
 
 def search_nearby_restaurants(
@@ -10,6 +124,8 @@ def search_nearby_restaurants(
     radius=10000,
     next_page_token=None,
     last_info=None,
+    coverage=False,
+    grid=None,
 ):
     """
     Search for nearby restaurants based on location information.
@@ -21,6 +137,11 @@ def search_nearby_restaurants(
         radius (int, optional): Search radius in meters. Default is 100000.
         next_page_token (str, optional): Token for pagination.
         last_info (dict, optional): Dictionary to store state between calls.
+        coverage (bool, optional): Fan the search out over several centres
+            (see fetch_coverage_results) instead of paginating one search.
+            The merged results are returned in pages of details, see
+            next_coverage_page.
+        grid (int, optional): Split a coverage search into grid x grid cells.
 
     Returns:
         tuple: (results, next_page_token, status_code, error_message)
@@ -31,9 +152,15 @@ def search_nearby_restaurants(
     """
     if last_info is None:
         last_info = {}
+    gmaps = get_gmaps()
 
     lat_lng = {"lat": lat, "lng": lng} if lat and lng else None
 
+    if next_page_token and last_info.get("pending_results"):
+        # The rest of a coverage search, only the details are left to fetch
+        restaurants_result = next_coverage_page(gmaps, last_info)
+        return restaurants_result, last_info["next_page_token"], 200, None
+
     if next_page_token:
         restaurants_response, next_page_token = gmaps.get_nearby_restaurants(
             page_token=last_info.get("next_page_token"),
@@ -48,6 +175,17 @@ def search_nearby_restaurants(
     if address:
         lat_lng = gmaps.get_address_gecode(address)
 
+    if lat_lng and coverage:
+        try:
+            last_info["pending_results"] = fetch_coverage_results(
+                gmaps, lat_lng, radius, grid
+            )
+            last_info["lat_lng"] = lat_lng
+            last_info["radius"] = radius
+            restaurants_result = next_coverage_page(gmaps, last_info)
+            return restaurants_result, last_info["next_page_token"], 200, None
+        except ValueError as e:
+            return None, None, 400, str(e)
     if lat_lng:
         try:
             restaurants_response, next_page_token = gmaps.get_nearby_restaurants(
@@ -63,3 +201,99 @@ def search_nearby_restaurants(
             return None, None, 400, str(e)
     else:
         return None, None, 400, "lat_lng are required."
+
+
+def stream_nearby_restaurants(
+    address=None,
+    lat=None,
+    lng=None,
+    radius=10000,
+    last_info=None,
+    coverage=False,
+    grid=None,
+):
+    """
+    Stream nearby restaurants one at a time, across every page of results.
+
+    Each restaurant is yielded as soon as its details resolve, so callers can
+    forward the first card after a single detail round trip.
+
+    Args:
+        address (str, optional): Address string to geocode.
+        lat (float, optional): Latitude coordinate.
+        lng (float, optional): Longitude coordinate.
+        radius (int, optional): Search radius in meters. Default is 10000.
+        last_info (dict, optional): Dictionary to store state between calls.
+        coverage (bool, optional): Fan the search out over several centres,
+            streamed as a single page (see fetch_coverage_results).
+        grid (int, optional): Split a coverage search into grid x grid cells.
+
+    Yields:
+        dict: Events of the form
+              {"type": "restaurant", "restaurant": {...}},
+              {"type": "page", "page": n, "count": k},
+              {"type": "error", "status": status_code, "error": message} or
+              {"type": "done", "count": total}
+    """
+    if last_info is None:
+        last_info = {}
+    gmaps = get_gmaps()
+
+    lat_lng = {"lat": lat, "lng": lng} if lat and lng else None
+    if address:
+        lat_lng = gmaps.get_address_gecode(address)
+    if not lat_lng:
+        yield {"type": "error", "status": 400, "error": "lat_lng are required."}
+        return
+
+    if coverage:
+        try:
+            restaurants_response = fetch_coverage_results(gmaps, lat_lng, radius, grid)
+        except ValueError as e:
+            yield {"type": "error", "status": 400, "error": str(e)}
+            return
+        last_info["lat_lng"] = lat_lng
+        last_info["radius"] = radius
+        count = 0
+        for restaurant in gmaps.iter_restaurant_info(restaurants_response):
+            count += 1
+            yield {"type": "restaurant", "restaurant": restaurant}
+        yield {"type": "page", "page": 1, "count": count}
+        yield {"type": "done", "count": count}
+        return
+
+    total = 0
+    page = 0
+    next_page_token = None
+    while True:
+        try:
+            restaurants_response, next_page_token = gmaps.get_nearby_restaurants(
+                location=lat_lng, radius=radius, page_token=next_page_token
+            )
+        except ValueError as e:
+            if page == 0:
+                yield {"type": "error", "status": 400, "error": str(e)}
+                return
+            break
+        except Exception as e:
+            logging.error(f"Error fetching page {page + 1}: {str(e)}")
+            if page == 0:
+                yield {"type": "error", "status": 502, "error": str(e)}
+                return
+            break
+
+        page += 1
+        count = 0
+        for restaurant in gmaps.iter_restaurant_info(restaurants_response):
+            count += 1
+            yield {"type": "restaurant", "restaurant": restaurant}
+        total += count
+        yield {"type": "page", "page": page, "count": count}
+
+        last_info["next_page_token"] = next_page_token
+        last_info["lat_lng"] = lat_lng
+        last_info["radius"] = radius
+        if not next_page_token:
+            break
+
+    yield {"type": "done", "count": total}
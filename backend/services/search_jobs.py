@@ -0,0 +1,169 @@
+import os
+import sys
+import time
+import uuid
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from services.job_executor import JobCancelledError
+
+
+class SearchJob:
+    """
+    State of one /search request and its background processing.
+
+    Attributes:
+        job_id (str): Unique ID of the job.
+        user_id (str): The user who started the search.
+        params (dict): The search parameters (address, lat, lng, radius, and
+            coverage and grid for coverage searches).
+        search_state (dict): Pagination state of this search (next_page_token,
+            lat_lng, radius, and the pending_results of a coverage search),
+            passed to search_nearby_restaurants as last_info.
+        status (str): pending, fetching, clustering, uploading, done, failed,
+            cancelled or rejected.
+        pages_fetched (int): Number of result pages fetched so far.
+        restaurants_fetched (int): Number of restaurants fetched so far.
+        restaurants_clustered (int): Number of restaurants in the last upload.
+        clustering (str): pending, running, done or failed.
+        upload (str): pending, running, done or failed.
+        error (str): Error message if the job failed.
+        first_page (list): Restaurants of the first page, returned to
+            duplicates of the search while the job is in flight.
+    """
+
+    def __init__(self, user_id, params):
+        self.job_id = str(uuid.uuid4())
+        self.user_id = user_id
+        self.params = params
+        self.search_state = {}
+        self.status = "pending"
+        self.pages_fetched = 0
+        self.restaurants_fetched = 0
+        self.restaurants_clustered = 0
+        self.clustering = "pending"
+        self.upload = "pending"
+        self.error = None
+        self.first_page = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+
+    def update(self, **fields):
+        """
+        Set job fields atomically and bump updated_at. A cancelled job keeps
+        its status, so work finishing after the cancel cannot mark it done.
+        """
+        with self._lock:
+            if self._cancel_event.is_set():
+                fields.pop("status", None)
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.updated_at = time.time()
+
+    def record_page(self, restaurant_count):
+        """Count one more fetched page of `restaurant_count` restaurants."""
+        with self._lock:
+            self.pages_fetched += 1
+            self.restaurants_fetched += restaurant_count
+            self.updated_at = time.time()
+
+    def fail(self, error):
+        self.update(status="failed", error=str(error))
+
+    def cancel(self):
+        """Ask the job to stop at its next checkpoint."""
+        with self._lock:
+            self._cancel_event.set()
+            if not self.finished:
+                self.status = "cancelled"
+                self.updated_at = time.time()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise JobCancelledError if the job has been cancelled."""
+        if self.cancelled:
+            raise JobCancelledError(f"Search job {self.job_id} was cancelled")
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled", "rejected")
+
+    @property
+    def suggestions_ready(self) -> bool:
+        """Whether clustered data has been uploaded for /suggestion to use."""
+        return self.upload == "done"
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "user_id": self.user_id,
+                "params": self.params,
+                "status": self.status,
+                "pages_fetched": self.pages_fetched,
+                "restaurants_fetched": self.restaurants_fetched,
+                "restaurants_clustered": self.restaurants_clustered,
+                "clustering": self.clustering,
+                "upload": self.upload,
+                "suggestions_ready": self.upload == "done",
+                "error": self.error,
+                "created_at": self.created_at,
+                "updated_at": self.updated_at,
+            }
+
+
+class SearchJobRegistry:
+    """
+    In-process registry of search jobs, indexed by job ID and by user.
+
+    Finished jobs are dropped once they are older than `ttl_seconds`.
+    """
+
+    def __init__(self, ttl_seconds=config.SEARCH_JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._jobs = {}
+        self._latest_by_user = {}
+        self._lock = threading.Lock()
+
+    def create(self, user_id, params) -> SearchJob:
+        """
+        Register a new job as the latest search of `user_id`. The user's
+        previous search, if still running, is cancelled.
+        """
+        job = SearchJob(user_id, params)
+        with self._lock:
+            self._prune()
+            previous = self._jobs.get(self._latest_by_user.get(user_id))
+            self._jobs[job.job_id] = job
+            self._latest_by_user[user_id] = job.job_id
+        if previous is not None and not previous.finished:
+            previous.cancel()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest_for_user(self, user_id):
+        with self._lock:
+            job_id = self._latest_by_user.get(user_id)
+            return self._jobs.get(job_id) if job_id else None
+
+    def _prune(self):
+        """Drop expired finished jobs. Called with the lock held."""
+        now = time.time()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and now - job.updated_at > self.ttl_seconds
+        ]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if self._latest_by_user.get(job.user_id) == job_id:
+                del self._latest_by_user[job.user_id]
@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+
+import pytest
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import backend
+from services import registry
+
+
+class FakePhotoService:
+    def prefetch(self, place_ids, limit=None):
+        pass
+
+
+class FakeStorage:
+    def get_data(self, user_id=None):
+        return []
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Fresh registry with no heavy clients, built lazily as the routes need them
+    monkeypatch.setattr(registry, "_instances", {"photo_service": FakePhotoService()})
+    clustered = []
+
+    def fake_cluster_and_upload(job, pages, state=None):
+        for page in pages:
+            clustered.append([r["place_id"] for r in page])
+        return state
+
+    monkeypatch.setattr(backend, "cluster_and_upload", fake_cluster_and_upload)
+    test_client = backend.app.test_client()
+    test_client.clustered = clustered
+    return test_client
+
+
+def fake_stream(events):
+    def stream(last_info=None, **params):
+        for event in events:
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    return stream
+
+
+def restaurant(place_id):
+    return {"type": "restaurant", "restaurant": {"place_id": place_id}}
+
+
+def read_events(response, limit=None):
+    events = []
+    for line in response.response:
+        line = line.decode() if isinstance(line, bytes) else line
+        events.append(json.loads(line))
+        if limit is not None and len(events) == limit:
+            break
+    response.close()
+    return events
+
+
+def search_job(events):
+    job = registry.get_search_jobs().get(events[0]["job_id"])
+    registry.get_background_executor()._queue.join()
+    return job
+
+
+def test_stream_sends_events_and_clusters_each_page(client, monkeypatch):
+    monkeypatch.setattr(
+        backend,
+        "stream_nearby_restaurants",
+        fake_stream(
+            [
+                restaurant("a"),
+                restaurant("b"),
+                {"type": "page", "page": 1, "count": 2},
+                restaurant("c"),
+                {"type": "page", "page": 2, "count": 1},
+                {"type": "done", "count": 3},
+            ]
+        ),
+    )
+    response = client.get("/search?lat=1&lng=2&stream=1&user_id=u")
+    assert response.mimetype == "application/x-ndjson"
+    events = read_events(response)
+
+    assert [event["type"] for event in events] == [
+        "job",
+        "restaurant",
+        "restaurant",
+        "page",
+        "restaurant",
+        "page",
+        "done",
+    ]
+    job = search_job(events)
+    assert client.clustered == [["a", "b"], ["c"]]
+    assert job.status == "done"
+    assert job.pages_fetched == 2
+    assert [r["place_id"] for r in job.first_page] == ["a", "b"]
+
+
+def test_stream_failure_fails_the_job(client, monkeypatch):
+    monkeypatch.setattr(
+        backend,
+        "stream_nearby_restaurants",
+        fake_stream([restaurant("a"), RuntimeError("upstream down")]),
+    )
+    events = read_events(client.get("/search?lat=1&lng=2&stream=1&user_id=u"))
+
+    assert events[-1] == {"type": "error", "status": 502, "error": "upstream down"}
+    job = search_job(events)
+    assert job.status == "failed"
+    # The restaurant streamed before the failure is still clustered
+    assert client.clustered == [["a"]]
+
+
+def test_disconnect_clusters_what_was_streamed(client, monkeypatch):
+    monkeypatch.setattr(
+        backend,
+        "stream_nearby_restaurants",
+        fake_stream([restaurant("a"), restaurant("b")]),
+    )
+    events = read_events(client.get("/search?lat=1&lng=2&stream=1&user_id=u"), 2)
+
+    job = search_job(events)
+    assert client.clustered == [["a"]]
+    assert job.status == "done"
+
+
+def test_disconnect_before_any_restaurant_cancels_the_job(client, monkeypatch):
+    monkeypatch.setattr(
+        backend, "stream_nearby_restaurants", fake_stream([restaurant("a")])
+    )
+    events = read_events(client.get("/search?lat=1&lng=2&stream=1&user_id=u"), 1)
+
+    job = search_job(events)
+    assert client.clustered == []
+    assert job.status == "cancelled"
+
+
+def test_newer_search_stops_the_stream(client, monkeypatch):
+    def stream(last_info=None, **params):
+        yield restaurant("a")
+        yield {"type": "page", "page": 1, "count": 1}
+        # The same user starts another search while this one streams
+        registry.get_search_jobs().create("u", {})
+        yield restaurant("b")
+        yield {"type": "page", "page": 2, "count": 1}
+
+    monkeypatch.setattr(backend, "stream_nearby_restaurants", stream)
+    events = read_events(client.get("/search?lat=1&lng=2&stream=1&user_id=u"))
+
+    assert [event["type"] for event in events] == ["job", "restaurant", "page"]
+    job = search_job(events)
+    assert job.status == "cancelled"
+
+
+def test_ready_reports_lazy_process_as_ready(client, monkeypatch):
+    monkeypatch.setattr(backend.config, "LAZY_INIT", True)
+    monkeypatch.setattr(registry, "_warm_up_state", {"status": "idle", "error": None})
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.get_json()["lazy_init"] is True
+
+
+def test_ready_is_unavailable_until_eager_warm_up_finishes(client, monkeypatch):
+    monkeypatch.setattr(backend.config, "LAZY_INIT", False)
+    state = {"status": "running", "error": None}
+    monkeypatch.setattr(registry, "_warm_up_state", state)
+    assert client.get("/ready").status_code == 503
+
+    state["status"] = "ready"
+    assert client.get("/ready").status_code == 200
+
+
+def test_first_page_error_fails_the_job(client, monkeypatch):
+    def broken_search(last_info=None, **params):
+        raise IndexError("list index out of range")  # e.g. an unknown address
+
+    monkeypatch.setattr(backend, "search_nearby_restaurants", broken_search)
+    response = client.get("/search?address=nowhere&user_id=u")
+    assert response.status_code == 502
+    job = registry.get_search_jobs().get(response.get_json()["job_id"])
+    assert job.status == "failed"
+
+    # /suggestion no longer waits for the failed search
+    monkeypatch.setattr(registry, "get_storage", lambda: FakeStorage())
+    suggestion = client.post("/suggestion", json={"user_id": "u"})
+    assert suggestion.status_code == 404
@@ -0,0 +1,63 @@
+import os
+import sys
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from utils.cache import SQLiteCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SQLiteCache(
+        str(tmp_path / "cache.sqlite3"), "test_entries", ttl_seconds=60, max_entries=3
+    )
+
+
+def test_get_or_fetch_reads_through(cache):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"name": "Test Restaurant"}
+
+    assert cache.get_or_fetch("place", fetch) == {"name": "Test Restaurant"}
+    assert cache.get_or_fetch("place", fetch) == {"name": "Test Restaurant"}
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_empty_results_are_not_cached(cache):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {}
+
+    assert cache.get_or_fetch("empty", fetch) == {}
+    assert cache.get_or_fetch("empty", fetch) == {}
+    assert len(calls) == 2
+
+
+def test_expired_entries_are_misses(cache):
+    cache.ttl_seconds = -1
+    cache.set("place", {"name": "Old"})
+    assert cache.get("place") is None
+
+
+def test_evicts_least_recently_used(cache):
+    for key in ["a", "b", "c"]:
+        cache.set(key, key)
+    cache.get("a")  # "b" is now the least recently used entry
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert cache.stats()["size"] == 3
+
+
+def test_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path, "test_entries", 60, 10).set("place", [1, 2])
+    assert SQLiteCache(path, "test_entries", 60, 10).get("place") == [1, 2]
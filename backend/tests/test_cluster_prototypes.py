@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pandas as pd
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.cluster_prototypes import ClusterModelCache, ClusterPrototypes
+
+
+def make_features(rows):
+    return pd.DataFrame(rows, columns=["rating", "price_level", "bar", "cafe"])
+
+
+def test_assign_new_rows_to_closest_prototype():
+    features = make_features(
+        [[4.5, 1, 0, 1], [4.4, 1, 0, 1], [2.0, 4, 1, 0], [2.2, 4, 1, 0]]
+    )
+    prototypes = ClusterPrototypes.from_labels(
+        features, [0, 0, 1, 1], ["bar", "cafe"], gamma=1.0
+    )
+    labels = prototypes.assign(make_features([[4.6, 1, 0, 1], [2.1, 3, 1, 0]]))
+    assert labels.tolist() == [0, 1]
+
+
+def test_refine_moves_prototypes_without_refit():
+    features = make_features([[4.5, 1, 0, 1], [2.0, 4, 1, 0]])
+    prototypes = ClusterPrototypes.from_labels(
+        features, [0, 1], ["bar", "cafe"], gamma=1.0
+    )
+    more = pd.concat(
+        [features, make_features([[4.0, 2, 0, 1], [1.0, 4, 1, 0]])],
+        ignore_index=True,
+    )
+    labels = prototypes.refine(more, iterations=5)
+    assert labels.tolist() == [0, 1, 0, 1]
+    assert prototypes.counts.tolist() == [2, 2]
+    assert prototypes.centroids[0].tolist() == [4.25, 1.5]
+
+
+def test_model_cache_reuses_overlapping_area():
+    features = make_features([[4.5, 1, 0, 1], [2.0, 4, 1, 0]])
+    prototypes = ClusterPrototypes.from_labels(
+        features, [0, 1], ["bar", "cafe"], gamma=1.0
+    )
+    cache = ClusterModelCache(ttl_seconds=60, max_entries=1, min_overlap=0.5)
+    cache.put("tile-a", ["a", "b"], prototypes)
+
+    cached = cache.get("tile-a", ["a", "c"])
+    assert cached is not None and cached is not prototypes
+    cached.refine(make_features([[1.0, 1, 0, 1]]))
+    assert prototypes.counts.tolist() == [1, 1]  # The cached copy is untouched
+
+    assert cache.get("tile-a", ["c", "d"]) is None
+    cache.put("tile-b", ["c"], prototypes)
+    assert cache.get("tile-a", ["a", "b"]) is None  # Evicted
+    assert cache.stats()["hits"] == 1
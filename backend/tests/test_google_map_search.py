@@ -5,14 +5,18 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import pytest
-from google_map_search import GoogleMapSearch
+import config
+from services.google_map_search import GoogleMapSearch
+from utils.cache import NearbySearchCache, PlaceDetailsCache
+from utils.geo_tiles import max_centre_offset
+
 
 # Define a fake client to simulate responses from googlemaps.Client
 class FakeGoogleMapsClient:
     def geocode(self, address):
         # Fake response for get_address_gecode()
         return [{"geometry": {"location": {"lat": 12.34, "lng": 56.78}}}]
-    
+
     def geolocate(self):
         # Fake response for get_self_geocode()
         return {"location": {"lat": 98.76, "lng": 54.32}}
@@ -21,9 +25,13 @@ class FakeGoogleMapsClient:
         # Fake response for get_nearby_restaurants()
         return {
             "results": [
-                {"place_id": "fake_place", "name": "Fake Restaurant", "vicinity": "Fake Address"}
+                {
+                    "place_id": "fake_place",
+                    "name": "Fake Restaurant",
+                    "vicinity": "Fake Address",
+                }
             ],
-            "next_page_token": None
+            "next_page_token": None,
         }
 
     def place(self, place_id, reviews_sort, fields):
@@ -35,7 +43,7 @@ class FakeGoogleMapsClient:
                 "geometry": {"location": {"lat": 12.34, "lng": 56.78}},
                 "current_opening_hours": {
                     "open_now": True,
-                    "weekday_text": ["Monday: 9:00 AM – 5:00 PM"]
+                    "weekday_text": ["Monday: 9:00 AM – 5:00 PM"],
                 },
                 "user_ratings_total": 100,
                 "price_level": 2,
@@ -44,29 +52,33 @@ class FakeGoogleMapsClient:
                 "vicinity": "Test Vicinity",
                 "website": "http://test.com",
                 "formatted_phone_number": "123-456-7890",
-                "photos": []
+                "photos": [],
             }
         }
 
+
 @pytest.fixture
 def fake_google_map_search(monkeypatch):
     # Use a dummy API key that starts with "AIza" to satisfy the validation in the googlemaps.Client
     gms = GoogleMapSearch(api_key="AIzaDummyKey")
     fake_client = FakeGoogleMapsClient()
-    
+
     # Replace the real googlemaps.Client with the fake one.
     monkeypatch.setattr(gms, "client", fake_client)
     return gms
 
+
 def test_get_address_gecode(fake_google_map_search):
     address = "Some Fake Address"
     result = fake_google_map_search.get_address_gecode(address)
     assert result == {"lat": 12.34, "lng": 56.78}
 
+
 def test_get_self_geocode(fake_google_map_search):
     result = fake_google_map_search.get_self_geocode()
     assert result == {"lat": 98.76, "lng": 54.32}
 
+
 def test_clean_weekday_text(fake_google_map_search):
     # Provide a test string with fancy unicode spacing characters.
     input_text = ["Monday: 11:30\u202fAM\u2009–\u20092:30\u202fPM"]
@@ -74,17 +86,160 @@ def test_clean_weekday_text(fake_google_map_search):
     output = fake_google_map_search.clean_weekday_text(input_text)
     assert output == expected
 
+
 def test_get_nearby_restaurants(fake_google_map_search):
     location = {"lat": 12.34, "lng": 56.78}
     keyword = "test"
     radius = 5000
-    results, next_page = fake_google_map_search.get_nearby_restaurants(location, keyword, radius)
+    results, next_page = fake_google_map_search.get_nearby_restaurants(
+        location, keyword, radius
+    )
     assert isinstance(results, list)
     assert len(results) > 0
     assert next_page is None
 
+
 def test_get_info_by_place_id(fake_google_map_search):
     info = fake_google_map_search.get_info_by_place_id("fake_place")
     assert info["name"] == "Test Restaurant"
     assert info["formatted_address"] == "Test Address"
-    assert info["current_opening_hours"]["open_now"] is True
\ No newline at end of file
+    assert info["current_opening_hours"]["open_now"] is True
+
+
+def test_extract_restaurant_info_keeps_order(fake_google_map_search, monkeypatch):
+    def fake_place(place_id, reviews_sort, fields):
+        return {"result": {"name": f"Restaurant {place_id}", "types": ["restaurant"]}}
+
+    monkeypatch.setattr(fake_google_map_search.client, "place", fake_place)
+    restaurants = [{"place_id": f"place_{i}"} for i in range(10)]
+    results = fake_google_map_search.extract_restaurant_info(restaurants, max_workers=4)
+    assert [r["place_id"] for r in results] == [r["place_id"] for r in restaurants]
+    assert results[3]["restaurant_name"] == "Restaurant place_3"
+
+
+def test_extract_restaurant_info_skips_failures(fake_google_map_search, monkeypatch):
+    original_place = fake_google_map_search.client.place
+
+    def flaky_place(place_id, reviews_sort, fields):
+        if place_id == "broken":
+            raise RuntimeError("boom")
+        return original_place(place_id, reviews_sort, fields)
+
+    monkeypatch.setattr(fake_google_map_search.client, "place", flaky_place)
+    restaurants = [{"place_id": "a"}, {"place_id": "broken"}, {"place_id": "b"}]
+    results = fake_google_map_search.extract_restaurant_info(restaurants)
+    assert [r["place_id"] for r in results] == ["a", "b"]
+
+
+def test_nearby_searches_share_a_tile(fake_google_map_search, monkeypatch, tmp_path):
+    calls = []
+
+    def fake_places_nearby(**kwargs):
+        calls.append(kwargs)
+        if kwargs["page_token"]:
+            return {"results": [{"place_id": "second_page"}], "next_page_token": None}
+        return {"results": [{"place_id": "first_page"}], "next_page_token": "upstream"}
+
+    monkeypatch.setattr(
+        fake_google_map_search.client, "places_nearby", fake_places_nearby
+    )
+    fake_google_map_search.nearby_cache = NearbySearchCache(
+        path=str(tmp_path / "cache.sqlite3")
+    )
+
+    results, token = fake_google_map_search.get_nearby_restaurants(
+        {"lat": 38.8528, "lng": -77.3318}, radius=10000
+    )
+    more, last_token = fake_google_map_search.get_nearby_restaurants(page_token=token)
+    assert results[0]["place_id"] == "first_page"
+    assert more[0]["place_id"] == "second_page"
+    assert last_token is None
+    assert calls[1]["page_token"] == "upstream"
+
+    # A search a few hundred meters away reuses both cached pages
+    nearby, token = fake_google_map_search.get_nearby_restaurants(
+        {"lat": 38.8530, "lng": -77.3320}, radius=9000
+    )
+    fake_google_map_search.get_nearby_restaurants(page_token=token)
+    assert nearby == results
+    assert len(calls) == 2
+
+
+def test_expired_tile_page_token_restarts_the_tile(
+    fake_google_map_search, monkeypatch, tmp_path
+):
+    calls = []
+
+    def fake_places_nearby(**kwargs):
+        calls.append(kwargs["page_token"])
+        if kwargs["page_token"]:
+            return {"results": [{"place_id": "second_page"}], "next_page_token": None}
+        token = f"upstream_{len(calls)}"
+        return {"results": [{"place_id": "first_page"}], "next_page_token": token}
+
+    monkeypatch.setattr(
+        fake_google_map_search.client, "places_nearby", fake_places_nearby
+    )
+    fake_google_map_search.nearby_cache = NearbySearchCache(
+        path=str(tmp_path / "cache.sqlite3")
+    )
+    _, token = fake_google_map_search.get_nearby_restaurants(
+        {"lat": 38.8528, "lng": -77.3318}, radius=10000
+    )
+
+    # The upstream token of the cached first page has outlived Google's
+    monkeypatch.setattr(config, "PAGE_TOKEN_TTL_SECONDS", -1)
+    more, _ = fake_google_map_search.get_nearby_restaurants(page_token=token)
+    assert more[0]["place_id"] == "second_page"
+    assert calls == [None, None, "upstream_2"]
+
+
+@pytest.mark.parametrize("radius", config.TILE_RADIUS_BUCKETS)
+def test_tile_centre_offset_is_bounded(radius):
+    # Snapping moves a search by a few percent of its radius at most
+    assert max_centre_offset(radius) <= 0.07 * radius
+
+
+def test_details_are_fetched_once_per_place(
+    fake_google_map_search, monkeypatch, tmp_path
+):
+    requested = []
+
+    def fake_place(place_id, reviews_sort, fields):
+        requested.append(place_id)
+        return {
+            "result": {
+                "name": f"Restaurant {place_id}",
+                "reviews": [{"text": f"Great {place_id}"}],
+            }
+        }
+
+    monkeypatch.setattr(fake_google_map_search.client, "place", fake_place)
+    fake_google_map_search.details_cache = PlaceDetailsCache(
+        path=str(tmp_path / "cache.sqlite3")
+    )
+    for _ in range(2):
+        restaurants = fake_google_map_search.extract_restaurant_info(
+            [{"place_id": "a"}, {"place_id": "b"}]
+        )
+        assert restaurants[1]["reviews"] == [{"text": "Great b"}]
+    # Card fields and reviews come in one request per place, then from cache
+    assert sorted(requested) == ["a", "b"]
+
+
+def test_photo_references_are_bounded(fake_google_map_search, monkeypatch):
+    monkeypatch.setattr(config, "PHOTO_REFERENCES_MAX_PLACES", 2)
+    for place_id in ["a", "b", "c"]:
+        fake_google_map_search.get_place_photos(
+            place_id, [{"photo_reference": f"ref_{place_id}"}]
+        )
+    assert list(fake_google_map_search.photo_references) == ["b", "c"]
+
+    # An evicted place falls back to its place details
+    monkeypatch.setattr(
+        fake_google_map_search,
+        "get_info_by_place_id",
+        lambda place_id: {"photos": [{"photo_reference": f"ref_{place_id}"}]},
+    )
+    assert fake_google_map_search.get_photo_reference("a", 0) == "ref_a"
+    assert list(fake_google_map_search.photo_references) == ["c", "a"]
@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import utils.helpers as helpers
+from utils.helpers import Tools
+
+WORD_VECTORS = {
+    "great": [1.0, 0.0, 0.0],
+    "pizza": [0.0, 2.0, 0.0],
+    "slow": [0.0, 0.0, 3.0],
+    "service": [1.0, 1.0, 1.0],
+}
+
+
+class FakeDoc:
+    def __init__(self, text):
+        self.tokens = text.split()
+        self.vector = np.mean(
+            [WORD_VECTORS[token] for token in self.tokens], axis=0
+        ).astype(np.float32)
+
+    def __len__(self):
+        return len(self.tokens)
+
+
+class FakeVectors:
+    shape = (len(WORD_VECTORS), 3)
+
+
+class FakeVocab:
+    vectors = FakeVectors()
+
+
+class FakeLanguage:
+    """Stands in for the spaCy pipeline: a doc vector is its mean word vector."""
+
+    vocab = FakeVocab()
+
+    def __init__(self):
+        self.pipe_calls = []
+
+    def __call__(self, text, disable=None):
+        return FakeDoc(text)
+
+    def pipe(self, texts, batch_size=None, disable=None):
+        self.pipe_calls.append(disable)
+        for text in texts:
+            yield FakeDoc(text)
+
+
+@pytest.fixture
+def nlp(monkeypatch):
+    fake = FakeLanguage()
+    monkeypatch.setattr(helpers, "_embedding", fake)
+    return fake
+
+
+def test_embed_texts_matches_per_text_embeddings(nlp):
+    tools = Tools()
+    texts = ["great pizza", "", "slow service service", "pizza"]
+    vectors, token_counts = tools.embed_texts(texts, batch_size=2)
+
+    assert nlp.pipe_calls == [helpers.EMBEDDING_DISABLED_PIPES]
+    assert vectors.dtype == np.float32
+    assert list(token_counts) == [2, 0, 3, 1]
+    for text, vector in zip(texts, vectors):
+        expected = nlp(text).vector if text else np.zeros(3)
+        np.testing.assert_allclose(vector, expected)
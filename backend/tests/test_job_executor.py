@@ -0,0 +1,53 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.job_executor import BackgroundExecutor, JobRejectedError
+from services.search_jobs import SearchJob, SearchJobRegistry
+
+
+def blocking(job, started, release):
+    started.set()
+    release.wait(5)
+
+
+def test_dedupe_and_backpressure():
+    executor = BackgroundExecutor(max_workers=1, max_queue=1)
+    started, release = threading.Event(), threading.Event()
+    running = SearchJob("u", {})
+    executor.submit(running, blocking, started, release, dedupe_key="a")
+    assert started.wait(5)
+
+    # Same key while in flight returns the running job
+    duplicate = SearchJob("u", {})
+    assert (
+        executor.submit(duplicate, blocking, started, release, dedupe_key="a")
+        is running
+    )
+
+    queued = SearchJob("v", {})
+    executor.submit(queued, blocking, started, release, dedupe_key="b")
+    with pytest.raises(JobRejectedError):
+        executor.submit(SearchJob("w", {}), blocking, started, release)
+
+    release.set()
+    executor._queue.join()
+    metrics = executor.metrics()
+    assert metrics["completed"] == 2
+    assert metrics["deduplicated"] == 1
+    assert metrics["rejected"] == 1
+    assert metrics["in_flight"] == 0
+
+
+def test_new_search_cancels_previous():
+    jobs = SearchJobRegistry()
+    first = jobs.create("u", {})
+    second = jobs.create("u", {})
+    assert first.cancelled and first.status == "cancelled"
+    assert not second.cancelled
+    assert jobs.latest_for_user("u") is second
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.kprototypes import FastKPrototypes
+
+
+def make_groups(n_groups, per_group=20, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for group in range(n_groups):
+        for _ in range(per_group):
+            rows.append([group * 10 + rng.normal(0, 0.5), group % 2, f"type{group}"])
+    return np.array(rows, dtype=object), np.repeat(np.arange(n_groups), per_group)
+
+
+def same_partition(labels, expected):
+    pairs = set(zip(labels.tolist(), expected.tolist()))
+    return len(pairs) == len(set(expected.tolist())) == len(set(labels.tolist()))
+
+
+def test_fit_recovers_separated_groups():
+    X, expected = make_groups(3)
+    model = FastKPrototypes(n_clusters=3, random_state=0)
+    labels = model.fit_predict(X, categorical=[1, 2])
+    assert same_partition(labels, expected)
+    assert model.cluster_centroids_.shape == (3, 1)
+    assert sorted(model.cluster_modes_[:, 1].tolist()) == ["type0", "type1", "type2"]
+
+
+def test_auto_k_picks_number_of_groups():
+    X, expected = make_groups(4)
+    model = FastKPrototypes(n_clusters="auto", k_range=(2, 6), random_state=0)
+    labels = model.fit_predict(X, categorical=[1, 2])
+    assert model.n_clusters_ == 4
+    assert same_partition(labels, expected)
+
+
+def test_more_clusters_than_rows():
+    X, _ = make_groups(1, per_group=2)
+    labels = FastKPrototypes(n_clusters=4, random_state=0).fit_predict(
+        X, categorical=[1, 2]
+    )
+    assert len(labels) == 2
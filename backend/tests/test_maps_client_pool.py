@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pytest
+from googlemaps.exceptions import ApiError, TransportError
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.maps_client_pool import MapsClientPool, NoAvailableKeyError, TokenBucket
+
+
+class FakeClient:
+    def __init__(self, key, errors=None):
+        self.key = key
+        self.errors = list(errors or [])
+        self.calls = 0
+
+    def geocode(self, address):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return [{"key": self.key, "address": address}]
+
+
+def make_pool(errors=None, **kwargs):
+    clients = {}
+
+    def factory(key, qps, burst):
+        clients[key] = FakeClient(key, (errors or {}).get(key))
+        return clients[key]
+
+    kwargs.setdefault("qps", 1000)
+    kwargs.setdefault("burst", 1000)
+    pool = MapsClientPool(keys=["key-a", "key-b"], client_factory=factory, **kwargs)
+    return pool, clients
+
+
+def test_requests_rotate_across_keys():
+    pool, clients = make_pool()
+    used = [pool.geocode("x")[0]["key"] for _ in range(4)]
+    assert used == ["key-a", "key-b", "key-a", "key-b"]
+
+
+def test_throttled_key_is_rested_and_request_retried():
+    pool, clients = make_pool(errors={"key-a": [ApiError("OVER_QUERY_LIMIT")]})
+    assert pool.geocode("x")[0]["key"] == "key-b"
+    # key-a is cooling down, every request goes to key-b
+    assert [pool.geocode("x")[0]["key"] for _ in range(3)] == ["key-b"] * 3
+    stats = pool.stats()
+    assert stats["available_keys"] == 1
+    assert stats["keys"][0]["throttled"] == 1
+
+
+def test_request_errors_do_not_penalise_the_key():
+    pool, clients = make_pool(errors={"key-a": [ApiError("INVALID_REQUEST")]})
+    with pytest.raises(ApiError):
+        pool.geocode("x")
+    assert pool.stats()["available_keys"] == 2
+
+
+def test_key_is_rested_after_repeated_transport_errors():
+    errors = {"key-a": [TransportError("down")] * 2}
+    pool, clients = make_pool(errors=errors, failure_threshold=2)
+    for _ in range(2):
+        with pytest.raises(TransportError):
+            pool.geocode("x")  # key-a
+        pool.geocode("x")  # key-b
+    assert not pool.stats()["keys"][0]["available"]
+
+
+def test_acquire_gives_up_when_every_key_is_limited():
+    pool, _ = make_pool(qps=0.01, burst=1, acquire_timeout=0.05)
+    pool.geocode("x")
+    pool.geocode("x")
+    with pytest.raises(NoAvailableKeyError):
+        pool.geocode("x")
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(rate=10, capacity=2)
+    now = bucket.updated
+    assert bucket.try_acquire(now) and bucket.try_acquire(now)
+    assert not bucket.try_acquire(now)
+    assert bucket.wait_time(now) == pytest.approx(0.1)
+    assert bucket.try_acquire(now + 0.1)
+
+
+def test_malformed_key_is_reported_when_the_pool_is_built():
+    with pytest.raises(ValueError, match=r"\.\.\.oops"):
+        MapsClientPool(keys=["AIzaGoodKey", "oops"])
@@ -0,0 +1,36 @@
+import os
+import sys
+import threading
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.photo_service import PhotoService
+
+
+class BlockingGoogleMapSearch:
+    def __init__(self):
+        self.release = threading.Event()
+        self.fetched = []
+
+    def fetch_photo(self, place_id, photo_num):
+        self.release.wait(5)
+        self.fetched.append((place_id, photo_num))
+        return None
+
+
+class EmptyPhotoStore:
+    def get(self, place_id, photo_num):
+        return None
+
+
+def test_prefetch_drops_requests_over_the_pending_limit():
+    gmaps = BlockingGoogleMapSearch()
+    service = PhotoService(gmaps, EmptyPhotoStore(), max_workers=1, max_pending=4)
+    service.prefetch([f"place{i}" for i in range(10)], limit=10)
+    assert service._pending == 4
+
+    gmaps.release.set()
+    service._executor.shutdown(wait=True)
+    assert len(gmaps.fetched) == 4
+    assert service._pending == 0
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.photo_store import PhotoStore
+
+
+def test_put_and_get(tmp_path):
+    store = PhotoStore(root=str(tmp_path), max_bytes=1000, ttl_seconds=60)
+    path = store.put("place", 0, [b"abc", b"def"])
+    assert store.get("place", 0) == path
+    with open(path, "rb") as f:
+        assert f.read() == b"abcdef"
+    assert store.get("place", 1) is None
+    assert not [
+        name for name in os.listdir(tmp_path / "place") if name.endswith(".tmp")
+    ]
+
+
+def test_evicts_least_recently_used_over_budget(tmp_path):
+    store = PhotoStore(root=str(tmp_path), max_bytes=10, ttl_seconds=60)
+    store.put("a", 0, [b"x" * 4])
+    store.put("b", 0, [b"x" * 4])
+    store.get("a", 0)  # "b" is now the least recently used photo
+    store.put("c", 0, [b"x" * 4])
+    assert store.get("b", 0) is None
+    assert store.get("a", 0) is not None
+    assert store.total_bytes == 8
+    assert not os.path.exists(tmp_path / "b")
+
+
+def test_expired_photos_are_removed(tmp_path):
+    store = PhotoStore(root=str(tmp_path), max_bytes=1000, ttl_seconds=60)
+    store.put("place", 0, [b"abc"])
+    store.ttl_seconds = 0
+    time.sleep(0.01)
+    store.evict_expired()
+    assert store.get("place", 0) is None
+    assert store.total_bytes == 0
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    PhotoStore(root=str(tmp_path), max_bytes=1000, ttl_seconds=60).put("a", 2, [b"abc"])
+    store = PhotoStore(root=str(tmp_path), max_bytes=1000, ttl_seconds=60)
+    assert store.total_bytes == 3
+    assert store.get("a", 2) is not None
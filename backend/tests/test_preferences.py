@@ -0,0 +1,54 @@
+import os
+import sys
+
+import numpy as np
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ml_model import UserInterestPredictor, UserPreferences
+
+
+def make_cluster_data(n_restaurants=12, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "place_id": f"place-{i}",
+            "cluster": i % 3,
+            "restaurant_name": f"Restaurant {i}",
+            "review_vector": rng.normal(size=8).tolist(),
+            "review_tokens": int(rng.integers(10, 100)),
+        }
+        for i in range(n_restaurants)
+    ]
+
+
+def test_incremental_swipes_match_full_history():
+    model = UserInterestPredictor()
+    data = make_cluster_data()
+    likes, dislikes = ["place-0", "place-4"], ["place-2"]
+    full = model.predict(data, likes, dislikes)
+
+    preferences = UserPreferences()
+    model.predict(data, ["place-0"], [], preferences=preferences, delta=True)
+    model.predict(data, ["place-4"], ["place-2"], preferences=preferences, delta=True)
+    incremental = model.predict(data, [], [], preferences=preferences, delta=True)
+
+    assert incremental["place_id"].tolist() == full["place_id"].tolist()
+    np.testing.assert_allclose(incremental["final_score"], full["final_score"])
+    assert not set(likes + dislikes) & set(full["place_id"])
+
+
+def test_sync_rebuilds_when_history_restarts():
+    model = UserInterestPredictor()
+    data = make_cluster_data()
+    preferences = UserPreferences()
+    model.predict(data, ["place-0"], ["place-1"], preferences=preferences)
+    ranked = model.predict(data, ["place-3"], [], preferences=preferences)
+
+    assert list(preferences.liked) == ["place-3"]
+    assert not preferences.disliked
+    assert "place-0" in ranked["place_id"].tolist()
+    np.testing.assert_allclose(
+        ranked["final_score"], model.predict(data, ["place-3"], [])["final_score"]
+    )
@@ -0,0 +1,108 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import config
+import utils.helpers as helpers
+from services import registry
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(registry, "_instances", {})
+    monkeypatch.setattr(
+        registry,
+        "_warm_up_state",
+        {"status": "idle", "error": None, "duration_seconds": None},
+    )
+    monkeypatch.setattr(helpers, "_embedding", None)
+    return registry
+
+
+@pytest.fixture
+def fake_resources(fresh_registry, monkeypatch):
+    """Replace every heavy resource with a cheap object, counting builds."""
+    built = []
+
+    class FakeGoogleMapSearch:
+        client = object()
+
+    def fake(name, factory=object):
+        def get():
+            return registry._get(name, lambda: built.append(name) or factory())
+
+        return get
+
+    monkeypatch.setattr(registry, "get_gmaps", fake("gmaps", FakeGoogleMapSearch))
+    monkeypatch.setattr(registry, "get_photo_service", fake("photo_service"))
+    monkeypatch.setattr(registry, "get_storage", fake("storage"))
+    monkeypatch.setattr(registry, "get_model", fake("model"))
+    monkeypatch.setattr(
+        helpers, "get_embedding", lambda: setattr(helpers, "_embedding", object())
+    )
+    return built
+
+
+def test_nothing_is_built_before_first_use(fresh_registry, monkeypatch):
+    monkeypatch.setattr(config, "LAZY_INIT", True)
+    state = registry.readiness()
+    assert state["ready"]
+    assert state["warm_up"]["status"] == "idle"
+    assert not any(state["components"].values())
+
+
+def test_resources_are_built_once(fresh_registry):
+    builds = []
+
+    def factory():
+        builds.append(1)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry._get("x", factory)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert all(result is results[0] for result in results)
+    assert registry.peek("x") is results[0]
+
+
+def test_warm_up_builds_everything(fake_resources, monkeypatch):
+    monkeypatch.setattr(config, "LAZY_INIT", False)
+    assert not registry.readiness()["ready"]
+
+    registry.warm_up()
+    registry.warm_up()  # A second warm-up is a no-op
+    state = registry.readiness()
+    assert state["ready"]
+    assert state["warm_up"]["status"] == "ready"
+    assert sorted(fake_resources) == ["gmaps", "model", "photo_service", "storage"]
+    assert state["components"]["embedding"]
+
+
+def test_failed_warm_up_is_reported(fake_resources, monkeypatch):
+    monkeypatch.setattr(config, "LAZY_INIT", False)
+
+    def broken_storage():
+        raise RuntimeError("no credentials")
+
+    monkeypatch.setattr(registry, "get_storage", broken_storage)
+    with pytest.raises(RuntimeError):
+        registry.warm_up()
+    state = registry.readiness()
+    assert not state["ready"]
+    assert state["warm_up"] == {
+        "status": "failed",
+        "error": "no credentials",
+        "duration_seconds": None,
+    }
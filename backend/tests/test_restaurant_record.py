@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+
+import numpy as np
+import pandas as pd
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.restaurant_record import (
+    RestaurantRecord,
+    frame_to_dicts,
+    json_default,
+    records_to_frame,
+)
+
+
+def make_record(i):
+    return RestaurantRecord(
+        place_id=f"place-{i}",
+        restaurant_name=f"Restaurant {i}",
+        location={"lat": 38.85, "lng": -77.33},
+        price_level="N/A" if i % 2 else 2,
+        rating=4.5,
+        types=["restaurant", "food"],
+        delivery=bool(i % 2),
+        business_status="OPERATIONAL",
+    )
+
+
+def test_record_reads_like_a_dict():
+    record = make_record(1)
+    assert record["place_id"] == "place-1"
+    assert record.get("website") is None
+    assert record.get("missing", "default") == "default"
+    assert RestaurantRecord.from_dict(record.to_dict()) == record
+    assert (
+        json.loads(json.dumps({"restaurant": record}, default=json_default))[
+            "restaurant"
+        ]
+        == record.to_dict()
+    )
+
+
+def test_records_build_the_same_frame_as_dicts():
+    records = [make_record(i) for i in range(5)]
+    from_records = records_to_frame(records)
+    from_dicts = pd.DataFrame([record.to_dict() for record in records])
+    pd.testing.assert_frame_equal(from_records, from_dicts)
+
+
+def test_frame_to_dicts_matches_to_dict():
+    frame = records_to_frame([make_record(i) for i in range(5)])
+    frame["cluster"] = np.arange(5)
+    frame["review_vector"] = np.random.default_rng(0).random((5, 3)).tolist()
+    assert frame_to_dicts(frame) == frame.to_dict(orient="records")
+    assert type(frame_to_dicts(frame)[0]["cluster"]) is int
@@ -0,0 +1,112 @@
+import os
+import sys
+import math
+
+import pytest
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import config
+from services import restaurant_service
+from services.restaurant_service import (
+    coverage_locations,
+    fetch_coverage_results,
+    search_nearby_restaurants,
+)
+
+CENTER = {"lat": 38.8528, "lng": -77.3318}
+
+
+def offset_meters(location):
+    north = (location["lat"] - CENTER["lat"]) * 111000.0
+    east = (location["lng"] - CENTER["lng"]) * (
+        111000.0 * math.cos(math.radians(CENTER["lat"]))
+    )
+    return north, east
+
+
+@pytest.mark.parametrize("grid", [None, 2, 3, 5])
+def test_sub_searches_cover_the_whole_circle(grid):
+    radius = 10000
+    locations, sub_radius = coverage_locations(
+        CENTER["lat"], CENTER["lng"], radius, grid
+    )
+    centres = [offset_meters(location) for location in locations]
+    for angle in range(0, 360, 5):
+        for distance in (0, radius / 2, radius):
+            point = (
+                distance * math.sin(math.radians(angle)),
+                distance * math.cos(math.radians(angle)),
+            )
+            assert any(math.dist(point, centre) <= sub_radius + 1 for centre in centres)
+
+
+class FakeGoogleMapSearch:
+    def __init__(self):
+        self.calls = []
+        self.detailed = []
+
+    def fetch_nearby_restaurants(self, location, radius, page_token=None):
+        self.calls.append((location, radius))
+        north, east = offset_meters(location)
+        if north > 1:
+            raise ValueError("No restaurants found in the specified radius.")
+        if north < -1:
+            raise RuntimeError("boom")
+        # Every sub-search also finds the restaurant in the middle
+        return [{"place_id": "middle"}, {"place_id": f"{north:.0f},{east:.0f}"}], None
+
+    def extract_restaurant_info(self, restaurants):
+        self.detailed.append([r["place_id"] for r in restaurants])
+        return restaurants
+
+
+def test_grid_sub_searches_keep_their_exact_centres_and_radius():
+    gmaps = FakeGoogleMapSearch()
+    fetch_coverage_results(gmaps, CENTER, 10000, grid=3)
+    locations, sub_radius = coverage_locations(CENTER["lat"], CENTER["lng"], 10000, 3)
+
+    assert sorted(map(str, (location for location, _ in gmaps.calls))) == sorted(
+        map(str, locations)
+    )
+    assert {radius for _, radius in gmaps.calls} == {sub_radius}
+    assert sub_radius == 4715  # Not rounded up to a tile radius bucket
+
+
+def test_coverage_results_are_merged_and_deduplicated():
+    gmaps = FakeGoogleMapSearch()
+    results = fetch_coverage_results(gmaps, CENTER, 10000)
+
+    assert len(gmaps.calls) == 5
+    assert all(radius == 7500 for _, radius in gmaps.calls)
+    locations, _ = coverage_locations(CENTER["lat"], CENTER["lng"], 10000)
+    assert sorted(map(str, (location for location, _ in gmaps.calls))) == sorted(
+        map(str, locations)
+    )
+    place_ids = [result["place_id"] for result in results]
+    # North fails with no results, south with an error; centre, east and west remain
+    assert place_ids == ["middle", "0,0", "0,5000", "0,-5000"]
+
+
+def test_coverage_details_are_fetched_a_page_at_a_time(monkeypatch):
+    gmaps = FakeGoogleMapSearch()
+    monkeypatch.setattr(restaurant_service, "get_gmaps", lambda: gmaps)
+    monkeypatch.setattr(config, "COVERAGE_PAGE_SIZE", 3)
+    state = {}
+
+    results, token, status, _ = search_nearby_restaurants(
+        lat=CENTER["lat"], lng=CENTER["lng"], last_info=state, coverage=True
+    )
+    # Only the first page is detailed before the search answers
+    assert status == 200
+    assert gmaps.detailed == [["middle", "0,0", "0,5000"]]
+    assert results == [{"place_id": p} for p in ["middle", "0,0", "0,5000"]]
+
+    # The background job reads the rest like any other next page
+    results, token, _, _ = search_nearby_restaurants(
+        next_page_token=token, last_info=state
+    )
+    assert results == [{"place_id": "0,-5000"}]
+    assert token is None
+    assert len(gmaps.calls) == 5  # The sub-searches ran once
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.job_executor import JobCancelledError
+from services.search_jobs import SearchJob, SearchJobRegistry
+
+
+def test_job_lifecycle():
+    job = SearchJob("u", {"lat": 1, "lng": 2})
+    assert job.status == "pending" and not job.finished
+
+    job.update(status="fetching")
+    job.record_page(20)
+    job.record_page(5)
+    assert job.pages_fetched == 2
+    assert job.restaurants_fetched == 25
+    assert not job.suggestions_ready
+
+    job.update(upload="done")
+    assert job.suggestions_ready
+    job.update(status="done")
+    assert job.finished
+    assert job.to_dict()["suggestions_ready"] is True
+
+
+def test_failed_job_is_finished():
+    job = SearchJob("u", {})
+    job.fail(RuntimeError("boom"))
+    assert job.finished
+    assert job.to_dict()["error"] == "boom"
+
+
+def test_cancelled_job_stays_cancelled():
+    job = SearchJob("u", {})
+    job.update(status="clustering")
+    job.cancel()
+    with pytest.raises(JobCancelledError):
+        job.check_cancelled()
+
+    # Work that was already running finishes after the cancel
+    job.update(status="done", upload="done")
+    job.fail("late failure")
+    assert job.status == "cancelled"
+    assert job.upload == "done"
+
+
+def test_finished_jobs_are_pruned_after_ttl():
+    jobs = SearchJobRegistry(ttl_seconds=60)
+    done = jobs.create("u", {})
+    running = jobs.create("v", {})
+    done.update(status="done")
+    done.updated_at -= 120
+    running.updated_at -= 120
+
+    jobs.create("w", {})  # Creating a job prunes expired ones
+    assert jobs.get(done.job_id) is None
+    assert jobs.latest_for_user("u") is None
+    # Jobs still running are kept however old they are
+    assert jobs.get(running.job_id) is running
+    assert jobs.latest_for_user("v") is running
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.storage import MemoryStore, SQLiteStore
+
+
+def make_restaurants(n, cluster=0):
+    return [
+        {"place_id": f"p{i}", "cluster": cluster, "rating": 4.0, "reviews": "long text"}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore()
+    return SQLiteStore(path=str(tmp_path / "restaurants.sqlite3"))
+
+
+def test_upload_and_project(store):
+    store.upload_data(make_restaurants(3), user_id="u")
+    data = store.get_data("u", fields=["place_id", "cluster"])
+    assert sorted(r["place_id"] for r in data) == ["p0", "p1", "p2"]
+    assert all(set(r) == {"place_id", "cluster"} for r in data)
+    assert store.get_data("missing") is None
+
+
+def test_upload_only_writes_changes(store):
+    written = []
+    write = store._write
+    store._write = lambda user_id, changed, removed, *args: (
+        written.append((len(changed), len(removed))),
+        write(user_id, changed, removed, *args),
+    )
+    store.upload_data(make_restaurants(3), user_id="u")
+    restaurants = make_restaurants(2)
+    restaurants[0]["cluster"] = 1
+    store.upload_data(restaurants, user_id="u")
+    assert written == [(3, 0), (1, 1)]
+    assert len(store.get_data("u", fields=None)) == 2
+
+
+def test_upload_diffs_against_uploads_from_other_processes(tmp_path):
+    path = str(tmp_path / "restaurants.sqlite3")
+    worker_a, worker_b = SQLiteStore(path=path), SQLiteStore(path=path)
+    worker_a.upload_data(make_restaurants(3), user_id="u")
+    worker_b.upload_data(make_restaurants(1, cluster=1), user_id="u")
+
+    # worker_a must not diff against the manifest it wrote itself
+    worker_a.upload_data(make_restaurants(3), user_id="u")
+    data = worker_b.get_data("u", fields=["place_id", "cluster"])
+    assert sorted(data, key=lambda r: r["place_id"]) == [
+        {"place_id": f"p{i}", "cluster": 0} for i in range(3)
+    ]
+
+
+def test_reads_are_cached_until_version_moves(store):
+    store.upload_data(make_restaurants(2), user_id="u")
+    store.get_data("u", fields=["place_id"])
+    store.get_data("u", fields=["place_id"])
+    metrics = store.metrics()
+    assert metrics["data_cache"]["hits"] == 1
+    assert metrics["get"]["calls"] == 1 and metrics["upload"]["calls"] == 1
+
+    store.data_cache.revalidate_seconds = 0
+    assert len(store.get_data("u", fields=["place_id"])) == 2
+    assert store.metrics()["get_revalidated"]["calls"] == 1
@@ -0,0 +1,29 @@
+import os
+import sys
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.type_encoder import TypeEncoder
+
+
+def test_column_order_is_stable_across_batches():
+    encoder = TypeEncoder(vocabulary=["bar", "cafe", "restaurant"])
+    first = encoder.transform([["restaurant"], ["cafe", "bar"]])
+    second = encoder.transform([["bar", "unknown_type"]])
+    assert first.tolist() == [[0, 0, 1], [1, 1, 0]]
+    assert second.tolist() == [[1, 0, 0]]
+
+
+def test_extend_appends_unseen_types():
+    encoder = TypeEncoder(vocabulary=["bar", "cafe"], extend=True)
+    matrix = encoder.transform([["cafe", "bakery"], ["bar", "bar"]])
+    assert encoder.vocabulary == ["bar", "cafe", "bakery"]
+    assert matrix.tolist() == [[0, 1, 1], [1, 0, 0]]
+
+
+def test_sparse_output():
+    encoder = TypeEncoder(vocabulary=["bar", "cafe"])
+    matrix = encoder.transform([["cafe"], []], sparse_output=True)
+    assert matrix.shape == (2, 2)
+    assert matrix.nnz == 1
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import numpy as np
+
+# Insert the project root directory into sys.path.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.vector_index import VectorIndex
+
+
+def test_top_k_matches_full_sort():
+    scores = np.random.default_rng(0).normal(size=500)
+    exclude = np.zeros(500, dtype=bool)
+    exclude[[3, 10, 42]] = True
+
+    rows = VectorIndex.top_k(scores, 20, exclude=exclude)
+
+    expected = [row for row in np.argsort(-scores) if not exclude[row]][:20]
+    assert rows.tolist() == expected
+
+
+def test_top_k_handles_small_and_exhausted_decks():
+    scores = np.array([0.1, 0.9, 0.5])
+    assert VectorIndex.top_k(scores, 10).tolist() == [1, 2, 0]
+    assert VectorIndex.top_k(scores).tolist() == [1, 2, 0]
+    assert VectorIndex.top_k(scores, 0).tolist() == []
+    assert VectorIndex.top_k(scores, 2, exclude=np.ones(3, dtype=bool)).tolist() == []
+
+
+def test_query_ranks_by_cosine_similarity():
+    index = VectorIndex(["a", "b", "c"], [[1, 0], [0, 1], [0, 0]])
+    assert index.query(np.array([0.9, 0.1]), 2).tolist() == [0, 1]
+    assert index.rows(["c", "missing", "a"]) == [2, 0]
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+
+class SQLiteCache:
+    """
+    A small read-through cache backed by a local SQLite file.
+
+    Entries are JSON encoded and expire after `ttl_seconds`. When the table
+    holds more than `max_entries` rows the least recently used ones are
+    evicted. Because the data lives on disk it survives restarts and is
+    shared by every worker process that points at the same file.
+
+    Attributes:
+        hits (int): Number of lookups answered from the cache in this process.
+        misses (int): Number of lookups that were missing or expired.
+    """
+
+    def __init__(self, path, table, ttl_seconds, max_entries):
+        self.path = path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at "
+                f"ON {self.table} (accessed_at)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the SQLite connection of the calling thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """
+        Look up a cached value.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            The cached value, or None if it is missing or expired.
+        """
+        now = time.time()
+        try:
+            with self._connection() as conn:
+                row = conn.execute(
+                    f"SELECT value, created_at FROM {self.table} WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row and now - row[1] <= self.ttl_seconds:
+                    conn.execute(
+                        f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                        (now, key),
+                    )
+                    self._record(hit=True)
+                    return json.loads(row[0])
+        except sqlite3.Error as e:
+            logging.warning(f"Cache read failed for {self.table}/{key}: {e}")
+        self._record(hit=False)
+        return None
+
+    def set(self, key, value):
+        """
+        Store a value and evict the least recently used entries over budget.
+
+        Args:
+            key (str): The cache key.
+            value: Any JSON serialisable value.
+        """
+        now = time.time()
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} "
+                    "(key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now),
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logging.warning(f"Cache write failed for {self.table}/{key}: {e}")
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Return the cached value for `key`, calling `fetch()` on a miss.
+
+        Empty results are not cached so that a transient upstream failure
+        does not stick around for a whole TTL.
+        """
+        value = self.get(key)
+        if value is None:
+            value = fetch()
+            if value:
+                self.set(key, value)
+        return value
+
+    def _evict(self, conn, now):
+        conn.execute(
+            f"DELETE FROM {self.table} WHERE created_at < ?",
+            (now - self.ttl_seconds,),
+        )
+        conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY accessed_at DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._connection() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number of entries."""
+        try:
+            size = (
+                self._connection()
+                .execute(f"SELECT COUNT(*) FROM {self.table}")
+                .fetchone()[0]
+            )
+        except sqlite3.Error:
+            size = None
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+class PlaceDetailsCache(SQLiteCache):
+    """Cache for Place Details results keyed by place_id."""
+
+    def __init__(
+        self,
+        path=config.CACHE_PATH,
+        ttl_seconds=config.DETAILS_CACHE_TTL_SECONDS,
+        max_entries=config.DETAILS_CACHE_MAX_ENTRIES,
+    ):
+        super().__init__(path, "place_details", ttl_seconds, max_entries)
+
+
+class NearbySearchCache(SQLiteCache):
+    """Cache for pages of nearby search results keyed by geo tile and page."""
+
+    def __init__(
+        self,
+        path=config.CACHE_PATH,
+        ttl_seconds=config.NEARBY_CACHE_TTL_SECONDS,
+        max_entries=config.NEARBY_CACHE_MAX_ENTRIES,
+    ):
+        super().__init__(path, "nearby_search", ttl_seconds, max_entries)
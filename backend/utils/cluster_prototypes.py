@@ -0,0 +1,245 @@
+import os
+import sys
+import copy
+import time
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from utils.kprototypes import default_gamma, mixed_costs
+
+
+class ClusterPrototypes:
+    """
+    K-Prototypes cluster centers that can label and refine new data without
+    refitting the model.
+
+    Each prototype has a mean for the numerical features and a mode for the
+    categorical ones. The distance of a restaurant to a prototype is the
+    squared euclidean distance on numerical features plus `gamma` times the
+    number of mismatching categorical features, the same cost K-Prototypes
+    minimises.
+
+    Attributes:
+        columns (List[str]): Feature columns, in the order they were fitted on.
+        categorical_columns (List[str]): The categorical subset of `columns`.
+        gamma (float): Weight of a categorical mismatch.
+        centroids (np.ndarray): (n_clusters, n_numerical) numerical means.
+        modes (np.ndarray): (n_clusters, n_categorical) categorical modes.
+        counts (np.ndarray): Number of restaurants in each cluster.
+    """
+
+    def __init__(self, columns, categorical_columns, gamma, centroids, modes, counts):
+        self.columns = list(columns)
+        self.categorical_columns = list(categorical_columns)
+        self.numerical_columns = [
+            col for col in self.columns if col not in set(self.categorical_columns)
+        ]
+        self.gamma = gamma
+        self.centroids = centroids
+        self.modes = modes
+        self.counts = counts
+
+    @property
+    def n_clusters(self) -> int:
+        return len(self.counts)
+
+    @classmethod
+    def from_labels(
+        cls,
+        features_df: pd.DataFrame,
+        labels,
+        categorical_columns: List[str],
+        gamma: float = None,
+    ) -> "ClusterPrototypes":
+        """
+        Build prototypes from a labelled feature frame, e.g. a KPrototypes fit.
+
+        Args:
+            features_df (pd.DataFrame): The features the labels were fitted on.
+            labels (array-like): Cluster label of each row.
+            categorical_columns (List[str]): Columns treated as categorical.
+            gamma (float, optional): Categorical weight, defaults to
+                kprototypes.default_gamma like KPrototypes.
+
+        Returns:
+            ClusterPrototypes: One prototype per distinct label.
+        """
+        categorical_columns = [
+            col for col in categorical_columns if col in features_df.columns
+        ]
+        prototypes = cls(
+            features_df.columns,
+            categorical_columns,
+            gamma,
+            centroids=None,
+            modes=None,
+            counts=None,
+        )
+        numerical, categorical = prototypes._split(features_df)
+        if prototypes.gamma is None:
+            prototypes.gamma = default_gamma(numerical)
+        labels = np.asarray(labels, dtype=int)
+        n_clusters = int(labels.max()) + 1 if labels.size else 0
+        prototypes.centroids = np.zeros((n_clusters, numerical.shape[1]))
+        prototypes.modes = np.empty((n_clusters, categorical.shape[1]), dtype=object)
+        prototypes.counts = np.zeros(n_clusters, dtype=int)
+        prototypes._update(numerical, categorical, labels)
+        return prototypes
+
+    def _split(self, features_df: pd.DataFrame):
+        """Split a feature frame into numerical and categorical matrices."""
+        features_df = features_df.reindex(columns=self.columns, fill_value=0)
+        numerical = features_df[self.numerical_columns].to_numpy(dtype=float)
+        categorical = features_df[self.categorical_columns].to_numpy(dtype=object)
+        return numerical, categorical
+
+    def _distances(self, numerical, categorical) -> np.ndarray:
+        """(n_rows, n_clusters) matrix of K-Prototypes costs, as used in training."""
+        return mixed_costs(
+            numerical, categorical, self.centroids, self.modes, self.gamma
+        )
+
+    def _update(self, numerical, categorical, labels):
+        """Recompute means and modes from labelled rows, keeping empty clusters."""
+        for cluster in range(self.n_clusters):
+            members = labels == cluster
+            count = int(members.sum())
+            self.counts[cluster] = count
+            if not count:
+                continue  # Keep the previous center of an empty cluster
+            self.centroids[cluster] = numerical[members].mean(axis=0)
+            for col in range(categorical.shape[1]):
+                values = Counter(categorical[members, col].tolist())
+                self.modes[cluster, col] = values.most_common(1)[0][0]
+
+    def assign(self, features_df: pd.DataFrame) -> np.ndarray:
+        """Label each row with its closest prototype."""
+        numerical, categorical = self._split(features_df)
+        if not len(numerical):
+            return np.zeros(0, dtype=int)
+        return self._distances(numerical, categorical).argmin(axis=1)
+
+    def refine(self, features_df: pd.DataFrame, iterations: int = 1) -> np.ndarray:
+        """
+        Relabel `features_df` and move the prototypes to the new members.
+
+        Each iteration is one assignment and update pass of K-Prototypes
+        started from the current prototypes, which is far cheaper than a full
+        fit with new initialisation and several restarts.
+
+        Args:
+            features_df (pd.DataFrame): Every restaurant clustered so far.
+            iterations (int): Maximum number of passes, stops early once no
+                label changes.
+
+        Returns:
+            np.ndarray: The cluster label of each row.
+        """
+        numerical, categorical = self._split(features_df)
+        labels = None
+        for _ in range(iterations):
+            new_labels = self._distances(numerical, categorical).argmin(axis=1)
+            if labels is not None and np.array_equal(labels, new_labels):
+                break
+            labels = new_labels
+            self._update(numerical, categorical, labels)
+        return labels
+
+
+def fingerprint(place_ids: Iterable[str]) -> str:
+    """Order independent fingerprint of a set of restaurants."""
+    digest = hashlib.sha1()
+    for place_id in sorted(set(place_ids)):
+        digest.update(place_id.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ClusterModelCache:
+    """
+    Thread-safe in-memory cache of fitted cluster prototypes per area.
+
+    Entries are keyed by area (a geohash tile key) and remember the
+    fingerprint and place IDs of the restaurants they were fitted on. A cached
+    model is reused for a search of the same area when the search shares at
+    least `min_overlap` of its restaurants with the fitted set. Entries expire
+    after `ttl_seconds` and the least recently used are evicted beyond
+    `max_entries`. Callers always receive their own copy of the prototypes,
+    so refining them never changes the cached model.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds=config.CLUSTER_MODEL_CACHE_TTL_SECONDS,
+        max_entries=config.CLUSTER_MODEL_CACHE_MAX_ENTRIES,
+        min_overlap=config.CLUSTER_MODEL_MIN_OVERLAP,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.min_overlap = min_overlap
+        # area -> (prototypes, fingerprint, place_ids, stored_at)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, area: str, place_ids: Iterable[str]) -> Optional[ClusterPrototypes]:
+        """
+        Return a copy of the model cached for `area` if it fits the restaurants.
+
+        Args:
+            area (str): Key of the searched area.
+            place_ids (Iterable[str]): The restaurants to be clustered.
+
+        Returns:
+            ClusterPrototypes: A private copy of the cached prototypes, or None.
+        """
+        place_ids = set(place_ids)
+        with self._lock:
+            entry = self._entries.get(area)
+            if entry is not None and time.time() - entry[3] > self.ttl_seconds:
+                del self._entries[area]
+                entry = None
+            if entry is None or not place_ids:
+                self.misses += 1
+                return None
+            prototypes, entry_fingerprint, cached_ids, _ = entry
+            same_set = entry_fingerprint == fingerprint(place_ids)
+            overlap = len(place_ids & cached_ids) / len(place_ids)
+            if not same_set and overlap < self.min_overlap:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(area)
+            self.hits += 1
+            return copy.deepcopy(prototypes)
+
+    def put(self, area: str, place_ids: Iterable[str], prototypes: ClusterPrototypes):
+        """Cache a copy of `prototypes` fitted on `place_ids` for `area`."""
+        place_ids = set(place_ids)
+        entry = (
+            copy.deepcopy(prototypes),
+            fingerprint(place_ids),
+            place_ids,
+            time.time(),
+        )
+        with self._lock:
+            self._entries[area] = entry
+            self._entries.move_to_end(area)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -1,5 +1,6 @@
 import os
 import sys, logging, time
+from ssl import SSLError
 from typing import List
 
 import firebase_admin
@@ -8,12 +9,25 @@ from firebase_admin import firestore
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from utils.storage import RestaurantStore
 
 collections = config.FIREBASE_COLLECTION
 
 
-class FirebaseClient:
+class FirebaseClient(RestaurantStore):
+    """
+    Stores the clustered restaurants of each user in Firestore.
+
+    Layout: `restaurants/{user_id}` holds the manifest and version, and
+    `restaurants/{user_id}/places/{place_id}` holds one document per
+    restaurant. Changed records are written in batched writes and reads
+    project the documents onto the requested fields.
+    """
+
+    name = "firestore"
+
     def __init__(self):
+        super().__init__()
         self.db = None
         self.initialize_firebase()
 
@@ -28,22 +42,18 @@ class FirebaseClient:
 
         self.db = firestore.client()
 
+    def _user_doc(self, user_id):
+        return self.db.collection("restaurants").document(user_id)
+
+    def _new_user_id(self) -> str:
+        return self.db.collection("restaurants").document().id
+
     def upload_data(self, data: List[dict], user_id=None, max_retries=3, retry_delay=1):
         """Upload data to Firebase with retry logic for SSL errors"""
         attempt = 0
         while attempt < max_retries:
             try:
-                # Your existing upload code
-                doc_ref = (
-                    self.db.collection("restaurants").document(user_id)
-                    if user_id
-                    else self.db.collection("restaurants").document()
-                )
-                doc_ref.set({
-                    "restaurant_data": data,
-                    "timestamp": firestore.SERVER_TIMESTAMP
-                }, merge=True)
-                return doc_ref.id
+                return super().upload_data(data, user_id=user_id)
             except Exception as e:
                 if isinstance(e, SSLError) or "SSL" in str(e):
                     attempt += 1
@@ -54,36 +64,59 @@ class FirebaseClient:
                 logging.error(f"Firebase upload error: {str(e)}")
                 raise
 
-    def get_data(self, user_id=None):
-        """
-        Get restaurant data from Firebase for a specific user
-        
-        Args:
-            user_id (str): The user ID to retrieve data for
-            
-        Returns:
-            List[dict]: The restaurant data or None if not found
-        """
-        if not user_id:
-            logging.warning("No user_id provided to get_data method")
-            return None
-        
-        try:
-            doc_ref = self.db.collection("restaurants").document(user_id)
-            doc = doc_ref.get()
-            
-            if doc.exists:
-                data = doc.to_dict()
-                if data and "restaurant_data" in data:
-                    return data["restaurant_data"]
+    def _load_manifest(self, user_id) -> dict:
+        doc = self._user_doc(user_id).get(field_paths=["manifest"])
+        return (doc.to_dict() or {}).get("manifest", {}) if doc.exists else {}
+
+    def _write(self, user_id, changed, removed, manifest, version):
+        doc_ref = self._user_doc(user_id)
+        places = doc_ref.collection("places")
+        operations = [(record["place_id"], record) for record in changed] + [
+            (place_id, None) for place_id in removed
+        ]
+        for start in range(0, len(operations), config.FIRESTORE_BATCH_SIZE):
+            batch = self.db.batch()
+            for place_id, record in operations[
+                start : start + config.FIRESTORE_BATCH_SIZE
+            ]:
+                if record is None:
+                    batch.delete(places.document(place_id))
                 else:
-                    logging.warning(f"Document exists for user {user_id} but no restaurant_data found")
-                    return []
-            else:
-                logging.warning(f"No document found for user_id: {user_id}")
-                return None
-        except Exception as e:
-            logging.error(f"Error retrieving data from Firebase: {str(e)}")
-            return None
+                    batch.set(places.document(place_id), record)
+            batch.commit()
+
+        # The manifest is written last, a failed upload is simply retried in full
+        doc_ref.set(
+            {
+                "manifest": manifest,
+                "version": version,
+                "restaurant_count": len(manifest),
+                "timestamp": firestore.SERVER_TIMESTAMP,
+                "restaurant_data": firestore.DELETE_FIELD,  # Pre-split layout
+            },
+            merge=True,
+        )
 
+    def _read_version(self, user_id):
+        doc = self._user_doc(user_id).get(field_paths=["version"])
+        return (doc.to_dict() or {}).get("version") if doc.exists else None
 
+    def _read_restaurants(self, user_id, fields):
+        doc_ref = self._user_doc(user_id)
+        query = doc_ref.collection("places")
+        if fields:
+            query = query.select(fields)
+        restaurants = [doc.to_dict() for doc in query.stream()]
+        if restaurants:
+            return restaurants
+
+        # Nothing in the per-restaurant layout, fall back to the old single document
+        doc = doc_ref.get()
+        if doc.exists:
+            data = doc.to_dict()
+            if data and "restaurant_data" in data:
+                return data["restaurant_data"]
+            else:
+                logging.warning(f"Document exists for user {user_id} but no restaurant_data found")
+                return []
+        return None
@@ -0,0 +1,153 @@
+import os
+import sys
+import math
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Approximate width (in meters) of a geohash cell at the equator per precision
+_CELL_WIDTH_METERS = {
+    1: 5_000_000,
+    2: 1_250_000,
+    3: 156_000,
+    4: 39_100,
+    5: 4_890,
+    6: 1_220,
+    7: 153,
+    8: 38,
+}
+
+
+def geohash_encode(lat: float, lng: float, precision: int) -> str:
+    """
+    Encode a coordinate as a geohash string.
+
+    Args:
+        lat (float): Latitude in degrees.
+        lng (float): Longitude in degrees.
+        precision (int): Number of characters in the geohash.
+
+    Returns:
+        str: The geohash of the cell containing the coordinate.
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(geohash)
+
+
+def geohash_center(geohash: str) -> dict:
+    """
+    Decode a geohash to the coordinate at the centre of its cell.
+
+    Args:
+        geohash (str): A geohash string.
+
+    Returns:
+        dict: {"lat": ..., "lng": ...} of the cell centre.
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+    return {
+        "lat": (lat_range[0] + lat_range[1]) / 2,
+        "lng": (lng_range[0] + lng_range[1]) / 2,
+    }
+
+
+def snap_radius(radius: float) -> int:
+    """Round a radius up to the nearest configured tile radius bucket."""
+    for bucket in config.TILE_RADIUS_BUCKETS:
+        if radius <= bucket:
+            return bucket
+    return config.TILE_RADIUS_BUCKETS[-1]
+
+
+def tile_precision(radius: float) -> int:
+    """
+    Pick the coarsest geohash precision whose cells are at most
+    TILE_SIZE_RATIO times the search radius, so that any two searches in the
+    same tile cover nearly the same area.
+    """
+    target = radius * config.TILE_SIZE_RATIO
+    for precision in sorted(_CELL_WIDTH_METERS):
+        if _CELL_WIDTH_METERS[precision] <= target:
+            return precision
+    return max(_CELL_WIDTH_METERS)
+
+
+def snap_to_tile(lat: float, lng: float, radius: float) -> tuple:
+    """
+    Snap a search onto a geohash tile.
+
+    Args:
+        lat (float): Latitude of the search centre.
+        lng (float): Longitude of the search centre.
+        radius (float): Search radius in meters.
+
+    Returns:
+        tuple: (tile_key, center, radius) where tile_key identifies the tile,
+               center is the tile centre as a lat/lng dict and radius is the
+               snapped radius bucket.
+    """
+    snapped_radius = snap_radius(radius)
+    geohash = geohash_encode(lat, lng, tile_precision(snapped_radius))
+    return f"{geohash}@{snapped_radius}", geohash_center(geohash), snapped_radius
+
+
+def max_centre_offset(radius: float) -> float:
+    """
+    Worst-case distance (in meters, at the equator) between a search centre
+    and the centre of the tile it is snapped to: half the tile diagonal.
+
+    A tile's results are fetched around the tile centre, so a search may see
+    results shifted by up to this much. With the default radius buckets and
+    TILE_SIZE_RATIO it is 1% to 7% of the snapped radius, the largest for
+    2000 m (108 m) and 50000 m (about 3.4 km). That shift is the price of
+    sharing one cached page set across every search in a tile.
+    """
+    precision = tile_precision(snap_radius(radius))
+    lng_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision // 2
+    width = 360 / 2**lng_bits * 111_320
+    height = 180 / 2**lat_bits * 110_574
+    return math.hypot(width, height) / 2
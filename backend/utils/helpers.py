@@ -1,10 +1,43 @@
-import spacy
 import math
+import threading
 import pandas as pd
 import numpy as np
 from typing import List
 
-embedding = spacy.load("en_core_web_lg")
+_embedding = None
+_embedding_lock = threading.Lock()
+
+# Only the static word vectors are used, the rest of the pipeline is skipped
+EMBEDDING_DISABLED_PIPES = [
+    "tok2vec",
+    "tagger",
+    "parser",
+    "attribute_ruler",
+    "lemmatizer",
+    "ner",
+    "senter",
+]
+
+
+def get_embedding():
+    """
+    Return the spaCy pipeline used for review embeddings, loading it on first use.
+
+    Loading en_core_web_lg takes seconds and several hundred MB, so it is
+    deferred until a vector is actually needed (or until warm-up).
+    """
+    global _embedding
+    if _embedding is None:
+        with _embedding_lock:
+            if _embedding is None:
+                import spacy
+
+                _embedding = spacy.load("en_core_web_lg")
+    return _embedding
+
+
+def is_embedding_loaded() -> bool:
+    return _embedding is not None
 
 
 class Tools:
@@ -22,10 +55,37 @@ class Tools:
         else:
             raise ValueError("Invalid review format. Not a list or dict.")
 
-    def get_vector(self, texts: str) -> np.ndarray:
-        if len(texts) > 0:
-            return embedding(texts).vector
-        return np.zeros(embedding.vocab.vectors.shape[1])
+    def embed_texts(self, texts: List[str], batch_size=64) -> tuple:
+        """
+        Embed many texts in a single nlp.pipe pass and count their tokens.
+
+        A document vector is the mean of its token vectors, so
+        `vector * token_count` can be summed across documents to get the
+        embedding of their concatenation without running the pipeline again.
+
+        Args:
+            texts (List[str]): The texts to embed.
+            batch_size (int): Number of texts spaCy processes per batch.
+
+        Returns:
+            tuple: (vectors, token_counts) as a (len(texts), vector_size) float32
+                   matrix and an integer array of length len(texts).
+        """
+        embedding = get_embedding()
+        vectors = np.zeros(
+            (len(texts), embedding.vocab.vectors.shape[1]), dtype=np.float32
+        )
+        token_counts = np.zeros(len(texts), dtype=int)
+        non_empty = [i for i, text in enumerate(texts) if text]
+        docs = embedding.pipe(
+            (texts[i] for i in non_empty),
+            batch_size=batch_size,
+            disable=EMBEDDING_DISABLED_PIPES,
+        )
+        for i, doc in zip(non_empty, docs):
+            vectors[i] = doc.vector
+            token_counts[i] = len(doc)
+        return vectors, token_counts
 
     def extract_all_place_ids(self, data: List[dict]) -> List[str]:
         """
@@ -72,3 +132,28 @@ class Tools:
             "east": {"lat": lat, "lng": lng + delta_lng},
             "west": {"lat": lat, "lng": lng - delta_lng},
         }
+
+    def get_grid_locations(
+        self, lat: float, lng: float, radius: float, size: int
+    ) -> List[dict]:
+        """
+        Given a center latitude and longitude and a radius in meters, split
+        the square around the circle into size x size cells and return the
+        centers of the cells that overlap the circle.
+        """
+        cell = 2 * radius / size
+        half_diagonal = cell / math.sqrt(2)
+        locations = []
+        for row in range(size):
+            for col in range(size):
+                north = -radius + (row + 0.5) * cell
+                east = -radius + (col + 0.5) * cell
+                if math.hypot(north, east) > radius + half_diagonal:
+                    continue  # The cell lies outside the circle
+                locations.append(
+                    {
+                        "lat": lat + north / 111000.0,
+                        "lng": lng + east / (111000.0 * math.cos(math.radians(lat))),
+                    }
+                )
+        return locations
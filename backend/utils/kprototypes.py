@@ -0,0 +1,289 @@
+import os
+import sys
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process pool shared by every fit, created on first use."""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=config.CLUSTER_PROCESSES
+                )
+    return _process_pool
+
+
+def encode_categorical(categorical: np.ndarray):
+    """
+    Encode every categorical column as integer codes.
+
+    Returns:
+        Tuple[np.ndarray, List[np.ndarray]]: The (n_rows, n_columns) code
+        matrix and, per column, the original value of each code.
+    """
+    codes = np.empty(categorical.shape, dtype=np.int64)
+    values = []
+    for col in range(categorical.shape[1]):
+        _, codes[:, col] = np.unique(
+            categorical[:, col].astype(str), return_inverse=True
+        )
+        # Keep the original objects (ints, bools) rather than their strings
+        first_rows = np.unique(codes[:, col], return_index=True)[1]
+        values.append(categorical[first_rows, col])
+    return codes, values
+
+
+def default_gamma(numerical: np.ndarray) -> float:
+    """
+    Weight of a categorical mismatch when none is given: half the mean
+    standard deviation of the numerical features, as in the kmodes package.
+    """
+    return 0.5 * float(numerical.std(axis=0).mean()) if numerical.size else 1.0
+
+
+def mixed_costs(numerical, categorical, centroids, modes, gamma) -> np.ndarray:
+    """
+    K-Prototypes dissimilarity of every row to every center.
+
+    Squared euclidean distance on the numerical features, expanded as
+    |x|^2 - 2 x.c + |c|^2 so it is one matrix product, plus `gamma` times the
+    number of mismatching categorical codes.
+
+    Returns:
+        np.ndarray: An (n_rows, n_centers) cost matrix.
+    """
+    numerical_cost = (
+        (numerical**2).sum(axis=1)[:, None]
+        - 2 * numerical @ centroids.T
+        + (centroids**2).sum(axis=1)[None, :]
+    )
+    np.maximum(numerical_cost, 0, out=numerical_cost)
+    categorical_cost = (categorical[:, None, :] != modes[None, :, :]).sum(axis=2)
+    return numerical_cost + gamma * categorical_cost
+
+
+def _init_centers(numerical, categorical, n_clusters, gamma, rng):
+    """Pick initial centers among the rows with k-means++ seeding."""
+    n_rows = len(numerical)
+    chosen = [int(rng.integers(n_rows))]
+    closest = mixed_costs(
+        numerical, categorical, numerical[chosen], categorical[chosen], gamma
+    )[:, 0]
+    while len(chosen) < n_clusters:
+        total = closest.sum()
+        if total > 0:
+            row = int(rng.choice(n_rows, p=closest / total))
+        else:
+            # Every row already matches a center, take any unused row
+            row = int(rng.choice(np.setdiff1d(np.arange(n_rows), chosen)))
+        chosen.append(row)
+        costs = mixed_costs(
+            numerical, categorical, numerical[[row]], categorical[[row]], gamma
+        )[:, 0]
+        np.minimum(closest, costs, out=closest)
+    return numerical[chosen].astype(float), categorical[chosen].copy()
+
+
+def _update_centers(numerical, categorical, labels, centroids, modes, n_values):
+    """Move every non-empty center to the mean and mode of its members."""
+    n_clusters = len(centroids)
+    counts = np.bincount(labels, minlength=n_clusters)
+    filled = counts > 0
+    sums = np.zeros_like(centroids)
+    np.add.at(sums, labels, numerical)
+    centroids[filled] = sums[filled] / counts[filled, None]
+
+    # One histogram over every (column, code) pair, then the mode per column
+    offsets = np.concatenate([[0], np.cumsum(n_values)[:-1]])
+    frequencies = np.zeros((n_clusters, int(np.sum(n_values))), dtype=np.int64)
+    np.add.at(frequencies, (labels[:, None], categorical + offsets), 1)
+    for col, (offset, size) in enumerate(zip(offsets, n_values)):
+        column_modes = frequencies[:, offset : offset + size].argmax(axis=1)
+        modes[filled, col] = column_modes[filled]
+
+
+def run_kprototypes(
+    numerical, categorical, n_clusters, gamma, max_iter, seed, n_values
+):
+    """
+    One K-Prototypes run from one random initialisation.
+
+    Module level so restarts can run in worker processes.
+
+    Returns:
+        Tuple: (labels, centroids, modes, cost, n_iter)
+    """
+    rng = np.random.default_rng(seed)
+    centroids, modes = _init_centers(numerical, categorical, n_clusters, gamma, rng)
+    labels = None
+    n_iter = 0
+    for n_iter in range(1, max_iter + 1):
+        costs = mixed_costs(numerical, categorical, centroids, modes, gamma)
+        new_labels = costs.argmin(axis=1)
+        if labels is not None and np.array_equal(labels, new_labels):
+            break
+        labels = new_labels
+        _update_centers(numerical, categorical, labels, centroids, modes, n_values)
+    costs = mixed_costs(numerical, categorical, centroids, modes, gamma)
+    labels = costs.argmin(axis=1)
+    cost = float(costs[np.arange(len(labels)), labels].sum())
+    return labels, centroids, modes, cost, n_iter
+
+
+def silhouette_score(numerical, categorical, labels, gamma) -> float:
+    """
+    Mean silhouette of a clustering under the K-Prototypes dissimilarity.
+
+    Rows in single-member clusters score 0, like scikit-learn.
+    """
+    n_clusters = int(labels.max()) + 1
+    if n_clusters < 2:
+        return 0.0
+    distances = mixed_costs(numerical, categorical, numerical, categorical, gamma)
+    members = np.eye(n_clusters)[labels]
+    totals = distances @ members
+    sizes = members.sum(axis=0)
+    own_size = sizes[labels]
+    rows = np.arange(len(labels))
+    intra = totals[rows, labels] / np.maximum(own_size - 1, 1)
+    mean_to_cluster = totals / np.where(sizes > 0, sizes, np.nan)
+    mean_to_cluster[rows, labels] = np.inf
+    inter = np.nanmin(mean_to_cluster, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = (inter - intra) / np.maximum(intra, inter)
+    scores[(own_size <= 1) | ~np.isfinite(scores)] = 0.0
+    return float(scores.mean())
+
+
+class FastKPrototypes:
+    """
+    K-Prototypes clustering of mixed numerical/categorical data on NumPy.
+
+    Distances to every center are computed in one vectorised kernel instead
+    of row by row. Several random k-means++ initialisations are run and the
+    lowest cost one wins. On large inputs the restarts run in a shared process
+    pool. With `n_clusters="auto"` every k in `k_range` is fitted and the one
+    with the best silhouette, measured on a sample of rows, is kept.
+
+    Mirrors the parts of kmodes.kprototypes.KPrototypes used here:
+    fit_predict(X, categorical=...) and the `gamma` attribute.
+
+    Attributes:
+        labels_ (np.ndarray): Cluster of each row of the last fit.
+        cost_ (float): Total dissimilarity of the rows to their centers.
+        n_clusters_ (int): Number of clusters of the last fit.
+        cluster_centroids_ (np.ndarray): Numerical means of each cluster.
+        cluster_modes_ (np.ndarray): Categorical modes of each cluster.
+        gamma (float): Weight of a categorical mismatch.
+        n_iter_ (int): Iterations of the winning run.
+    """
+
+    def __init__(
+        self,
+        n_clusters=config.N_CLUSTERS,
+        n_init=config.CLUSTER_N_INIT,
+        max_iter=config.CLUSTER_MAX_ITER,
+        gamma: Optional[float] = None,
+        k_range=config.CLUSTER_K_RANGE,
+        silhouette_sample=config.CLUSTER_SILHOUETTE_SAMPLE,
+        parallel_min_rows=config.CLUSTER_PARALLEL_MIN_ROWS,
+        random_state=None,
+    ):
+        self.n_clusters = n_clusters
+        self.n_init = n_init
+        self.max_iter = max_iter
+        self.gamma = gamma
+        self.k_range = k_range
+        self.silhouette_sample = silhouette_sample
+        self.parallel_min_rows = parallel_min_rows
+        self.random_state = random_state
+
+    def fit_predict(self, X, categorical: List[int]) -> np.ndarray:
+        """
+        Cluster the rows of `X` and return their labels.
+
+        Args:
+            X (array-like): (n_rows, n_features) matrix, may be of object dtype.
+            categorical (List[int]): Indices of the categorical columns.
+
+        Returns:
+            np.ndarray: The cluster label of each row.
+        """
+        X = np.asarray(X, dtype=object)
+        categorical = sorted(categorical)
+        numerical_indices = [i for i in range(X.shape[1]) if i not in categorical]
+        numerical = X[:, numerical_indices].astype(float)
+        codes, values = encode_categorical(X[:, categorical])
+        n_values = [len(column_values) for column_values in values]
+        if self.gamma is None:
+            self.gamma = default_gamma(numerical)
+        rng = np.random.default_rng(self.random_state)
+
+        n_distinct = len(np.unique(X.astype(str), axis=0))
+        if self.n_clusters == "auto":
+            k_min, k_max = self.k_range
+            candidates = list(range(k_min, min(k_max, n_distinct - 1) + 1)) or [
+                max(1, min(k_min, n_distinct))
+            ]
+        else:
+            candidates = [max(1, min(int(self.n_clusters), n_distinct))]
+
+        sample = None
+        if len(candidates) > 1 and len(X) > self.silhouette_sample:
+            sample = rng.choice(len(X), self.silhouette_sample, replace=False)
+
+        best, best_score = None, -np.inf
+        for k in candidates:
+            result = self._fit_k(numerical, codes, k, n_values, rng)
+            if len(candidates) == 1:
+                best = result
+                break
+            labels = result[0]
+            if sample is not None:
+                score = silhouette_score(
+                    numerical[sample], codes[sample], labels[sample], self.gamma
+                )
+            else:
+                score = silhouette_score(numerical, codes, labels, self.gamma)
+            logging.debug(f"K-Prototypes k={k} silhouette={score:.4f}")
+            if score > best_score:
+                best, best_score = result, score
+
+        labels, centroids, modes, cost, n_iter = best
+        self.labels_ = labels
+        self.cost_ = cost
+        self.n_iter_ = n_iter
+        self.n_clusters_ = len(centroids)
+        self.cluster_centroids_ = centroids
+        self.cluster_modes_ = np.array(
+            [[values[col][code] for col, code in enumerate(row)] for row in modes],
+            dtype=object,
+        ).reshape(len(modes), len(values))
+        return labels
+
+    def _fit_k(self, numerical, codes, n_clusters, n_values, rng):
+        """Run every restart for one k and keep the lowest cost."""
+        seeds = rng.integers(0, 2**31 - 1, size=self.n_init).tolist()
+        args = [
+            (numerical, codes, n_clusters, self.gamma, self.max_iter, seed, n_values)
+            for seed in seeds
+        ]
+        if self.n_init > 1 and len(numerical) >= self.parallel_min_rows:
+            pool = get_process_pool()
+            results = list(pool.map(run_kprototypes, *zip(*args)))
+        else:
+            results = [run_kprototypes(*arg) for arg in args]
+        return min(results, key=lambda result: result[3])
@@ -0,0 +1,213 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+
+class PhotoStore:
+    """
+    Disk store for place photos with a size budget and LRU/TTL eviction.
+
+    An in-memory index keeps every stored photo ordered by last access
+    together with its size and write time. Whenever the total size goes over
+    `max_bytes`, the least recently used photos are deleted, and photos older
+    than `ttl_seconds` are treated as missing. Files are written to a
+    temporary file and renamed into place, so readers never see a partial
+    image. On start-up the index is rebuilt from the files already on disk,
+    and files written by other worker processes are adopted when they are
+    first requested.
+
+    Attributes:
+        root (str): Directory holding one sub-directory per place_id.
+        max_bytes (int): Disk budget of the store.
+        ttl_seconds (int): Age after which a photo is evicted.
+    """
+
+    def __init__(
+        self,
+        root=config.PHOTO_DIR,
+        max_bytes=config.PHOTO_STORE_MAX_BYTES,
+        ttl_seconds=config.IMAGE_EXPIRY_SECONDS,
+    ):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.total_bytes = 0
+        self.evictions = 0
+        self._index = OrderedDict()  # (place_id, photo_num) -> (size, stored_at)
+        self._lock = threading.Lock()
+        self._cleanup_thread = None
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index()
+
+    def path(self, place_id: str, photo_num: int) -> str:
+        return os.path.join(self.root, place_id, f"{photo_num}.jpg")
+
+    def _load_index(self):
+        """Rebuild the index from disk, oldest access first."""
+        entries = []
+        for place_id in os.listdir(self.root):
+            directory = os.path.join(self.root, place_id)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                stem, ext = os.path.splitext(name)
+                if ext != ".jpg" or not stem.isdigit():
+                    continue
+                stat = os.stat(os.path.join(directory, name))
+                entries.append(
+                    (max(stat.st_atime, stat.st_mtime), place_id, int(stem), stat)
+                )
+        with self._lock:
+            for _, place_id, photo_num, stat in sorted(entries):
+                self._index[(place_id, photo_num)] = (stat.st_size, stat.st_mtime)
+                self.total_bytes += stat.st_size
+            self._enforce_budget()
+
+    def get(self, place_id: str, photo_num: int) -> Optional[str]:
+        """
+        Return the path of a stored photo and mark it as recently used.
+
+        Returns:
+            str: Path of the photo, or None if it is missing or expired.
+        """
+        key = (place_id, photo_num)
+        path = self.path(place_id, photo_num)
+        exists = os.path.exists(path)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and not exists:
+                # Evicted by another worker process
+                self._index.pop(key)
+                self.total_bytes -= entry[0]
+                return None
+            if entry is None:
+                if not exists:
+                    return None
+                # Written by another worker process
+                stat = os.stat(path)
+                entry = (stat.st_size, stat.st_mtime)
+                self._index[key] = entry
+                self.total_bytes += stat.st_size
+            if time.time() - entry[1] > self.ttl_seconds:
+                self._remove(key)
+                return None
+            self._index.move_to_end(key)
+        return path
+
+    def put(self, place_id: str, photo_num: int, chunks: Iterable[bytes]) -> str:
+        """
+        Atomically write a photo and evict other photos if over budget.
+
+        Args:
+            place_id (str): The place ID of the restaurant.
+            photo_num (int): Index of the photo.
+            chunks (Iterable[bytes]): The image content.
+
+        Returns:
+            str: Path of the stored photo.
+        """
+        path = self.path(place_id, photo_num)
+        directory = os.path.dirname(path)
+        for attempt in range(2):
+            os.makedirs(directory, exist_ok=True)
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                break
+            except FileNotFoundError:
+                # The directory was removed by a concurrent eviction
+                if attempt:
+                    raise
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+                        size += len(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        key = (place_id, photo_num)
+        with self._lock:
+            previous = self._index.pop(key, None)
+            if previous:
+                self.total_bytes -= previous[0]
+            self._index[key] = (size, time.time())
+            self.total_bytes += size
+            self._enforce_budget(keep=key)
+        return path
+
+    def evict_expired(self):
+        """Delete every photo older than the TTL."""
+        now = time.time()
+        with self._lock:
+            expired = [
+                key
+                for key, (_, stored_at) in self._index.items()
+                if now - stored_at > self.ttl_seconds
+            ]
+            for key in expired:
+                self._remove(key)
+        if expired:
+            logging.debug(f"Deleted {len(expired)} expired photos")
+
+    def _enforce_budget(self, keep=None):
+        """Evict least recently used photos until under budget. Lock held."""
+        for key in list(self._index):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key != keep:
+                self._remove(key)
+
+    def _remove(self, key):
+        """Drop a photo from the index and the disk. Lock held."""
+        size, _ = self._index.pop(key)
+        self.total_bytes -= size
+        self.evictions += 1
+        path = self.path(*key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        try:
+            os.rmdir(os.path.dirname(path))  # Only succeeds once it is empty
+        except OSError:
+            pass
+
+    def start_cleanup(self, interval_seconds=60):
+        """Start a daemon thread that periodically evicts expired photos."""
+        if self._cleanup_thread is not None:
+            return
+
+        def sweep():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    self.evict_expired()
+                except Exception as e:
+                    logging.error(f"Photo cleanup failed: {e}")
+
+        self._cleanup_thread = threading.Thread(
+            target=sweep, name="photo-cleanup", daemon=True
+        )
+        self._cleanup_thread.start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "photos": len(self._index),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
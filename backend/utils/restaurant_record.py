@@ -0,0 +1,163 @@
+import sys
+import operator
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Every field of a restaurant built from a Place Details result, in column order
+RESTAURANT_FIELDS = (
+    "place_id",
+    "restaurant_name",
+    "formatted_address",
+    "location",
+    "open_now",
+    "periods",
+    "opening_hours",
+    "price_level",
+    "rating",
+    "types",
+    "total_user_ratings",
+    "vicinity",
+    "website",
+    "phone_number",
+    "photos",
+    "reviews",
+    "curbside_pickup",
+    "delivery",
+    "dine_in",
+    "reservable",
+    "takeout",
+    "serves_breakfast",
+    "serves_lunch",
+    "serves_dinner",
+    "serves_brunch",
+    "serves_vegetarian_food",
+    "serves_beer",
+    "serves_wine",
+    "wheelchair_accessible",
+    "business_status",
+    "editorial_summary",
+)
+
+
+def intern_value(value):
+    """Intern a string, or the strings of a list, so repeated values share memory."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return [sys.intern(item) if isinstance(item, str) else item for item in value]
+    return value
+
+
+class RestaurantRecord:
+    """
+    One restaurant of a search, with a fixed set of slots instead of a dict.
+
+    Categorical strings (types, business status, "N/A" placeholders) are
+    interned, so a page of restaurants shares one copy of each. Records
+    support `record["field"]` and `record.get("field")` so code written
+    against the dict form keeps working, and convert to a dict only at the
+    JSON and storage boundaries.
+    """
+
+    __slots__ = RESTAURANT_FIELDS
+
+    # Fields whose values come from a small vocabulary
+    INTERNED_FIELDS = ("types", "business_status", "price_level", "rating")
+
+    def __init__(self, **fields):
+        for field in RESTAURANT_FIELDS:
+            value = fields.get(field)
+            if field in self.INTERNED_FIELDS:
+                value = intern_value(value)
+            setattr(self, field, value)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RestaurantRecord":
+        return cls(**{field: data.get(field) for field in RESTAURANT_FIELDS})
+
+    def __getitem__(self, field):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field)
+
+    def get(self, field, default=None):
+        return getattr(self, field, default)
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in RESTAURANT_FIELDS}
+
+    def __eq__(self, other):
+        if not isinstance(other, RestaurantRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"RestaurantRecord(place_id={self.place_id!r})"
+
+
+Record = Union[RestaurantRecord, dict]
+
+# Reads every slot of a record into a tuple in one C call
+_record_row = operator.attrgetter(*RESTAURANT_FIELDS)
+
+
+def as_dict(record: Record) -> dict:
+    """The dict form of a record, for JSON responses and storage writes."""
+    return record.to_dict() if isinstance(record, RestaurantRecord) else record
+
+
+def json_default(value):
+    """`default` hook for json.dumps that serialises RestaurantRecords."""
+    if isinstance(value, RestaurantRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def records_to_frame(
+    records: Iterable[Record], columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Build a DataFrame from restaurant records.
+
+    RestaurantRecords are read into one tuple per row with an attrgetter over
+    their slots, which pandas turns into columns without inferring the union
+    of keys of every row as it does for dicts.
+
+    Args:
+        records (Iterable[Record]): RestaurantRecords or restaurant dicts.
+        columns (List[str], optional): Columns to keep, every field if not given.
+
+    Returns:
+        pd.DataFrame: One row per record.
+    """
+    records = list(records)
+    if records and all(isinstance(record, RestaurantRecord) for record in records):
+        frame = pd.DataFrame(
+            [_record_row(record) for record in records],
+            columns=list(RESTAURANT_FIELDS),
+        )
+    else:
+        frame = pd.DataFrame(records)
+    if columns is not None:
+        frame = frame[[column for column in columns if column in frame.columns]]
+    return frame
+
+
+def frame_to_dicts(frame: pd.DataFrame) -> List[dict]:
+    """
+    Turn a DataFrame back into one dict per row, with plain Python values.
+
+    Each column is converted with one tolist() call instead of boxing every
+    cell, which is what frame.to_dict(orient="records") does.
+    """
+    columns = list(frame.columns)
+    values = [frame[column].tolist() for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def stack_column(records: List[dict], field: str, dtype=np.float32) -> np.ndarray:
+    """Stack one list-valued field of every record into a matrix."""
+    return np.asarray([record[field] for record in records], dtype=dtype)
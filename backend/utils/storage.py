@@ -0,0 +1,437 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+
+def record_hash(record: dict) -> str:
+    """Stable content hash of one restaurant record."""
+    payload = json.dumps(record, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def project(records: List[dict], fields) -> List[dict]:
+    """Keep only `fields` of each record, like a Firestore select()."""
+    if not fields:
+        return records
+    return [{k: record[k] for k in fields if k in record} for record in records]
+
+
+class VersionedDataCache:
+    """
+    In-process cache of each user's restaurant data, tagged with the version
+    the writer stored it under.
+
+    Entries are served without any round trip for `revalidate_seconds`, after
+    which the caller compares the cached version with the stored one and only
+    refetches the data if it moved. Least recently used users are evicted
+    beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        revalidate_seconds=config.DATA_CACHE_REVALIDATE_SECONDS,
+        max_entries=config.DATA_CACHE_MAX_ENTRIES,
+    ):
+        self.revalidate_seconds = revalidate_seconds
+        self.max_entries = max_entries
+        # (user_id, fields) -> [version, data, checked_at]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    @staticmethod
+    def _key(user_id, fields):
+        return (user_id, tuple(fields) if fields else None)
+
+    def get(self, user_id, fields):
+        """
+        Returns:
+            Tuple[bool, str, List[dict]]: Whether the entry is fresh, its
+            version and its data. (False, None, None) on a miss.
+        """
+        key = self._key(user_id, fields)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None, None
+            self._entries.move_to_end(key)
+            fresh = time.time() - entry[2] < self.revalidate_seconds
+            if fresh:
+                self.hits += 1
+            return fresh, entry[0], entry[1]
+
+    def put(self, user_id, fields, version, data):
+        with self._lock:
+            key = self._key(user_id, fields)
+            self._entries[key] = [version, data, time.time()]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, user_id, fields):
+        """Mark an entry as checked against the stored version just now."""
+        with self._lock:
+            entry = self._entries.get(self._key(user_id, fields))
+            if entry is not None:
+                entry[2] = time.time()
+                self.revalidations += 1
+
+    def invalidate(self, user_id):
+        """Drop every entry of a user."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def replace_user(self, user_id, version, data, fields):
+        """Drop every entry of a user and cache freshly written data."""
+        self.invalidate(user_id)
+        self.put(user_id, fields, version, project(data, fields))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+            }
+
+
+class RestaurantStore:
+    """
+    Storage of the clustered restaurants of each user.
+
+    Every user has a manifest mapping place_id to the hash of its record and
+    a version that changes on every upload. Uploads only write the records
+    whose hash changed and delete the ones that dropped out. The manifest of
+    the last upload is kept in memory and reused only while the stored
+    version still matches it, so uploads from other processes are picked up.
+    Reads go through a VersionedDataCache, so they only reach the backend on a
+    miss or once the stored version moved.
+
+    Backends implement the primitives below. upload_data and get_data time
+    every call, metrics() reports latency and throughput per operation in the
+    same shape for every backend.
+
+    Attributes:
+        name (str): Name of the backend, as used in config.STORAGE_BACKEND.
+        data_cache (VersionedDataCache): Cache in front of get_data.
+    """
+
+    name = None
+
+    def __init__(self):
+        self._manifests = {}  # user_id -> (version, {place_id: record hash})
+        self._lock = threading.Lock()
+        self.data_cache = VersionedDataCache()
+        self._metrics = {}
+
+    # Backend primitives
+
+    def _load_manifest(self, user_id) -> dict:
+        """Return the stored manifest of a user, {} if there is none."""
+        raise NotImplementedError
+
+    def _write(
+        self, user_id, changed: List[dict], removed: List[str], manifest, version
+    ):
+        """Write changed records, delete removed ones, then store the manifest."""
+        raise NotImplementedError
+
+    def _read_version(self, user_id) -> Optional[str]:
+        """Return the stored version of a user, None if there is none."""
+        raise NotImplementedError
+
+    def _read_restaurants(self, user_id, fields) -> Optional[List[dict]]:
+        """Return the stored records projected on `fields`, None if unknown user."""
+        raise NotImplementedError
+
+    def _new_user_id(self) -> str:
+        return hashlib.sha1(str(time.time_ns()).encode()).hexdigest()[:20]
+
+    # Public API
+
+    def upload_data(self, data: List[dict], user_id=None) -> str:
+        """
+        Store the clustered restaurants of a user.
+
+        Args:
+            data (List[dict]): One record per restaurant, keyed by place_id.
+            user_id (str, optional): Owner of the data, a new ID if not given.
+
+        Returns:
+            str: The user ID the data was stored under.
+        """
+        start = time.perf_counter()
+        user_id = user_id or self._new_user_id()
+        with self._lock:
+            cached = self._manifests.get(user_id)
+        # Another worker may have uploaded since, only trust our manifest while
+        # the stored version is still the one we wrote
+        if cached is not None and cached[0] == self._read_version(user_id):
+            old_manifest = cached[1]
+        else:
+            old_manifest = self._load_manifest(user_id)
+        new_manifest = {record["place_id"]: record_hash(record) for record in data}
+        changed = [
+            record
+            for record in data
+            if old_manifest.get(record["place_id"]) != new_manifest[record["place_id"]]
+        ]
+        removed = [
+            place_id for place_id in old_manifest if place_id not in new_manifest
+        ]
+        version = str(time.time_ns())
+        self._write(user_id, changed, removed, new_manifest, version)
+
+        with self._lock:
+            self._manifests[user_id] = (version, new_manifest)
+        self.data_cache.replace_user(user_id, version, data, config.SUGGESTION_FIELDS)
+        self._observe("upload", start, len(changed) + len(removed))
+        logging.info(
+            f"Uploaded {len(changed)} changed and deleted {len(removed)} of "
+            f"{len(new_manifest)} restaurants for {user_id} to {self.name}"
+        )
+        return user_id
+
+    def get_data(self, user_id=None, fields=config.SUGGESTION_FIELDS):
+        """
+        Get the restaurant data of a user.
+
+        Args:
+            user_id (str): The user ID to retrieve data for
+            fields (List[str], optional): Fields to read from each restaurant,
+                None reads whole records
+
+        Returns:
+            List[dict]: The restaurant data or None if not found
+        """
+        if not user_id:
+            logging.warning("No user_id provided to get_data method")
+            return None
+
+        start = time.perf_counter()
+        fresh, version, data = self.data_cache.get(user_id, fields)
+        if fresh:
+            self._observe("get_cached", start, len(data))
+            return data
+
+        try:
+            # The version is a small read, the data itself may be cached
+            stored_version = self._read_version(user_id)
+            if (
+                data is not None
+                and stored_version is not None
+                and stored_version == version
+            ):
+                self.data_cache.touch(user_id, fields)
+                self._observe("get_revalidated", start, len(data))
+                return data
+            restaurants = self._read_restaurants(user_id, fields)
+        except Exception as e:
+            logging.error(f"Error retrieving data from {self.name}: {str(e)}")
+            return None
+
+        if restaurants is None:
+            logging.warning(f"No data found for user_id: {user_id}")
+            return None
+        if restaurants:
+            self.data_cache.put(user_id, fields, stored_version, restaurants)
+        self._observe("get", start, len(restaurants))
+        return restaurants
+
+    def _observe(self, operation, start, records):
+        seconds = time.perf_counter() - start
+        with self._lock:
+            stat = self._metrics.setdefault(
+                operation, {"calls": 0, "records": 0, "seconds": 0.0, "max": 0.0}
+            )
+            stat["calls"] += 1
+            stat["records"] += records
+            stat["seconds"] += seconds
+            stat["max"] = max(stat["max"], seconds)
+
+    def metrics(self) -> dict:
+        """Latency (ms) and throughput (records/s) of each operation so far."""
+        with self._lock:
+            return {
+                "backend": self.name,
+                "data_cache": self.data_cache.stats(),
+                **{
+                    operation: {
+                        "calls": stat["calls"],
+                        "avg_ms": 1000 * stat["seconds"] / stat["calls"],
+                        "max_ms": 1000 * stat["max"],
+                        "records_per_second": (
+                            stat["records"] / stat["seconds"]
+                            if stat["seconds"]
+                            else 0.0
+                        ),
+                    }
+                    for operation, stat in self._metrics.items()
+                },
+            }
+
+
+class MemoryStore(RestaurantStore):
+    """Keeps everything in process memory. For tests, load tests and offline runs."""
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._users = {}  # user_id -> {"manifest", "version", "places"}
+
+    def _load_manifest(self, user_id) -> dict:
+        with self._lock:
+            return dict(self._users.get(user_id, {}).get("manifest", {}))
+
+    def _write(self, user_id, changed, removed, manifest, version):
+        with self._lock:
+            user = self._users.setdefault(user_id, {"places": {}})
+            for record in changed:
+                user["places"][record["place_id"]] = json.loads(
+                    json.dumps(record, default=str)
+                )
+            for place_id in removed:
+                user["places"].pop(place_id, None)
+            user["manifest"] = dict(manifest)
+            user["version"] = version
+
+    def _read_version(self, user_id):
+        with self._lock:
+            return self._users.get(user_id, {}).get("version")
+
+    def _read_restaurants(self, user_id, fields):
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return None
+            return project(list(user["places"].values()), fields)
+
+
+class SQLiteStore(RestaurantStore):
+    """
+    Stores restaurants in a local SQLite file, one JSON row per restaurant.
+
+    Shared by every worker process pointing at the same file and survives
+    restarts, without any network access.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path=config.STORAGE_SQLITE_PATH):
+        super().__init__()
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS restaurant_users ("
+                "user_id TEXT PRIMARY KEY, manifest TEXT NOT NULL, "
+                "version TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS restaurant_places ("
+                "user_id TEXT NOT NULL, place_id TEXT NOT NULL, record TEXT NOT NULL, "
+                "PRIMARY KEY (user_id, place_id))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the SQLite connection of the calling thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _load_manifest(self, user_id) -> dict:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT manifest FROM restaurant_users WHERE user_id = ?", (user_id,)
+            )
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else {}
+
+    def _write(self, user_id, changed, removed, manifest, version):
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO restaurant_places (user_id, place_id, record) "
+                "VALUES (?, ?, ?)",
+                [
+                    (user_id, record["place_id"], json.dumps(record, default=str))
+                    for record in changed
+                ],
+            )
+            conn.executemany(
+                "DELETE FROM restaurant_places WHERE user_id = ? AND place_id = ?",
+                [(user_id, place_id) for place_id in removed],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO restaurant_users "
+                "(user_id, manifest, version, updated_at) VALUES (?, ?, ?, ?)",
+                (user_id, json.dumps(manifest), version, time.time()),
+            )
+
+    def _read_version(self, user_id):
+        row = (
+            self._connection()
+            .execute(
+                "SELECT version FROM restaurant_users WHERE user_id = ?", (user_id,)
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def _read_restaurants(self, user_id, fields):
+        conn = self._connection()
+        if not conn.execute(
+            "SELECT 1 FROM restaurant_users WHERE user_id = ?", (user_id,)
+        ).fetchone():
+            return None
+        rows = conn.execute(
+            "SELECT record FROM restaurant_places WHERE user_id = ?", (user_id,)
+        ).fetchall()
+        return project([json.loads(row[0]) for row in rows], fields)
+
+
+def create_storage(backend=None) -> RestaurantStore:
+    """
+    Build the storage backend named by `backend` (default config.STORAGE_BACKEND).
+
+    Args:
+        backend (str, optional): "firestore", "sqlite" or "memory".
+
+    Returns:
+        RestaurantStore: The storage backend.
+    """
+    backend = backend or config.STORAGE_BACKEND
+    if backend == "memory":
+        return MemoryStore()
+    if backend == "sqlite":
+        return SQLiteStore()
+    if backend == "firestore":
+        # Imported here so the offline backends don't need firebase_admin
+        from utils.data_transport import FirebaseClient
+
+        return FirebaseClient()
+    raise ValueError(f"Unknown storage backend: {backend}")
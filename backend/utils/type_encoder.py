@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+from typing import List
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+
+class TypeEncoder:
+    """
+    Multi-label one-hot encoder for restaurant types with a fixed vocabulary.
+
+    Column order is given by the vocabulary, so feature matrices encoded by
+    different calls (pages, batches, processes) always line up. Types outside
+    the vocabulary are ignored unless `extend` is set, in which case they are
+    appended to the end of the vocabulary and earlier columns keep their place.
+
+    Attributes:
+        vocabulary (List[str]): The encoded types, in column order.
+    """
+
+    def __init__(self, vocabulary: List[str] = None, extend=False):
+        self.vocabulary = list(vocabulary or config.RESTAURANT_TYPES)
+        self.extend = extend
+        self._index = {name: i for i, name in enumerate(self.vocabulary)}
+        self._lock = threading.Lock()
+
+    def transform(self, types_lists, sparse_output=False):
+        """
+        Encode lists of types into an indicator matrix in one shot.
+
+        Args:
+            types_lists (Iterable[list]): One list of types per restaurant.
+            sparse_output (bool): Return a scipy CSR matrix instead of a dense array.
+
+        Returns:
+            np.ndarray | scipy.sparse.csr_matrix: A (n_restaurants, n_types)
+            matrix of 0/1 values.
+        """
+        types_lists = [
+            types if isinstance(types, list) else [] for types in types_lists
+        ]
+        with self._lock:
+            if self.extend:
+                self._extend_vocabulary(types_lists)
+            n_types = len(self.vocabulary)
+
+        rows, cols = [], []
+        for row, types in enumerate(types_lists):
+            for name in types:
+                col = self._index.get(name)
+                if col is not None and col < n_types:
+                    rows.append(row)
+                    cols.append(col)
+
+        shape = (len(types_lists), n_types)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=shape
+        )
+        # Duplicate types of one restaurant would otherwise be summed
+        matrix.data[:] = 1
+        return matrix if sparse_output else matrix.toarray().astype(int)
+
+    def transform_frame(self, df: pd.DataFrame, column="types") -> pd.DataFrame:
+        """
+        Encode `df[column]` and return the indicator columns as a DataFrame
+        aligned with `df`'s index.
+        """
+        matrix = self.transform(df[column].tolist())
+        columns = self.vocabulary[: matrix.shape[1]]
+        return pd.DataFrame(matrix, columns=columns, index=df.index)
+
+    def _extend_vocabulary(self, types_lists):
+        """Append unseen types to the vocabulary. Called with the lock held."""
+        unseen = {
+            name for types in types_lists for name in types if name not in self._index
+        }
+        for name in sorted(unseen):
+            self._index[name] = len(self.vocabulary)
+            self.vocabulary.append(name)
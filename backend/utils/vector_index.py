@@ -0,0 +1,79 @@
+from typing import List, Optional
+
+import numpy as np
+
+
+class VectorIndex:
+    """
+    Exact nearest-neighbour index over the review embeddings of one deck.
+
+    The embeddings are stacked once into a float32 matrix with their norms
+    precomputed, so scoring a query is one matrix-vector product. Top-k
+    queries select the best rows with `np.argpartition` and only sort those
+    k, which keeps every query O(N) instead of the O(N log N) of a full sort.
+
+    Attributes:
+        ids (List[str]): ID of each row.
+        vectors (np.ndarray): (n_rows, dim) embeddings.
+        norms (np.ndarray): Norm of each embedding, 1 for zero vectors.
+        row_of (dict): ID -> row.
+    """
+
+    def __init__(self, ids: List[str], vectors: np.ndarray):
+        self.ids = list(ids)
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(self.vectors, axis=1)
+        norms[norms == 0] = 1.0
+        self.norms = norms
+        self.row_of = {id_: row for row, id_ in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def cosine_similarities(self, vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row with `vector`, 0 for a zero vector."""
+        vector_norm = np.linalg.norm(vector)
+        if vector_norm == 0:
+            return np.zeros(len(self))
+        return (self.vectors @ vector) / (self.norms * vector_norm)
+
+    def rows(self, ids) -> List[int]:
+        """Rows of the given IDs, skipping IDs not in the index."""
+        return [self.row_of[id_] for id_ in ids if id_ in self.row_of]
+
+    @staticmethod
+    def top_k(
+        scores: np.ndarray, k: Optional[int] = None, exclude: np.ndarray = None
+    ) -> np.ndarray:
+        """
+        Rows with the highest scores, best first.
+
+        Args:
+            scores (np.ndarray): Score of every row.
+            k (int, optional): Number of rows to return, every row if None.
+            exclude (np.ndarray, optional): Boolean mask of rows to leave out.
+
+        Returns:
+            np.ndarray: Up to k row indices sorted by descending score.
+        """
+        candidates = np.arange(len(scores))
+        if exclude is not None and exclude.any():
+            candidates = candidates[~exclude]
+        if k is not None and k < len(candidates):
+            if k <= 0:
+                return candidates[:0]
+            # Only the k best are ordered, the rest are never sorted
+            best = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[best]
+        order = np.argsort(-scores[candidates], kind="stable")
+        return candidates[order]
+
+    def query(
+        self, vector: np.ndarray, k: Optional[int] = None, exclude: np.ndarray = None
+    ) -> np.ndarray:
+        """Rows most similar to `vector`, best first."""
+        return self.top_k(self.cosine_similarities(vector), k, exclude)